@@ -6,7 +6,7 @@ from app.utils.logger import get_logger
 from app.utils.logging_config import setup_logging
 from app.errors import register_error_handlers
 from flask import g
-from app.middleware.context_middleware import ensure_request_context
+from app.middleware.context_middleware import ensure_request_context, register_memo_invalidation
 from app.middleware.security_headers import security_headers
 
 logger = get_logger(__name__)
@@ -63,6 +63,25 @@ def create_app(config_class=Config):
     # 导入模型确保元数据注册
     from app import models  # noqa: F401
 
+    # 领域变更通知（提交后派发）及缓存订阅
+    from app.signals import register_change_hooks
+    from app.middleware.stats_middleware import connect_stats_cache_invalidation
+    from app.services.leaderboard_service import connect_leaderboard_invalidation
+    from app.services.match_service import connect_match_detail_invalidation
+    from app.services.tournament_service import connect_tournament_cache_invalidation
+    from app.services.stats_aggregator import register_stats_aggregator
+    from app.db_routing import register_replica_routing
+    from app.query_budget import register_query_budget
+    register_change_hooks(db.session)
+    register_stats_aggregator(db.session)
+    register_memo_invalidation(db.session)
+    register_replica_routing(app, db.session)
+    register_query_budget(app)
+    connect_stats_cache_invalidation()
+    connect_leaderboard_invalidation()
+    connect_match_detail_invalidation()
+    connect_tournament_cache_invalidation()
+
     # 注册蓝图集合
     from app.routes import auth, matches, events, teams, tournaments, competitions, seasons, player_history, team_history, stats, health
     app.register_blueprint(auth.auth_bp, url_prefix='/auth')
@@ -80,5 +99,9 @@ def create_app(config_class=Config):
     from app.routes import players
     app.register_blueprint(players.players_bp, url_prefix='/players')
 
+    # 命令行维护命令
+    from app.cli import register_cli
+    register_cli(app)
+
     register_error_handlers(app)
     return app
\ No newline at end of file
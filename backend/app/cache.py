@@ -0,0 +1,239 @@
+"""cache.py
+进程内结果缓存子系统: 每条目 TTL + 有界 LRU + 标签失效 + 命中统计。
+
+后端可插拔:
+  - memory (默认): 进程内 OrderedDict 实现，线程安全
+  - redis: 多进程/多实例共享，需安装 redis 包并配置 CACHE_REDIS_URL
+
+缓存值必须可 JSON 序列化（共享后端需要跨进程传输）。
+使用方式:
+  from app.extensions import cache
+  value = cache.get(key)
+  cache.set(key, value, timeout=300, tags=['season:3'])
+  cache.invalidate_tags(['season:3'])
+"""
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional, Set
+import logging
+
+from app.db_routing import replica_fill_blocked
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+class MemoryCacheBackend:
+    """进程内 LRU + TTL 后端"""
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max(1, int(max_entries))
+        self._data: 'OrderedDict[str, tuple]' = OrderedDict()  # key -> (expires_at, value, tags)
+        self._tags: Dict[str, Set[str]] = {}
+        self._lock = threading.RLock()
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: str, default=_MISSING):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+            expires_at, value, _ = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                self._remove(key)
+                self.expirations += 1
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, timeout: Optional[int] = None, tags: Iterable[str] = ()):
+        expires_at = time.monotonic() + timeout if timeout else None
+        tags = tuple(tags)
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+            self._data[key] = (expires_at, value, tags)
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+            while len(self._data) > self.max_entries:
+                oldest = next(iter(self._data))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def delete(self, key: str) -> bool:
+        with self._lock:
+            return self._remove(key)
+
+    def invalidate_tags(self, tags: Iterable[str]) -> int:
+        removed = 0
+        with self._lock:
+            for tag in tags:
+                for key in list(self._tags.get(tag, ())):
+                    if self._remove(key):
+                        removed += 1
+        return removed
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._tags.clear()
+
+    def size(self) -> int:
+        return len(self._data)
+
+    def _remove(self, key: str) -> bool:
+        entry = self._data.pop(key, None)
+        if entry is None:
+            return False
+        for tag in entry[2]:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+        return True
+
+
+class RedisCacheBackend:
+    """共享 Redis 后端；标签以 Redis SET 记录所属键"""
+
+    def __init__(self, url: str, prefix: str = 'fms:cache:'):
+        try:
+            import redis  # type: ignore
+        except ImportError as e:  # pragma: no cover - 可选依赖
+            raise RuntimeError('CACHE_BACKEND=redis 需要安装 redis 包') from e
+        self._client = redis.Redis.from_url(url)
+        self._prefix = prefix
+        self.evictions = 0
+        self.expirations = 0
+
+    def _k(self, key: str) -> str:
+        return f"{self._prefix}{key}"
+
+    def _t(self, tag: str) -> str:
+        return f"{self._prefix}tag:{tag}"
+
+    def get(self, key: str, default=_MISSING):
+        raw = self._client.get(self._k(key))
+        if raw is None:
+            return default
+        return json.loads(raw)
+
+    def set(self, key: str, value: Any, timeout: Optional[int] = None, tags: Iterable[str] = ()):
+        pipe = self._client.pipeline()
+        pipe.set(self._k(key), json.dumps(value, ensure_ascii=False), ex=timeout or None)
+        for tag in tags:
+            pipe.sadd(self._t(tag), key)
+        pipe.execute()
+
+    def delete(self, key: str) -> bool:
+        return bool(self._client.delete(self._k(key)))
+
+    def invalidate_tags(self, tags: Iterable[str]) -> int:
+        removed = 0
+        for tag in tags:
+            keys = self._client.smembers(self._t(tag))
+            if keys:
+                removed += self._client.delete(*[self._k(k.decode('utf-8')) for k in keys])
+            self._client.delete(self._t(tag))
+        return removed
+
+    def clear(self):
+        for key in self._client.scan_iter(f"{self._prefix}*"):
+            self._client.delete(key)
+
+    def size(self) -> int:
+        return sum(1 for _ in self._client.scan_iter(f"{self._prefix}*"))
+
+
+class ResultCache:
+    """缓存门面：统一后端选择、默认 TTL 与命中统计"""
+
+    def __init__(self, app=None):
+        self.backend = MemoryCacheBackend()
+        self.enabled = True
+        self.default_timeout = 300
+        self._stats_lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'sets': 0, 'invalidations': 0, 'skipped': 0}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.enabled = app.config.get('CACHE_ENABLED', True)
+        self.default_timeout = app.config.get('CACHE_DEFAULT_TIMEOUT', 300)
+        backend = (app.config.get('CACHE_BACKEND') or 'memory').lower()
+        if backend == 'redis':
+            self.backend = RedisCacheBackend(app.config['CACHE_REDIS_URL'])
+        else:
+            self.backend = MemoryCacheBackend(app.config.get('CACHE_MAX_ENTRIES', 1024))
+        app.extensions['result_cache'] = self
+        logger.info(f"结果缓存已初始化: backend={backend}, enabled={self.enabled}")
+
+    def get(self, key: str, default=None):
+        if not self.enabled:
+            return default
+        try:
+            value = self.backend.get(key, _MISSING)
+        except Exception as e:
+            logger.warning(f"缓存读取失败: {e}")
+            value = _MISSING
+        self._count('hits' if value is not _MISSING else 'misses')
+        return default if value is _MISSING else value
+
+    def set(self, key: str, value: Any, timeout: Optional[int] = None, tags: Iterable[str] = ()):
+        if not self.enabled:
+            return
+        if replica_fill_blocked():
+            self._count('skipped')
+            logger.debug(f"副本读取结果不回填缓存: {key}")
+            return
+        try:
+            self.backend.set(key, value, timeout if timeout is not None else self.default_timeout, tags)
+            self._count('sets')
+        except Exception as e:
+            logger.warning(f"缓存写入失败: {e}")
+
+    def delete(self, key: str) -> bool:
+        try:
+            return self.backend.delete(key)
+        except Exception as e:
+            logger.warning(f"缓存删除失败: {e}")
+            return False
+
+    def invalidate_tags(self, tags: Iterable[str]) -> int:
+        tags = list(tags)
+        try:
+            removed = self.backend.invalidate_tags(tags)
+        except Exception as e:
+            logger.warning(f"缓存标签失效失败: {e}")
+            return 0
+        self._count('invalidations', removed)
+        if removed:
+            logger.debug(f"缓存失效: tags={tags}, 移除 {removed} 条")
+        return removed
+
+    def clear(self):
+        self.backend.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            data = dict(self._stats)
+        lookups = data['hits'] + data['misses']
+        data['hit_rate'] = round(data['hits'] / lookups, 4) if lookups else 0.0
+        data['evictions'] = getattr(self.backend, 'evictions', 0)
+        data['expirations'] = getattr(self.backend, 'expirations', 0)
+        try:
+            data['size'] = self.backend.size()
+        except Exception:
+            data['size'] = None
+        data['backend'] = type(self.backend).__name__
+        data['enabled'] = self.enabled
+        return data
+
+    def _count(self, name: str, amount: int = 1):
+        with self._stats_lock:
+            self._stats[name] += amount
@@ -0,0 +1,25 @@
+"""cli.py
+Flask 命令行维护命令（backend 目录下执行）:
+    flask --app app stats rebuild [--dry-run] [--batch-size 500]
+"""
+import json
+
+import click
+from flask.cli import AppGroup
+
+stats_cli = AppGroup('stats', help='统计数据维护')
+
+
+@stats_cli.command('rebuild')
+@click.option('--dry-run', is_flag=True, help='只输出偏差报告，不写入修正')
+@click.option('--batch-size', type=int, default=500, show_default=True, help='每批写回的行数')
+def rebuild_stats(dry_run, batch_size):
+    """由事件与已完赛比赛全量重算统计，输出偏差报告并修正"""
+    from app.services.stats_rebuild_service import StatsRebuildService
+
+    report = StatsRebuildService.rebuild(apply=not dry_run, batch_size=batch_size)
+    click.echo(json.dumps(report, ensure_ascii=False, indent=2, default=str))
+
+
+def register_cli(app) -> None:
+    app.cli.add_command(stats_cli)
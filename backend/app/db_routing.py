@@ -0,0 +1,177 @@
+"""db_routing.py
+读写分离: 标注为只读的服务方法/路由在满足条件时把查询发往只读副本（bind 'replica'）。
+
+路由规则（RoutingSession.get_bind）:
+  - 仅在 @read_replica 标注的调用内、且配置了 replica bind 时使用副本
+  - 会话正在 flush、有未提交的写入或本事务已写入时始终使用主库
+  - 读己之写: 客户端写入成功后响应写入 cookie，窗口（READ_REPLICA_STICKY_SECONDS）内该客户端的请求全部走主库
+  - 防止旧数据回填缓存: 提交写入时在结果缓存中记录最近写入时间（CACHE_BACKEND=redis 时各进程共享），
+    同一窗口内读过副本的请求不写入结果缓存（ResultCache.set 调用 replica_fill_blocked 判断），
+    避免缓存刚被失效就由尚未同步的副本回填旧数据
+  - primary_scope() 内始终走主库（优先于只读标注），用于读取后回写的流程（如排行榜快照刷新），
+    避免以副本上的旧数据回写并标记为最新
+
+配置:
+  DATABASE_REPLICA_URI=mysql+pymysql://...   # 未配置时全部走主库
+  READ_REPLICA_STICKY_SECONDS=5
+使用方式:
+  @read_replica                    # 服务类（包装全部公开/私有方法）或单个函数/路由
+  class StatsService: ...
+  with primary_scope(): ...        # 也可作装饰器 @primary_scope()
+"""
+import functools
+import inspect
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from flask import current_app, g, has_app_context, has_request_context, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event as sa_event
+
+REPLICA_BIND = 'replica'
+STICKY_COOKIE = 'db_primary_until'
+
+_read_only: ContextVar[bool] = ContextVar('db_read_only', default=False)
+_force_primary: ContextVar[bool] = ContextVar('db_force_primary', default=False)
+_WROTE_KEY = '_db_routing_wrote'
+LAST_WRITE_KEY = 'db_routing:last_write'
+
+
+def _wrap(fn):
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        token = _read_only.set(True)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _read_only.reset(token)
+    return wrapper
+
+
+def read_replica(target):
+    """标注只读调用；用于类时包装其中定义的全部方法（含 staticmethod / classmethod）"""
+    if not inspect.isclass(target):
+        return _wrap(target)
+    for name, attr in list(vars(target).items()):
+        if name.startswith('__'):
+            continue
+        if isinstance(attr, staticmethod):
+            setattr(target, name, staticmethod(_wrap(attr.__func__)))
+        elif isinstance(attr, classmethod):
+            setattr(target, name, classmethod(_wrap(attr.__func__)))
+        elif inspect.isfunction(attr):
+            setattr(target, name, _wrap(attr))
+    return target
+
+
+@contextmanager
+def primary_scope():
+    """范围内的查询始终发往主库，内层的只读标注不再生效"""
+    token = _force_primary.set(True)
+    try:
+        yield
+    finally:
+        _force_primary.reset(token)
+
+
+def _sticky_seconds() -> int:
+    return current_app.config.get('READ_REPLICA_STICKY_SECONDS', 5)
+
+
+def _replica_configured() -> bool:
+    return has_app_context() and bool((current_app.config.get('SQLALCHEMY_BINDS') or {}).get(REPLICA_BIND))
+
+
+def _pinned_to_primary() -> bool:
+    return has_request_context() and bool(getattr(g, 'ctx', None) and g.ctx.get('db_primary'))
+
+
+def _record_write() -> None:
+    """记录最近写入时间；直接写后端，不经过 ResultCache.set 的回填检查"""
+    from app.extensions import cache
+
+    seconds = _sticky_seconds()
+    if seconds <= 0 or not cache.enabled:
+        return
+    try:
+        cache.backend.set(LAST_WRITE_KEY, time.time(), seconds)
+    except Exception:
+        pass  # 记录失败只削弱回填保护，不影响已提交的写入
+
+
+def replica_fill_blocked() -> bool:
+    """当前请求读过副本且处于最近写入的窗口内：结果可能早于刚失效的缓存，不应写入缓存"""
+    if not (has_request_context() and getattr(g, 'ctx', None) is not None and g.ctx.get('db_replica_read')):
+        return False
+    from app.extensions import cache
+
+    try:
+        last_write = cache.backend.get(LAST_WRITE_KEY, None)
+    except Exception:
+        return True
+    return last_write is not None and time.time() - last_write < _sticky_seconds()
+
+
+class RoutingSession(Session):
+    """在 Flask-SQLAlchemy 会话基础上按只读标注选择副本"""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and _read_only.get() and not _force_primary.get() and self._can_use_replica():
+            engine = self._db.engines.get(REPLICA_BIND)
+            if engine is not None:
+                if has_request_context() and getattr(g, 'ctx', None) is not None:
+                    g.ctx.attach('db_replica_read', True)
+                return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+    def _can_use_replica(self) -> bool:
+        # 有待写入或本事务已写入时留在主库（查询前的 autoflush 会先置位写入标记）
+        if self._flushing or self.info.get(_WROTE_KEY) or not self._is_clean():
+            return False
+        return not _pinned_to_primary()
+
+
+def _after_flush(session, flush_context):
+    session.info[_WROTE_KEY] = True
+
+
+def _after_commit(session):
+    if session.info.pop(_WROTE_KEY, None):
+        if _replica_configured():
+            _record_write()
+        if has_request_context() and getattr(g, 'ctx', None) is not None:
+            g.ctx.attach('db_wrote', True)
+
+
+def _after_rollback(session):
+    session.info.pop(_WROTE_KEY, None)
+
+
+def register_replica_routing(app, session) -> None:
+    """挂载写入标记与读己之写 cookie（幂等）"""
+    for name, fn in (('after_flush', _after_flush),
+                     ('after_commit', _after_commit),
+                     ('after_rollback', _after_rollback)):
+        if not sa_event.contains(session, name, fn):
+            sa_event.listen(session, name, fn)
+
+    if not (app.config.get('SQLALCHEMY_BINDS') or {}).get(REPLICA_BIND):
+        return
+
+    @app.before_request
+    def _pin_recent_writer():
+        try:
+            until = float(request.cookies.get(STICKY_COOKIE, 0))
+        except ValueError:
+            until = 0
+        if until > time.time():
+            g.ctx.attach('db_primary', True)
+
+    @app.after_request
+    def _mark_recent_writer(response):
+        if getattr(g, 'ctx', None) is not None and g.ctx.get('db_wrote'):
+            seconds = _sticky_seconds()
+            response.set_cookie(STICKY_COOKIE, str(time.time() + seconds), max_age=seconds,
+                                httponly=True, samesite='Lax')
+        return response
@@ -7,10 +7,22 @@ from flask_jwt_extended import JWTManager
 from flask_cors import CORS
 import logging
 
+from app.cache import ResultCache
+from app.live import LiveHub
+from app.name_index import TournamentNameIndex
+from app.pool_metrics import PoolMonitor
+from app.request_metrics import RequestMetrics
+from app.db_routing import RoutingSession
+
 # 延迟创建的扩展实例
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 jwt = JWTManager()
 cors = CORS  # CORS 不是实例化形式, 直接引用工厂
+cache = ResultCache()
+live_hub = LiveHub()
+tournament_index = TournamentNameIndex()
+pool_monitor = PoolMonitor()
+request_metrics = RequestMetrics()
 
 # 使用原生 logging 避免循环导入
 logger = logging.getLogger(__name__)
@@ -20,7 +32,13 @@ def init_extensions(app):
     # 在函数内部导入以打破循环依赖
     from app.utils.response import error_response
 
+    pool_monitor.configure(app)
     db.init_app(app)
+    pool_monitor.instrument(app, db)
+    request_metrics.init_app(app, db)
+    cache.init_app(app)
+    live_hub.init_app(app)
+    tournament_index.init_app(app)
     
     # 初始化 JWT
     jwt.init_app(app)
@@ -49,4 +67,4 @@ def init_extensions(app):
     # CORS 在 create_app 中根据配置进行更细粒度资源设置, 这里不直接调用
     return app
 
-__all__ = ["db", "jwt", "cors", "init_extensions"]
\ No newline at end of file
+__all__ = ["db", "jwt", "cors", "cache", "live_hub", "tournament_index", "pool_monitor", "request_metrics", "init_extensions"]
\ No newline at end of file
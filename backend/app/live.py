@@ -0,0 +1,267 @@
+"""live.py
+比赛实时推送中心 (publish / subscribe)，为 SSE 接口提供比分与事件增量。
+
+设计要点:
+  - 每个订阅者一个有界队列；发布时 put_nowait，队列满即判定为慢消费者并驱逐
+    （流结束并提示客户端重连），发布方永不阻塞
+  - 每场比赛维护递增序号与少量回放缓冲，客户端携带 Last-Event-ID 重连可补齐缺失增量；
+    无订阅者的比赛在完赛后或空闲 LIVE_STREAM_IDLE_SECONDS 后释放序号与回放缓冲
+  - 订阅者只等待队列，不访问数据库；写路径每次变更只发布一次
+  - LIVE_BACKEND=memory 仅在当前进程内广播；多工作进程部署使用 LIVE_BACKEND=redis:
+    发布经 Redis 频道转发，序号由 Redis 统一分配，各进程的监听线程收到后投递给本进程订阅者
+"""
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Iterator, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class Subscription:
+    """单个订阅者"""
+
+    def __init__(self, match_id: str, maxsize: int):
+        self.match_id = match_id
+        self.queue: 'queue.Queue[Tuple[int, Dict[str, Any]]]' = queue.Queue(maxsize=maxsize)
+        self.evicted = False
+        self.created_at = time.monotonic()
+
+
+class RedisRelay:
+    """跨进程转发：脚本内原子分配序号并 PUBLISH，保证各进程收到的顺序与序号一致"""
+
+    CHANNEL = 'fms:live'
+    SEQ_PREFIX = 'fms:live:seq:'
+    SEQ_TTL = 86400
+    RECONNECT_SECONDS = 1
+    _PUBLISH_SCRIPT = """
+local seq = redis.call('INCR', KEYS[1])
+redis.call('EXPIRE', KEYS[1], ARGV[3])
+return {seq, redis.call('PUBLISH', ARGV[1], seq .. ' ' .. ARGV[2])}
+"""
+
+    def __init__(self, url: str, deliver):
+        try:
+            import redis  # type: ignore
+        except ImportError as e:  # pragma: no cover - 可选依赖
+            raise RuntimeError('LIVE_BACKEND=redis 需要安装 redis 包') from e
+        self._client = redis.Redis.from_url(url)
+        self._script = self._client.register_script(self._PUBLISH_SCRIPT)
+        self._deliver = deliver
+        self._lock = threading.Lock()
+        self._pid: Optional[int] = None
+        self._ready = threading.Event()
+
+    def current_seq(self, match_id: str) -> int:
+        return int(self._client.get(f'{self.SEQ_PREFIX}{match_id}') or 0)
+
+    def publish(self, match_id: str, message: Dict[str, Any]) -> int:
+        """返回收到消息的进程数"""
+        self.ensure_listener()
+        body = json.dumps({'matchId': match_id, 'message': message}, ensure_ascii=False, default=str)
+        _, receivers = self._script(keys=[f'{self.SEQ_PREFIX}{match_id}'],
+                                    args=[self.CHANNEL, body, self.SEQ_TTL])
+        return receivers
+
+    def ensure_listener(self):
+        # 线程不随 fork 复制：按进程号判断，每个工作进程首次订阅或发布时启动自己的监听线程
+        pid = os.getpid()
+        if self._pid == pid:
+            return
+        with self._lock:
+            if self._pid == pid:
+                return
+            self._ready = threading.Event()
+            threading.Thread(target=self._listen, name='live-relay', daemon=True).start()
+            self._pid = pid
+        self._ready.wait(timeout=1)
+
+    def _listen(self):
+        while True:
+            try:
+                pubsub = self._client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self.CHANNEL)
+                self._ready.set()
+                for item in pubsub.listen():
+                    seq, body = item['data'].decode('utf-8').split(' ', 1)
+                    data = json.loads(body)
+                    self._deliver(data['matchId'], int(seq), data['message'])
+            except Exception as e:
+                logger.warning(f"实时推送中继连接中断，{self.RECONNECT_SECONDS}s 后重连: {e}")
+                time.sleep(self.RECONNECT_SECONDS)
+
+
+class LiveHub:
+    """比赛增量推送中心"""
+
+    def __init__(self, app=None):
+        self.queue_size = 100
+        self.heartbeat_seconds = 15
+        self.max_subscribers = 2000
+        self.replay_size = 50
+        self.idle_seconds = 3600
+        self.backend = 'memory'
+        self._relay: Optional[RedisRelay] = None
+        self._lock = threading.Lock()
+        self._subscribers: Dict[str, Set[Subscription]] = {}
+        self._sequences: Dict[str, int] = {}
+        self._replay: Dict[str, Deque[Tuple[int, Dict[str, Any]]]] = {}
+        self._last_active: Dict[str, float] = {}
+        self._finished: Set[str] = set()
+        self._next_sweep = 0.0
+        self._stats = {'published': 0, 'delivered': 0, 'evicted': 0, 'rejected': 0}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.queue_size = app.config.get('LIVE_STREAM_QUEUE_SIZE', 100)
+        self.heartbeat_seconds = app.config.get('LIVE_STREAM_HEARTBEAT_SECONDS', 15)
+        self.max_subscribers = app.config.get('LIVE_STREAM_MAX_SUBSCRIBERS', 2000)
+        self.replay_size = app.config.get('LIVE_STREAM_REPLAY_SIZE', 50)
+        self.idle_seconds = app.config.get('LIVE_STREAM_IDLE_SECONDS', 3600)
+        self.backend = app.config.get('LIVE_BACKEND', 'memory')
+        if self.backend == 'redis':
+            self._relay = RedisRelay(app.config.get('LIVE_REDIS_URL', 'redis://localhost:6379/0'), self._deliver)
+        app.extensions['live_hub'] = self
+
+    # ---------------- 订阅 ----------------
+    def subscribe(self, match_id: str, last_event_id: Optional[int] = None) -> Subscription:
+        """注册订阅者；超过上限时抛出 RuntimeError。携带 last_event_id 时预先放入缺失的增量"""
+        if self._relay is not None:
+            self._relay.ensure_listener()
+        with self._lock:
+            if self.subscriber_count() >= self.max_subscribers:
+                self._stats['rejected'] += 1
+                raise RuntimeError('实时订阅数已达上限')
+            sub = Subscription(match_id, self.queue_size)
+            self._subscribers.setdefault(match_id, set()).add(sub)
+            if last_event_id is not None:
+                for seq, message in self._replay.get(match_id, ()):
+                    if seq > last_event_id:
+                        try:
+                            sub.queue.put_nowait((seq, message))
+                        except queue.Full:
+                            break
+        return sub
+
+    def unsubscribe(self, sub: Subscription):
+        with self._lock:
+            subs = self._subscribers.get(sub.match_id)
+            if subs is not None:
+                subs.discard(sub)
+                if not subs:
+                    del self._subscribers[sub.match_id]
+                    self._release_if_done(sub.match_id, time.monotonic())
+
+    def current_seq(self, match_id: str) -> int:
+        """已发布的最大序号（快照附带，客户端据此丢弃快照已包含的增量）"""
+        if self._relay is not None:
+            return self._relay.current_seq(match_id)
+        with self._lock:
+            return self._sequences.get(match_id, 0)
+
+    # ---------------- 发布 ----------------
+    def publish(self, match_id: str, message: Dict[str, Any]) -> int:
+        """向比赛的全部订阅者发布增量；返回成功投递数（redis 后端为收到消息的进程数）"""
+        if self._relay is not None:
+            return self._relay.publish(match_id, message)
+        return self._deliver(match_id, None, message)
+
+    def _deliver(self, match_id: str, seq: Optional[int], message: Dict[str, Any]) -> int:
+        """记入回放缓冲并投递给本进程订阅者；seq 为空时在本进程内分配"""
+        with self._lock:
+            if seq is None:
+                seq = self._sequences.get(match_id, 0) + 1
+                self._sequences[match_id] = seq
+            self._replay.setdefault(match_id, deque(maxlen=self.replay_size)).append((seq, message))
+            subs = list(self._subscribers.get(match_id, ()))
+            self._stats['published'] += 1
+            now = time.monotonic()
+            self._last_active[match_id] = now
+            if message.get('type') == 'match.finished':
+                self._finished.add(match_id)
+                self._release_if_done(match_id, now)
+            if now >= self._next_sweep:
+                self._next_sweep = now + 60
+                for idle_id in list(self._last_active):
+                    self._release_if_done(idle_id, now)
+
+        delivered = 0
+        slow: List[Subscription] = []
+        for sub in subs:
+            try:
+                sub.queue.put_nowait((seq, message))
+                delivered += 1
+            except queue.Full:
+                slow.append(sub)
+
+        for sub in slow:
+            sub.evicted = True
+            self.unsubscribe(sub)
+        with self._lock:
+            self._stats['delivered'] += delivered
+            self._stats['evicted'] += len(slow)
+        if slow:
+            logger.warning(f"比赛 {match_id} 驱逐 {len(slow)} 个慢消费者")
+        return delivered
+
+    def _release_if_done(self, match_id: str, now: float):
+        """无订阅者且已完赛或空闲超时：释放序号与回放缓冲（调用方持有锁）。
+        有订阅者时保留，避免序号重新从 1 开始后被客户端当作旧增量丢弃"""
+        if match_id in self._subscribers:
+            return
+        if match_id in self._finished or now - self._last_active.get(match_id, now) > self.idle_seconds:
+            self._sequences.pop(match_id, None)
+            self._replay.pop(match_id, None)
+            self._last_active.pop(match_id, None)
+            self._finished.discard(match_id)
+
+    # ---------------- SSE 输出 ----------------
+    def stream(self, sub: Subscription, initial: Optional[Dict[str, Any]] = None) -> Iterator[str]:
+        """生成 SSE 文本流：先输出初始快照，随后输出增量；空闲时发送心跳注释"""
+        try:
+            yield f"retry: {self.heartbeat_seconds * 1000}\n\n"
+            if initial is not None:
+                yield self._format(None, initial)
+            while True:
+                if sub.evicted:
+                    yield self._format(None, {'type': 'evicted', 'reason': 'slow_consumer'})
+                    return
+                try:
+                    seq, message = sub.queue.get(timeout=self.heartbeat_seconds)
+                except queue.Empty:
+                    yield ": heartbeat\n\n"
+                    continue
+                yield self._format(seq, message)
+        finally:
+            # 客户端断开（GeneratorExit）或被驱逐时清理订阅
+            self.unsubscribe(sub)
+
+    @staticmethod
+    def _format(seq: Optional[int], message: Dict[str, Any]) -> str:
+        lines = []
+        if seq is not None:
+            lines.append(f"id: {seq}")
+        lines.append(f"event: {message.get('type', 'message')}")
+        lines.append(f"data: {json.dumps(message, ensure_ascii=False, default=str)}")
+        return '\n'.join(lines) + '\n\n'
+
+    # ---------------- 观测 ----------------
+    def subscriber_count(self, match_id: Optional[str] = None) -> int:
+        if match_id is not None:
+            return len(self._subscribers.get(match_id, ()))
+        return sum(len(s) for s in self._subscribers.values())
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            data = dict(self._stats)
+            data['backend'] = self.backend
+            data['subscribers'] = self.subscriber_count()
+            data['matches'] = len(self._subscribers)
+            data['tracked_matches'] = len(self._replay)
+        return data
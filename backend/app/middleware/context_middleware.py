@@ -1,16 +1,27 @@
 """context_middleware.py
-为请求提供一个统一的 g.ctx 容器: 结构 { attached: {<模块>: 任意} }
+为请求提供一个统一的 g.ctx 容器: 结构 { attached: {<模块>: 任意}, memo: {<键>: 实体} }
 中间件和路由之间通过 g.ctx.attached 传递派生数据, 避免随意向 g 挂载散乱属性。
 使用方式:
   在需要的地方: from flask import g; g.ctx.attach('team', team_obj)
   读取: team = g.ctx.get('team')
+
+请求级记忆缓存: 同一请求内同一实体最多查询一次
+  g.ctx.memo(('Tournament', 3), lambda: db.session.get(Tournament, 3))
+  批量预热: g.ctx.prime({('Tournament', t.id): t for t in tournaments})
+  模型属性/服务中使用 request_memo(key, loader)，无请求上下文时直接调用 loader。
+会话每次 flush / 回滚后清空记忆缓存，避免写入后读到旧结果。
 """
 from dataclasses import dataclass, field
-from flask import g
+from typing import Any, Callable, Hashable, Mapping
+
+from flask import g, has_request_context
+from sqlalchemy import event as sa_event
+
 
 @dataclass
 class RequestContext:
     attached: dict = field(default_factory=dict)
+    memoized: dict = field(default_factory=dict)
 
     def attach(self, key: str, value):
         self.attached[key] = value
@@ -18,8 +29,56 @@ class RequestContext:
     def get(self, key: str, default=None):
         return self.attached.get(key, default)
 
+    def memo(self, key: Hashable, loader: Callable[[], Any]):
+        """返回键对应的记忆值，未命中时调用 loader 并记录（None 同样记录）"""
+        if key in self.memoized:
+            return self.memoized[key]
+        value = loader()
+        self.memoized[key] = value
+        return value
+
+    def prime(self, entries: Mapping[Hashable, Any]):
+        """批量写入已加载的实体，后续 memo 直接命中"""
+        self.memoized.update(entries)
+
+    def forget(self, key: Hashable = None):
+        """移除单个键；不传键时清空全部记忆值"""
+        if key is None:
+            self.memoized.clear()
+        else:
+            self.memoized.pop(key, None)
+
 
 def ensure_request_context():
     if not hasattr(g, 'ctx'):
         g.ctx = RequestContext()  # type: ignore[attr-defined]
     return g.ctx
+
+
+def _current_context():
+    return ensure_request_context() if has_request_context() else None
+
+
+def request_memo(key: Hashable, loader: Callable[[], Any]):
+    """请求内记忆查询；请求之外（CLI、后台任务）直接调用 loader"""
+    ctx = _current_context()
+    return ctx.memo(key, loader) if ctx is not None else loader()
+
+
+def request_prime(entries: Mapping[Hashable, Any]):
+    ctx = _current_context()
+    if ctx is not None:
+        ctx.prime(entries)
+
+
+def _clear_memo(*_args):
+    ctx = _current_context()
+    if ctx is not None:
+        ctx.forget()
+
+
+def register_memo_invalidation(session) -> None:
+    """会话写入（flush）或回滚后清空请求级记忆缓存（幂等）"""
+    for name in ('after_flush', 'after_soft_rollback'):
+        if not sa_event.contains(session, name, _clear_memo):
+            sa_event.listen(session, name, _clear_memo)
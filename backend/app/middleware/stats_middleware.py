@@ -3,7 +3,7 @@
 """
 
 from functools import wraps
-from flask import request, jsonify
+from flask import request, jsonify, current_app
 from app.utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -43,41 +43,100 @@ def log_stats_operation(operation_type: str):
     return decorator
 
 
+# 参与缓存键与失效标签的作用域参数（查询参数或路由参数）
+CACHE_SCOPE_PARAMS = ('season_id', 'competition_id', 'tournament_id')
+
+
+def stats_cache_tags(scope: dict) -> list:
+    """根据作用域参数生成缓存失效标签；未限定作用域的结果标记为 scope:all"""
+    tags = ['stats'] + [f"{name[:-3]}:{value}" for name, value in scope.items() if value not in (None, '')]
+    if len(tags) == 1:
+        tags.append('scope:all')
+    return tags
+
+
 def cache_stats_result(cache_timeout: int = 300):
     """
     缓存统计结果的装饰器工厂
     
+    缓存键由视图名、全部查询参数与路由参数组成（稳定字符串，跨进程一致），
+    仅缓存 200 响应的 JSON 正文；按赛季/竞赛/赛事作用域打标签以便精确失效。
+    
     Args:
         cache_timeout (int): 缓存超时时间（秒），默认5分钟
     """
     def decorator(f):
         @wraps(f)
         def decorated_function(*args, **kwargs):
+            from app.extensions import cache
+
+            args_part = '&'.join(
+                f"{k}={v}" for k, v in sorted(request.args.items(multi=True))
+            )
+            kwargs_part = '&'.join(f"{k}={v}" for k, v in sorted(kwargs.items()))
+            cache_key = f"stats:{f.__name__}:{kwargs_part}:{args_part}"
+
+            cached = cache.get(cache_key)
+            if cached is not None:
+                logger.debug(f"统计缓存命中: {cache_key}")
+                return current_app.response_class(
+                    cached['body'], status=cached['status'], mimetype=cached['mimetype']
+                )
+
+            result = f(*args, **kwargs)
+
+            response, status = (result[0], result[1]) if isinstance(result, tuple) else (result, None)
             try:
-                # 生成缓存键
-                cache_key = f"stats_{f.__name__}_{hash(str(kwargs))}"
-                
-                # 这里可以集成Redis或其他缓存系统
-                # 目前只是记录日志，实际缓存逻辑需要根据项目需求实现
-                logger.debug(f"统计缓存键: {cache_key}")
-                
-                # 执行原函数
-                result = f(*args, **kwargs)
-                
-                # 记录缓存操作
-                logger.debug(f"统计结果已缓存: {cache_key}")
-                
-                return result
-                
+                status = status or getattr(response, 'status_code', None)
+                if status == 200 and hasattr(response, 'get_data'):
+                    scope = {
+                        name: kwargs.get(name, request.args.get(name))
+                        for name in CACHE_SCOPE_PARAMS
+                    }
+                    cache.set(cache_key, {
+                        'body': response.get_data(as_text=True),
+                        'status': status,
+                        'mimetype': response.mimetype,
+                    }, timeout=cache_timeout, tags=stats_cache_tags(scope))
+                    logger.debug(f"统计结果已缓存: {cache_key}")
             except Exception as e:
-                logger.warning(f"统计缓存操作失败: {str(e)}")
                 # 缓存失败不影响主要功能
-                return f(*args, **kwargs)
+                logger.warning(f"统计缓存操作失败: {str(e)}")
+
+            return result
         
         return decorated_function
     return decorator
 
 
+def _invalidate_scoped_stats(sender, tournament_id=None, season_id=None, competition_id=None, **_):
+    """赛事内数据变更：仅失效该赛事/赛季/竞赛及未限定作用域的统计缓存"""
+    from app.extensions import cache
+    tags = ['scope:all']
+    if tournament_id is not None:
+        tags.append(f"tournament:{tournament_id}")
+    if season_id is not None:
+        tags.append(f"season:{season_id}")
+    if competition_id is not None:
+        tags.append(f"competition:{competition_id}")
+    cache.invalidate_tags(tags)
+
+
+def _invalidate_all_stats(sender, **_):
+    """基础数据（名称等）变更：统计结果中的展示字段可能全部受影响"""
+    from app.extensions import cache
+    cache.invalidate_tags(['stats'])
+
+
+def connect_stats_cache_invalidation():
+    """订阅领域变更通知以精确失效统计缓存"""
+    from app import signals
+    for signal in (signals.event_changed, signals.match_changed,
+                   signals.match_finished, signals.roster_changed):
+        signal.connect(_invalidate_scoped_stats)
+    signals.reference_changed.connect(_invalidate_all_stats)
+
+
 def handle_stats_errors(f):
     """
     统计错误处理装饰器
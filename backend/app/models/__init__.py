@@ -9,9 +9,11 @@ from app.models.tournament import Tournament
 from app.models.competition import Competition
 from app.models.season import Season
 from app.models.player_team_history import PlayerTeamHistory
+from app.models.leaderboard_snapshot import LeaderboardSnapshot
 
 # 确保所有模型可以通过 app.models 直接访问
 __all__ = [
     'User', 'Player', 'Team', 'TeamBase', 'TeamTournamentParticipation',
-    'Match', 'Event', 'Tournament', 'Competition', 'Season', 'PlayerTeamHistory'
+    'Match', 'Event', 'Tournament', 'Competition', 'Season', 'PlayerTeamHistory',
+    'LeaderboardSnapshot'
 ]
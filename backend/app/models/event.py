@@ -75,7 +75,7 @@ class Event(db.Model):
             if not self.team_participation:
                 return None
             from .team import Team
-            return Team.query.filter_by(team_base_id=self.team_participation.team_base_id,
-                                        tournament_id=self.team_participation.tournament_id).first()
+            return Team.find_by_participation(self.team_participation.team_base_id,
+                                              self.team_participation.tournament_id)
         except Exception:
             return None
\ No newline at end of file
@@ -0,0 +1,47 @@
+from app.database import db
+from datetime import datetime
+
+class LeaderboardSnapshot(db.Model):
+    """排行榜快照表 - 按 (竞赛, 赛季, 榜单类型) 物化的排行榜结果"""
+    __tablename__ = 'leaderboard_snapshot'
+
+    # 榜单类型
+    BOARD_PLAYER_GOALS = 'player_goals'
+    BOARD_TEAM_GOALS = 'team_goals'
+    BOARD_PLAYER_CARDS = 'player_cards'
+    BOARD_TEAM_CARDS = 'team_cards'
+    BOARD_POINTS = 'points'
+    BOARD_TYPES = (BOARD_PLAYER_GOALS, BOARD_TEAM_GOALS, BOARD_PLAYER_CARDS, BOARD_TEAM_CARDS, BOARD_POINTS)
+
+    # 主键
+    id = db.Column('快照ID', db.Integer, primary_key=True, comment='快照ID')
+
+    # 作用域
+    competition_id = db.Column('competition_id', db.Integer,
+                              db.ForeignKey('competition.competition_id', ondelete='CASCADE'),
+                              nullable=False, comment='竞赛ID')
+    season_id = db.Column('season_id', db.Integer,
+                         db.ForeignKey('season.season_id', ondelete='CASCADE'),
+                         nullable=False, comment='赛季ID')
+    board_type = db.Column('榜单类型', db.String(20), nullable=False, comment='榜单类型')
+
+    # 快照内容
+    payload = db.Column('榜单数据', db.JSON, nullable=False, comment='榜单数据(JSON)')
+
+    # 版本：变更版本 != 刷新版本 即视为过期（写入方递增变更版本，刷新方回写读取时的变更版本）
+    change_seq = db.Column('变更版本', db.Integer, nullable=False, default=0, comment='变更版本')
+    refreshed_seq = db.Column('刷新版本', db.Integer, nullable=False, default=0, comment='刷新版本')
+    refreshed_at = db.Column('刷新时间', db.DateTime, default=datetime.utcnow, comment='刷新时间')
+
+    # 索引
+    __table_args__ = (
+        db.UniqueConstraint('competition_id', 'season_id', '榜单类型', name='uk_leaderboard_scope'),
+        db.Index('idx_leaderboard_season', 'season_id'),
+    )
+
+    @property
+    def is_stale(self):
+        return self.change_seq != self.refreshed_seq
+
+    def __repr__(self):
+        return f'<LeaderboardSnapshot {self.competition_id}/{self.season_id}/{self.board_type}>'
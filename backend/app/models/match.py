@@ -43,6 +43,7 @@ class Match(db.Model):
         db.Index('idx_match_away_team', '客队ID'),
         db.Index('idx_match_tournament', '赛事ID'),
         db.Index('idx_match_time', '比赛时间'),
+        db.Index('idx_match_name', '比赛名称'),
         db.Index('idx_match_status', '比赛状态'),
         db.CheckConstraint("比赛状态 in ('F','P')", name='match_chk_1'),
     )
@@ -53,8 +53,7 @@ class PlayerTeamHistory(db.Model):
             if not participation:
                 return None
             from .team import Team
-            return Team.query.filter_by(team_base_id=participation.team_base_id,
-                                        tournament_id=participation.tournament_id).first()
+            return Team.find_by_participation(participation.team_base_id, participation.tournament_id)
         except Exception:
             return None
 
@@ -29,9 +29,13 @@ class Team(db.Model):
     @property
     def participation_record(self):
         from .team_tournament_participation import TeamTournamentParticipation
+        from app.middleware.context_middleware import request_memo
         if not self.team_base_id or not self.tournament_id:
             return None
-        return TeamTournamentParticipation.query.filter_by(球队基础ID=self.team_base_id, 赛事ID=self.tournament_id).first()
+        return request_memo(
+            ('TeamTournamentParticipation', self.team_base_id, self.tournament_id),
+            lambda: TeamTournamentParticipation.query.filter_by(team_base_id=self.team_base_id, tournament_id=self.tournament_id).first()
+        )
 
     @property
     def player_histories(self):
@@ -46,7 +50,16 @@ class Team(db.Model):
     @property
     def tournament(self):
         from .tournament import Tournament
-        return Tournament.query.get(self.tournament_id) if self.tournament_id else None
+        return Tournament.get_memoized(self.tournament_id)
+
+    @staticmethod
+    def find_by_participation(team_base_id, tournament_id):
+        """按 (基础球队, 赛事) 查找视图记录，请求内记忆"""
+        from app.middleware.context_middleware import request_memo
+        return request_memo(
+            ('Team', team_base_id, tournament_id),
+            lambda: Team.query.filter_by(team_base_id=team_base_id, tournament_id=tournament_id).first()
+        )
     
     def __repr__(self):
         return f'<Team {self.name}>'
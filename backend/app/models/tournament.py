@@ -40,6 +40,20 @@ class Tournament(db.Model):
         season_name = self.season.name if self.season else 'Unknown'
         return f'<Tournament {competition_name} - {season_name}>'
     
+    @staticmethod
+    def get_memoized(tournament_id):
+        """按ID获取赛事，同一请求内只查询一次"""
+        if not tournament_id:
+            return None
+        from app.middleware.context_middleware import request_memo
+        return request_memo(('Tournament', tournament_id), lambda: db.session.get(Tournament, tournament_id))
+
+    @staticmethod
+    def prime_memo(tournaments):
+        """将已加载的赛事写入请求级记忆缓存"""
+        from app.middleware.context_middleware import request_prime
+        request_prime({('Tournament', tournament.id): tournament for tournament in tournaments})
+    
     @property
     def name(self):
         """返回赛事名称，保持向后兼容"""
@@ -0,0 +1,131 @@
+"""name_index.py
+进程内赛事名称索引: 由 (赛事实例ID, 赛事类型名称) 一次查询构建，按名称查找时不再扫描数据库表。
+
+匹配顺序（与原 SQL 查找一致，依次放宽）:
+  1. 原始名称精确匹配
+  2. 规范化后精确匹配（NFKC + casefold + 去除全部空白，覆盖 TournamentUtils 的名称变体）
+  3. 规范化后子串匹配（二元组倒排表求交得到候选，再逐个确认）
+
+索引惰性构建；竞赛/赛季/赛事写入后由领域通知标记失效，下次查找时重建。
+多进程部署时其他进程的索引依赖 TOURNAMENT_NAME_INDEX_TTL 过期兜底。
+使用方式:
+  from app.extensions import tournament_index
+  tournament_ids, all_names = tournament_index.lookup('联赛')
+"""
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set, Tuple
+
+GRAM_SIZE = 2
+
+
+def _grams(text: str) -> Set[str]:
+    if len(text) < GRAM_SIZE:
+        return {text} if text else set()
+    return {text[i:i + GRAM_SIZE] for i in range(len(text) - GRAM_SIZE + 1)}
+
+
+@dataclass
+class _Snapshot:
+    """构建后只读，查找无需加锁"""
+    all_names: List[str] = field(default_factory=list)
+    by_name: Dict[str, List[int]] = field(default_factory=dict)
+    by_normalized: Dict[str, List[int]] = field(default_factory=dict)
+    normalized: List[str] = field(default_factory=list)
+    postings: Dict[str, Set[int]] = field(default_factory=dict)
+    built_at: float = 0.0
+
+
+class TournamentNameIndex:
+    """赛事名称 -> 赛事实例ID 列表"""
+
+    def __init__(self, ttl: int = 300):
+        self.ttl = ttl
+        self._snapshot: Optional[_Snapshot] = None
+        self._lock = threading.Lock()
+        self._generation = 0
+        self.builds = 0
+
+    def init_app(self, app):
+        self.ttl = app.config.get('TOURNAMENT_NAME_INDEX_TTL', self.ttl)
+        self._snapshot = None
+
+    def invalidate(self):
+        with self._lock:
+            self._generation += 1
+            self._snapshot = None
+
+    def lookup(self, name: str) -> Tuple[List[int], List[str]]:
+        """返回 (匹配的赛事实例ID 升序, 全部赛事名称)；需在应用上下文内调用"""
+        from app.utils.tournament_utils import TournamentUtils
+
+        snapshot = self._current()
+        ids = snapshot.by_name.get(name)
+        if not ids:
+            key = TournamentUtils.normalize_tournament_name(name)
+            ids = snapshot.by_normalized.get(key) or self._substring(snapshot, key)
+        return sorted(ids), list(snapshot.all_names)
+
+    def stats(self) -> Dict[str, int]:
+        snapshot = self._snapshot
+        return {
+            'builds': self.builds,
+            'names': len(snapshot.normalized) if snapshot else 0,
+            'tournaments': len(snapshot.all_names) if snapshot else 0,
+        }
+
+    @staticmethod
+    def _substring(snapshot: _Snapshot, key: str) -> List[int]:
+        if len(key) < GRAM_SIZE:
+            # 空串或单字无法用二元组筛选，直接遍历（去重后的名称数量很小）
+            candidates = range(len(snapshot.normalized))
+        else:
+            candidates = set.intersection(*(snapshot.postings.get(gram, set()) for gram in _grams(key)))
+        ids: List[int] = []
+        for i in candidates:
+            if key in snapshot.normalized[i]:
+                ids.extend(snapshot.by_normalized[snapshot.normalized[i]])
+        return ids
+
+    def _current(self) -> _Snapshot:
+        snapshot = self._snapshot
+        if snapshot is not None and (not self.ttl or time.monotonic() - snapshot.built_at < self.ttl):
+            return snapshot
+        with self._lock:
+            snapshot = self._snapshot
+            if snapshot is not None and (not self.ttl or time.monotonic() - snapshot.built_at < self.ttl):
+                return snapshot
+            generation = self._generation
+        snapshot = self._build()
+        with self._lock:
+            # 构建期间发生写入则不保存，下次查找重新构建
+            if generation == self._generation:
+                self._snapshot = snapshot
+        return snapshot
+
+    def _build(self) -> _Snapshot:
+        from app.extensions import db
+        from app.models.competition import Competition
+        from app.models.tournament import Tournament
+        from app.utils.tournament_utils import TournamentUtils
+
+        rows = db.session.query(Tournament.id, Competition.name).join(
+            Competition, Tournament.competition_id == Competition.competition_id
+        ).order_by(Tournament.id).all()
+
+        snapshot = _Snapshot(built_at=time.monotonic())
+        for tournament_id, name in rows:
+            name = name or ''
+            snapshot.all_names.append(name)
+            snapshot.by_name.setdefault(name, []).append(tournament_id)
+            key = TournamentUtils.normalize_tournament_name(name)
+            if key not in snapshot.by_normalized:
+                snapshot.by_normalized[key] = []
+                position = len(snapshot.normalized)
+                snapshot.normalized.append(key)
+                for gram in _grams(key):
+                    snapshot.postings.setdefault(gram, set()).add(position)
+            snapshot.by_normalized[key].append(tournament_id)
+        self.builds += 1
+        return snapshot
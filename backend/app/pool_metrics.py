@@ -0,0 +1,195 @@
+"""pool_metrics.py
+数据库连接池配置与观测: 由 DB_POOL_* 配置生成引擎参数，并统计每个引擎（主库/各 bind）的连接池指标。
+
+指标（按引擎名，主库为 default）:
+  - checkouts / checkins / connects: 借出、归还、新建物理连接次数
+  - checkout 耗时: 最近 N 次借出等待耗时的 p50 / p95 / max（毫秒）
+  - timeouts: 等待连接超过 DB_POOL_TIMEOUT 的次数（连接池耗尽）
+  - invalidations / soft_invalidations: 连接失效次数（断线、pre-ping 失败等）
+  - in_use / idle / overflow / peak_in_use: 当前借出数、空闲数、溢出连接数与借出峰值
+
+容量估算: 每个工作进程最多 DB_POOL_SIZE + DB_MAX_OVERFLOW 个连接，
+工作进程数 × 该值 需小于数据库 max_connections。
+使用方式:
+  from app.extensions import pool_monitor
+  pool_monitor.snapshot()
+"""
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, Optional
+
+from sqlalchemy import event as sa_event, exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import QueuePool
+
+DEFAULT_ENGINE = 'default'
+
+
+class PoolStats:
+    """单个引擎的连接池计数（线程安全）"""
+
+    def __init__(self, sample_size: int = 1024):
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=sample_size)
+        self.checkouts = 0
+        self.checkins = 0
+        self.connects = 0
+        self.timeouts = 0
+        self.invalidations = 0
+        self.soft_invalidations = 0
+        self.peak_in_use = 0
+        self.engine = None
+
+    def record_wait(self, seconds: float, timed_out: bool = False):
+        with self._lock:
+            self._latencies.append(seconds)
+            if timed_out:
+                self.timeouts += 1
+
+    def incr(self, name: str):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def observe_in_use(self, in_use: int):
+        if in_use > self.peak_in_use:
+            self.peak_in_use = in_use
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            latencies = sorted(self._latencies)
+            data = {
+                'checkouts': self.checkouts,
+                'checkins': self.checkins,
+                'connects': self.connects,
+                'timeouts': self.timeouts,
+                'invalidations': self.invalidations,
+                'soft_invalidations': self.soft_invalidations,
+                'peak_in_use': self.peak_in_use,
+                'checkout_ms': {
+                    'samples': len(latencies),
+                    'p50': _percentile_ms(latencies, 0.50),
+                    'p95': _percentile_ms(latencies, 0.95),
+                    'max': round(latencies[-1] * 1000, 3) if latencies else None,
+                },
+            }
+        data.update(_pool_state(self.engine.pool if self.engine is not None else None))
+        return data
+
+
+def _percentile_ms(values, fraction: float) -> Optional[float]:
+    if not values:
+        return None
+    index = min(len(values) - 1, int(round(fraction * (len(values) - 1))))
+    return round(values[index] * 1000, 3)
+
+
+def _pool_state(pool) -> Dict[str, Any]:
+    if pool is None:
+        return {}
+    state: Dict[str, Any] = {'pool_class': type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        state.update({
+            'size': pool.size(),
+            'max_overflow': pool._max_overflow,
+            'in_use': pool.checkedout(),
+            'idle': pool.checkedin(),
+            'overflow': max(pool.overflow(), 0),
+        })
+    return state
+
+
+class InstrumentedQueuePool(QueuePool):
+    """记录借出等待耗时与超时次数的 QueuePool（按 logging_name 找到所属引擎的计数）"""
+
+    def connect(self):
+        stats = pool_registry.get(self.logging_name)
+        started = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            if stats is not None:
+                stats.record_wait(time.perf_counter() - started, timed_out=True)
+            raise
+        if stats is not None:
+            stats.record_wait(time.perf_counter() - started)
+        return connection
+
+
+class PoolMonitor:
+    """连接池参数生成与事件挂载"""
+
+    def __init__(self):
+        self.sample_size = 1024
+
+    def get(self, name: Optional[str]) -> Optional[PoolStats]:
+        return pool_registry.get(name or DEFAULT_ENGINE)
+
+    def configure(self, app):
+        """在 db.init_app 之前调用：按 DB_POOL_* 补全主库及各 bind 的引擎参数（显式设置优先）"""
+        self.sample_size = app.config.get('DB_POOL_LATENCY_SAMPLES', self.sample_size)
+        options = dict(app.config.get('SQLALCHEMY_ENGINE_OPTIONS') or {})
+        for key, value in self.engine_options(app.config, app.config.get('SQLALCHEMY_DATABASE_URI'),
+                                              DEFAULT_ENGINE).items():
+            options.setdefault(key, value)
+        app.config['SQLALCHEMY_ENGINE_OPTIONS'] = options
+
+        binds = {}
+        for bind_key, bind in (app.config.get('SQLALCHEMY_BINDS') or {}).items():
+            bind = {'url': bind} if isinstance(bind, str) else dict(bind)
+            for key, value in self.engine_options(app.config, str(bind.get('url')), bind_key).items():
+                bind.setdefault(key, value)
+            binds[bind_key] = bind
+        app.config['SQLALCHEMY_BINDS'] = binds
+
+    @staticmethod
+    def engine_options(config, uri: Optional[str], name: str) -> Dict[str, Any]:
+        """连接池参数；SQLite 内存库由 Flask-SQLAlchemy 固定使用 StaticPool，不做设置"""
+        if not uri:
+            return {}
+        url = make_url(uri)
+        if url.get_backend_name() == 'sqlite' and url.database in (None, '', ':memory:'):
+            return {}
+        return {
+            'poolclass': InstrumentedQueuePool,
+            'pool_size': config.get('DB_POOL_SIZE', 10),
+            'max_overflow': config.get('DB_MAX_OVERFLOW', 20),
+            'pool_timeout': config.get('DB_POOL_TIMEOUT', 30),
+            'pool_recycle': config.get('DB_POOL_RECYCLE', 1800),
+            'pool_pre_ping': config.get('DB_POOL_PRE_PING', True),
+            'pool_logging_name': name,
+        }
+
+    def instrument(self, app, db):
+        """在 db.init_app 之后调用：为每个引擎挂载连接池事件"""
+        with app.app_context():
+            for bind_key, engine in db.engines.items():
+                self.attach(bind_key or DEFAULT_ENGINE, engine)
+
+    def attach(self, name: str, engine):
+        stats = pool_registry.get(name)
+        if stats is None:
+            stats = pool_registry[name] = PoolStats(self.sample_size)
+        stats.engine = engine
+
+        def on_checkout(dbapi_connection, record, proxy):
+            stats.incr('checkouts')
+            if isinstance(engine.pool, QueuePool):
+                stats.observe_in_use(engine.pool.checkedout())
+
+        handlers = {
+            'checkout': on_checkout,
+            'checkin': lambda dbapi_connection, record: stats.incr('checkins'),
+            'connect': lambda dbapi_connection, record: stats.incr('connects'),
+            'invalidate': lambda dbapi_connection, record, exception: stats.incr('invalidations'),
+            'soft_invalidate': lambda dbapi_connection, record, exception: stats.incr('soft_invalidations'),
+        }
+        for identifier, fn in handlers.items():
+            sa_event.listen(engine, identifier, fn)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {name: stats.snapshot() for name, stats in pool_registry.items()}
+
+
+# logging_name -> PoolStats，连接池重建（dispose / recreate）后仍能找到所属计数
+pool_registry: Dict[str, PoolStats] = {}
@@ -0,0 +1,104 @@
+"""query_budget.py
+N+1 查询检测与按端点查询预算（依赖 request_metrics 的请求耗时记录）。
+
+  - 每个请求按语句形状（去掉字面量/占位符、合并 IN 列表）统计重复次数，
+    同一 SELECT 形状重复达到 QUERY_REPEAT_THRESHOLD 次视为疑似 N+1，记录告警
+  - 路由用 @query_budget(n) 声明 SQL 条数上限，超出时按 QUERY_BUDGET_MODE 处理:
+      off   不统计（生产默认）
+      warn  记录告警（开发环境）
+      raise 抛出 QueryBudgetExceeded，测试用例直接失败（测试环境）
+使用方式:
+  @teams_bp.route('', methods=['GET'])
+  @query_budget(6)          # 与球队数量无关
+  def get_teams(): ...
+"""
+import re
+from collections import Counter
+from typing import List, Optional, Tuple
+
+from flask import current_app, request
+
+from app.request_metrics import current_timing
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r'\b\d+(?:\.\d+)?\b')
+_PLACEHOLDER = re.compile(r'%\(\w+\)s|%s|:\w+|\?')
+_IN_LIST = re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)')
+_VALUES_ROWS = re.compile(r'(\(\?\))(?:\s*,\s*\(\?\))+')
+_SPACES = re.compile(r'\s+')
+
+
+class QueryBudgetExceeded(AssertionError):
+    """端点 SQL 条数超出声明的预算"""
+
+
+def query_budget(max_queries: int):
+    """声明视图函数每次请求的 SQL 条数上限（不包装视图，仅做标注）"""
+    def decorator(view):
+        view.query_budget = max_queries
+        return view
+    return decorator
+
+
+def normalize_statement(statement: str) -> str:
+    """语句形状: 字面量与占位符统一为 ?，IN 列表与多行 VALUES 合并为一项"""
+    shape = _STRING.sub('?', statement)
+    shape = _PLACEHOLDER.sub('?', shape)
+    shape = _NUMBER.sub('?', shape)
+    shape = _IN_LIST.sub('(?)', shape)
+    shape = _VALUES_ROWS.sub(r'\1', shape)
+    return _SPACES.sub(' ', shape).strip()
+
+
+def repeated_shapes(statements: Counter, threshold: int) -> List[Tuple[str, int]]:
+    """重复次数达到阈值的 SELECT 形状，按次数降序"""
+    shapes: Counter = Counter()
+    for statement, count in statements.items():
+        shapes[normalize_statement(statement)] += count
+    return [(shape, count) for shape, count in shapes.most_common()
+            if count >= threshold and shape[:6].upper() == 'SELECT']
+
+
+def _budget_for_endpoint(endpoint: Optional[str]) -> Optional[int]:
+    view = current_app.view_functions.get(endpoint) if endpoint else None
+    return getattr(view, 'query_budget', None)
+
+
+def register_query_budget(app) -> None:
+    mode = app.config.get('QUERY_BUDGET_MODE', 'off')
+    if mode == 'off':
+        return
+    if not app.config.get('REQUEST_METRICS_ENABLED', True):
+        # SQL 条数由 request_metrics 的游标事件累计，未开启时 current_timing() 为空，预算不会生效
+        logger.warning(f'QUERY_BUDGET_MODE={mode} 需要 REQUEST_METRICS_ENABLED=true，查询预算检测未启用')
+        return
+    threshold = app.config.get('QUERY_REPEAT_THRESHOLD', 5)
+
+    @app.before_request
+    def _track_statements():
+        timing = current_timing()
+        if timing is not None:
+            timing.statements = Counter()
+
+    @app.after_request
+    def _check_query_budget(response):
+        timing = current_timing()
+        if timing is None or timing.statements is None:
+            return response
+        label = f'{request.method} {request.url_rule.rule if request.url_rule else request.path}'
+        repeated = repeated_shapes(timing.statements, threshold)
+        for shape, count in repeated[:3]:
+            logger.warning(f'疑似 N+1 查询: {label} 同一语句执行 {count} 次: {shape[:200]}')
+
+        budget = _budget_for_endpoint(request.endpoint)
+        if budget is not None and timing.sql_count > budget:
+            message = f'{label} 执行了 {timing.sql_count} 条 SQL，超出预算 {budget} 条'
+            if repeated:
+                message += f'（重复最多的语句 {repeated[0][1]} 次: {repeated[0][0][:200]}）'
+            if mode == 'raise':
+                raise QueryBudgetExceeded(message)
+            logger.warning(message)
+        return response
@@ -0,0 +1,201 @@
+"""request_metrics.py
+请求级耗时观测: 每个请求记录总耗时、SQL 条数与数据库耗时（游标事件）、JSON 序列化耗时。
+
+输出:
+  - 响应头 Server-Timing: db;dur=12.3;desc="5 queries", serialize;dur=1.1, app;dur=30.2, total;dur=43.6
+    （app = total - db - serialize，即 ORM 装配与业务代码耗时）
+  - 按端点（Flask endpoint + 方法）累积的直方图，/health/metrics/prometheus 以 Prometheus 文本格式输出
+
+每个工作进程独立累积；多进程部署时按实例抓取后在 Prometheus 端聚合。
+配置:
+  REQUEST_METRICS_ENABLED=true
+  SERVER_TIMING_HEADER=true      # 对外暴露耗时明细，ProductionConfig 默认关闭
+  METRICS_ALLOWED_IPS=10.0.0.0/8 # /health/metrics* 需要管理员，白名单来源（Prometheus 抓取）免登录
+使用方式:
+  from app.extensions import request_metrics
+  request_metrics.render_prometheus()
+"""
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from flask import g, has_request_context, request
+from flask.json.provider import DefaultJSONProvider
+from sqlalchemy import event as sa_event
+
+TIMING_KEY = 'timing'
+UNMATCHED_ENDPOINT = 'unmatched'  # 404 等未命中路由的请求归为一类，避免标签基数膨胀
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 25, 50, 100, 250, 500)
+
+
+@dataclass
+class RequestTiming:
+    """单个请求的耗时累计（挂在 g.ctx 上）"""
+    started: float = field(default_factory=time.perf_counter)
+    sql_count: int = 0
+    db_seconds: float = 0.0
+    serialize_seconds: float = 0.0
+    statements: Optional[Counter] = None  # 语句文本 -> 执行次数，仅开启查询预算检测时记录
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def server_timing(self, total: float) -> str:
+        other = max(total - self.db_seconds - self.serialize_seconds, 0.0)
+        return ', '.join((
+            f'db;dur={self.db_seconds * 1000:.3f};desc="{self.sql_count} queries"',
+            f'serialize;dur={self.serialize_seconds * 1000:.3f}',
+            f'app;dur={other * 1000:.3f}',
+            f'total;dur={total * 1000:.3f}',
+        ))
+
+
+def current_timing() -> Optional[RequestTiming]:
+    if not has_request_context():
+        return None
+    ctx = getattr(g, 'ctx', None)
+    return ctx.get(TIMING_KEY) if ctx is not None else None
+
+
+class TimedJSONProvider(DefaultJSONProvider):
+    """jsonify 等 JSON 编码耗时计入当前请求的 serialize"""
+
+    def dumps(self, obj, **kwargs):
+        timing = current_timing()
+        if timing is None:
+            return super().dumps(obj, **kwargs)
+        started = time.perf_counter()
+        try:
+            return super().dumps(obj, **kwargs)
+        finally:
+            timing.serialize_seconds += time.perf_counter() - started
+
+
+class Histogram:
+    """按标签分组的累积直方图（线程安全）"""
+
+    def __init__(self, name: str, help_text: str, buckets: Tuple[float, ...]):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._series: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, labels: Tuple[str, ...], value: float):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self, label_names: Tuple[str, ...]) -> List[str]:
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            items = sorted((labels, (list(s[0]), s[1], s[2])) for labels, s in self._series.items())
+        for labels, (counts, total, count) in items:
+            base = ','.join(f'{k}="{_escape(v)}"' for k, v in zip(label_names, labels))
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += bucket_count
+                le = '+Inf' if bound == float('inf') else _format_number(bound)
+                lines.append(f'{self.name}_bucket{{{base},le="{le}"}} {cumulative}')
+            lines.append(f'{self.name}_sum{{{base}}} {_format_number(total)}')
+            lines.append(f'{self.name}_count{{{base}}} {count}')
+        return lines
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_number(value: float) -> str:
+    return repr(float(value))
+
+
+class RequestMetrics:
+    """请求耗时钩子挂载与按端点直方图"""
+
+    LABELS = ('endpoint', 'method')
+
+    def __init__(self):
+        self.duration = Histogram('http_request_duration_seconds', '请求总耗时', LATENCY_BUCKETS)
+        self.db_time = Histogram('http_request_db_seconds', '请求内 SQL 执行耗时', LATENCY_BUCKETS)
+        self.serialize_time = Histogram('http_request_serialize_seconds', '请求内 JSON 序列化耗时', LATENCY_BUCKETS)
+        self.queries = Histogram('http_request_sql_queries', '请求内 SQL 语句条数', QUERY_COUNT_BUCKETS)
+        self._lock = threading.Lock()
+        self._responses: Dict[Tuple[str, str, str], int] = {}
+
+    def init_app(self, app, db):
+        from app.middleware.context_middleware import ensure_request_context
+
+        if not app.config.get('REQUEST_METRICS_ENABLED', True):
+            return
+        app.json = TimedJSONProvider(app)
+        with app.app_context():
+            for engine in db.engines.values():
+                self._attach_engine(engine)
+
+        @app.before_request
+        def _start_request_timing():
+            ensure_request_context().attach(TIMING_KEY, RequestTiming())
+
+        @app.after_request
+        def _finish_request_timing(response):
+            timing = current_timing()
+            if timing is None:
+                return response
+            total = timing.elapsed()
+            if app.config.get('SERVER_TIMING_HEADER', True):
+                response.headers['Server-Timing'] = timing.server_timing(total)
+            self.observe(request.endpoint or UNMATCHED_ENDPOINT, request.method, response.status_code,
+                         timing, total)
+            return response
+
+    @staticmethod
+    def _attach_engine(engine):
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            if context is not None:
+                context._request_timing_started = time.perf_counter()
+
+        def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            timing = current_timing()
+            if timing is None:
+                return
+            timing.sql_count += 1
+            if timing.statements is not None:
+                timing.statements[statement] += 1
+            started = getattr(context, '_request_timing_started', None)
+            if started is not None:
+                timing.db_seconds += time.perf_counter() - started
+
+        sa_event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+        sa_event.listen(engine, 'after_cursor_execute', after_cursor_execute)
+
+    def observe(self, endpoint: str, method: str, status: int, timing: RequestTiming, total: float):
+        labels = (endpoint, method)
+        self.duration.observe(labels, total)
+        self.db_time.observe(labels, timing.db_seconds)
+        self.serialize_time.observe(labels, timing.serialize_seconds)
+        self.queries.observe(labels, timing.sql_count)
+        key = (endpoint, method, str(status))
+        with self._lock:
+            self._responses[key] = self._responses.get(key, 0) + 1
+
+    def render_prometheus(self) -> str:
+        lines = ['# HELP http_requests_total 按端点与状态码的请求数', '# TYPE http_requests_total counter']
+        with self._lock:
+            responses = sorted(self._responses.items())
+        for (endpoint, method, status), count in responses:
+            lines.append(f'http_requests_total{{endpoint="{_escape(endpoint)}",method="{method}",'
+                         f'status="{status}"}} {count}')
+        for histogram in (self.duration, self.db_time, self.serialize_time, self.queries):
+            lines.extend(histogram.render(self.LABELS))
+        return '\n'.join(lines) + '\n'
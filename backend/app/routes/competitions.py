@@ -4,10 +4,14 @@ from app.services.competition_service import CompetitionService
 from app.middleware.auth_middleware import auth_required
 from app.utils.competition_utils import CompetitionUtils
 from app.schemas import CompetitionCreate, CompetitionUpdate
+from app.db_routing import read_replica
+from app.query_budget import query_budget
 
 competitions_bp = Blueprint('competitions', __name__)
 
 @competitions_bp.route('', methods=['GET'])
+@query_budget(3)
+@read_replica
 def get_competitions():
     """获取所有赛事信息"""
     try:
@@ -1,12 +1,14 @@
 """
 事件路由层 - 专注于HTTP请求处理和响应
 """
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import jwt_required
 from pydantic import ValidationError
 from app.services.event_service import EventService
 from app.schemas import EventCreate, EventUpdate, EventOut
 from app.utils.logger import get_logger
+from app.db_routing import read_replica
+from app.query_budget import query_budget
 
 events_bp = Blueprint('events', __name__)
 logger = get_logger(__name__)
@@ -19,7 +21,7 @@ def create_event():
     try:
         payload = EventCreate(**(request.get_json() or {}))
         data = payload.model_dump(by_alias=True)
-        logger.info(f"创建事件请求数据: {data}")
+        logger.debug(f"创建事件请求数据: {data}")
         
         # 调用服务层创建事件
         new_event = EventService.create_event(data)
@@ -50,19 +52,67 @@ def create_event():
         return jsonify({'status': 'error', 'message': f'创建失败: {str(e)}'}), 500
 
 
+@events_bp.route('/batch', methods=['POST'])
+@jwt_required()
+def create_events_batch():
+    """批量创建事件（同一场比赛，每条携带 match_id），转交比赛批量录入"""
+    payload = request.get_json(silent=True)
+    atomic = True
+    if isinstance(payload, dict):
+        atomic = bool(payload.get('atomic', True))
+        payload = payload.get('events')
+    if not isinstance(payload, list) or not payload:
+        return jsonify({'status': 'error', 'message': '请求体必须为非空事件数组'}), 400
+
+    match_ids = {str(item.get('matchId') or item.get('match_id') or '') for item in payload if isinstance(item, dict)}
+    if len(match_ids) != 1 or '' in match_ids:
+        return jsonify({'status': 'error', 'message': '批量事件必须属于同一场比赛'}), 400
+
+    try:
+        result = EventService.create_events_batch(match_ids.pop(), payload, atomic=atomic)
+    except ValueError as e:
+        logger.error(f"批量创建事件失败: {str(e)}")
+        return jsonify({'status': 'error', 'message': str(e)}), 400
+
+    if result['success'] == 0:
+        return jsonify({'status': 'error', 'message': '没有事件被写入', 'data': result}), 400
+    return jsonify({'status': 'success', 'message': '批量事件创建完成', 'data': result}), 201
+
+
 @events_bp.route('', methods=['GET'])
+@query_budget(8)
 @jwt_required()
+@read_replica
 def get_events():
-    """获取所有事件"""
+    """获取事件列表：支持 matchId/tournamentId/teamId/playerId/type/since/until 筛选，limit + cursor 游标分页"""
     try:
-        # 记录请求信息
-        logger.info(f"获取事件列表请求 - Headers: {dict(request.headers)}")
-        
+        filters = {
+            'match_id': request.args.get('matchId'),
+            'tournament_id': request.args.get('tournamentId', type=int),
+            'team_id': request.args.get('teamId', type=int),
+            'player_id': request.args.get('playerId'),
+            'event_type': request.args.get('type'),
+            'since': request.args.get('since'),
+            'until': request.args.get('until'),
+        }
+        limit = request.args.get('limit', type=int)
+        cursor = request.args.get('cursor')
+        if limit is not None:
+            max_limit = current_app.config.get('MAX_ITEMS_PER_PAGE', 100)
+            limit = max(1, min(limit, max_limit))
+
         # 调用服务层获取事件列表
-        events_data = EventService.get_all_events()
+        events_data, meta = EventService.list_events(filters, limit=limit, cursor=cursor)
         
         logger.info(f"成功获取事件列表，共 {len(events_data)} 条记录")
-        return jsonify({'status': 'success', 'data': events_data}), 200
+        result = {'status': 'success', 'data': events_data}
+        if meta is not None:
+            result['meta'] = meta
+        return jsonify(result), 200
+
+    except ValueError as e:
+        logger.warning(f"获取事件列表参数错误: {str(e)}")
+        return jsonify({'status': 'error', 'message': str(e)}), 400
         
     except Exception as e:
         logger.error(f"获取事件列表失败: {str(e)}", exc_info=True)
@@ -76,7 +126,7 @@ def update_event(event_id):
     try:
         payload = EventUpdate(**(request.get_json() or {}))
         data = payload.model_dump(exclude_unset=True, by_alias=True)
-        logger.info(f"更新事件 {event_id} 请求数据: {data}")
+        logger.debug(f"更新事件 {event_id} 请求数据: {data}")
         
         # 调用服务层更新事件
         updated_event = EventService.update_event(event_id, data)
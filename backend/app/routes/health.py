@@ -1,23 +1,101 @@
-from flask import Blueprint, jsonify
+import ipaddress
+from functools import wraps
+
+from flask import Blueprint, Response, current_app, jsonify, request
 from sqlalchemy import text
 from app.database import db
+from app.extensions import pool_monitor, request_metrics
+from app.middleware import admin_required
 from app.utils.logger import get_logger
+from app.utils.logging_config import logging_stats
 
 health_bp = Blueprint('health', __name__)
 logger = get_logger(__name__)
 
-@health_bp.route('/health', methods=['GET'])
-def health_check():
-    """基础健康检查: 应用/数据库状态"""
-    db_status = 'up'
+
+def _check_database():
     try:
         db.session.execute(text('SELECT 1'))
+        return 'up'
     except Exception as e:
         logger.error(f'Database health check failed: {e}')
-        db_status = 'down'
+        return 'down'
+
+
+def _pool_summary():
+    """各引擎连接池当前占用与耗尽情况"""
+    summary = {}
+    for name, stats in pool_monitor.snapshot().items():
+        capacity = stats.get('size', 0) + stats.get('max_overflow', 0) if 'size' in stats else None
+        summary[name] = {
+            'pool_class': stats.get('pool_class'),
+            'in_use': stats.get('in_use'),
+            'capacity': capacity,
+            'saturated': capacity is not None and stats.get('in_use', 0) >= capacity,
+            'timeouts': stats['timeouts'],
+            'checkout_p95_ms': stats['checkout_ms']['p95'],
+        }
+    return summary
+
+
+def _ip_allowed(address) -> bool:
+    try:
+        remote = ipaddress.ip_address(address or '')
+    except ValueError:
+        return False
+    for entry in current_app.config.get('METRICS_ALLOWED_IPS', '').split(','):
+        try:
+            if entry.strip() and remote in ipaddress.ip_network(entry.strip(), strict=False):
+                return True
+        except ValueError:
+            logger.warning(f'METRICS_ALLOWED_IPS 中的无效地址: {entry}')
+    return False
+
+
+def metrics_access(f):
+    """指标接口访问控制: 来源地址在 METRICS_ALLOWED_IPS 内放行，否则需要管理员"""
+    protected = admin_required(f)
+
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        if _ip_allowed(request.remote_addr):
+            return f(*args, **kwargs)
+        return protected(*args, **kwargs)
+    return decorated_function
+
+
+@health_bp.route('/health', methods=['GET'])
+def health_check():
+    """基础健康检查: 应用/数据库状态（公开，不含内部指标）"""
+    db_status = _check_database()
     return jsonify({
         'app': 'Football Management System',
         'version': '1.0.0',
         'db': db_status,
         'status': 'ok' if db_status == 'up' else 'degraded'
     })
+
+
+@health_bp.route('/ready', methods=['GET'])
+def readiness_check():
+    """就绪检查: 数据库不可用时返回 503，供负载均衡摘除实例（连接池占用见 /health/metrics）"""
+    db_status = _check_database()
+    ready = db_status == 'up'
+    return jsonify({
+        'ready': ready,
+        'db': db_status
+    }), 200 if ready else 503
+
+
+@health_bp.route('/metrics', methods=['GET'])
+@metrics_access
+def metrics():
+    """连接池占用概览与详细指标（借出/归还/新建/失效/超时计数与借出等待耗时分位）、异步日志计数"""
+    return jsonify({'pool': _pool_summary(), 'pools': pool_monitor.snapshot(), 'logging': logging_stats()})
+
+
+@health_bp.route('/metrics/prometheus', methods=['GET'])
+@metrics_access
+def prometheus_metrics():
+    """按端点的请求耗时/SQL 条数/数据库耗时/序列化耗时直方图（Prometheus 文本格式）"""
+    return Response(request_metrics.render_prometheus(), mimetype='text/plain; version=0.0.4')
@@ -3,11 +3,16 @@
 处理HTTP请求和响应
 """
 
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, request, jsonify, current_app
 from flask_jwt_extended import jwt_required
 from pydantic import ValidationError
 from app.services.match_service import MatchService
+from app.services.event_service import EventService
+from app.services.live_feed_service import LiveFeedService
+from app.extensions import live_hub
 from app.schemas import MatchCreate, MatchUpdate
+from app.db_routing import read_replica
+from app.query_budget import query_budget
 
 # 创建蓝图
 matches_bp = Blueprint('matches', __name__)
@@ -38,25 +43,28 @@ def complete_match(match_id: str):
 
 
 @matches_bp.route('', methods=['GET'])
+@query_budget(6)
 @jwt_required()
+@read_replica
 def get_matches():
-    """获取所有比赛"""
+    """获取比赛列表：支持 status/type 筛选、sort 排序、limit + cursor 游标分页"""
     status = request.args.get('status')
     match_type = request.args.get('type')
     limit = request.args.get('limit', type=int)
     sort = request.args.get('sort')
-    
-    result = match_service.get_all_matches(status=status, match_type=match_type)
-    
-    # 简单的内存排序和切片，如果数据量大建议移至 Service 层 SQL 处理
-    if result.get('status') == 'success' and isinstance(result.get('data'), list):
-        matches = result['data']
-        if sort == 'desc':
-            matches.sort(key=lambda x: x.get('date') or '', reverse=True)
-        if limit:
-            matches = matches[:limit]
-        result['data'] = matches
-        
+    cursor = request.args.get('cursor')
+
+    if limit is not None:
+        max_limit = current_app.config.get('MAX_ITEMS_PER_PAGE', 100)
+        limit = max(1, min(limit, max_limit))
+
+    try:
+        result = match_service.get_all_matches(
+            status=status, match_type=match_type, sort=sort, limit=limit, cursor=cursor
+        )
+    except ValueError as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 400
+
     return jsonify(result), 200
 
 
@@ -81,6 +89,7 @@ def delete_match(match_id: str):
 
 
 @matches_bp.route('/match-records', methods=['GET'])
+@query_budget(8)
 def get_match_records():
     """
     获取比赛记录，支持筛选类型、搜索关键字、状态筛选和分页
@@ -103,7 +112,69 @@ def get_match_records():
 
 
 @matches_bp.route('/<string:match_id>', methods=['GET'])
+@query_budget(6)
 def get_match_detail(match_id: str):
     """获取单个比赛的详细信息"""
     result = match_service.get_match_detail(match_id)
     return jsonify(result), 200
+
+
+@matches_bp.route('/<string:match_id>/events/batch', methods=['POST'])
+@jwt_required()
+def create_match_events_batch(match_id: str):
+    """批量录入比赛事件：请求体为事件数组，或 {"events": [...], "atomic": true}"""
+    payload = request.get_json(silent=True)
+    atomic = True
+    if isinstance(payload, dict):
+        atomic = bool(payload.get('atomic', True))
+        payload = payload.get('events')
+    if not isinstance(payload, list):
+        return jsonify({'status': 'error', 'message': '请求体必须为事件数组'}), 400
+
+    try:
+        result = EventService.create_events_batch(match_id.strip(), payload, atomic=atomic)
+    except ValueError as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 400
+
+    if result['success'] == 0:
+        return jsonify({'status': 'error', 'message': '没有事件被写入', 'data': result}), 400
+    return jsonify({
+        'status': 'success',
+        'message': f"成功录入 {result['success']}/{result['total']} 条事件，统计数据已自动更新",
+        'data': result
+    }), 201
+
+
+@matches_bp.route('/<string:match_id>/stream', methods=['GET'])
+def stream_match(match_id: str):
+    """订阅比赛实时比分与事件增量 (Server-Sent Events)
+
+    连接建立后先推送一次比分快照，之后仅推送增量；断线重连时浏览器携带
+    Last-Event-ID，服务端补发缺失的增量。
+    先订阅再读取快照，期间发布的增量已在队列中；快照的 seq 为读取前已发布的最大序号，
+    客户端丢弃 id 不大于它的增量（已包含在快照中）。
+    """
+    match_id = match_id.strip()
+    last_event_id = request.headers.get('Last-Event-ID', type=int)
+    try:
+        sub = live_hub.subscribe(match_id, last_event_id)
+    except RuntimeError as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 503
+
+    try:
+        seq = live_hub.current_seq(match_id)
+        initial = LiveFeedService.snapshot(match_id)
+    except Exception:
+        live_hub.unsubscribe(sub)
+        raise
+    if initial is None:
+        live_hub.unsubscribe(sub)
+        return jsonify({'status': 'error', 'message': '比赛不存在'}), 404
+    initial['seq'] = seq
+
+    # 流内不访问数据库，因此无需 stream_with_context 保留请求上下文
+    return Response(
+        live_hub.stream(sub, initial),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
@@ -12,6 +12,7 @@ from app.schemas import (
     PH_PlayerSeasonPerformanceOut,
     PH_PlayerTeamChangesOut,
 )
+from app.query_budget import query_budget
 
 # 创建蓝图（前缀在 create_app 中统一指定）
 player_history_bp = Blueprint('player_history', __name__)
@@ -21,6 +22,7 @@ player_history_service = PlayerHistoryService()
 
 
 @player_history_bp.route('/<player_id>/complete', methods=['GET'])
+@query_budget(8)
 def get_player_complete_history(player_id: str):
     """获取球员完整的跨赛季历史记录"""
     result = player_history_service.get_player_complete_history(player_id)
@@ -51,6 +53,7 @@ def compare_players_across_seasons():
 
 
 @player_history_bp.route('/team-changes/<player_id>', methods=['GET'])
+@query_budget(4)
 def get_player_team_changes(player_id: str):
     """获取球员转队历史"""
     result = player_history_service.get_player_team_changes(player_id)
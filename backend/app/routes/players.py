@@ -8,6 +8,7 @@ from app.services.player_service import PlayerService
 from app.utils.logger import get_logger
 from app.utils.response import success_response, error_response
 from app.schemas.player import PlayerCreate, PlayerUpdate
+from app.query_budget import query_budget
 
 players_bp = Blueprint('players', __name__)
 logger = get_logger(__name__)
@@ -25,6 +26,7 @@ def get_players():
 
 
 @players_bp.route('/<string:player_id>', methods=['GET'])
+@query_budget(4)
 def get_player(player_id):
     """获取单个球员信息"""
     try:
@@ -10,6 +10,8 @@ from pydantic import ValidationError
 from app.services.season_service import SeasonService
 from app.schemas import SeasonCreate, SeasonUpdate, SeasonOut
 from app.utils.logger import get_logger
+from app.db_routing import read_replica
+from app.query_budget import query_budget
 
 logger = get_logger(__name__)
 
@@ -17,6 +19,8 @@ seasons_bp = Blueprint('seasons', __name__)
 
 
 @seasons_bp.route('', methods=['GET'])
+@query_budget(3)
+@read_replica
 def get_seasons():
     """获取所有赛季信息"""
     try:
@@ -5,7 +5,9 @@
 from flask import Blueprint, request
 from flask_jwt_extended import jwt_required
 
+from app.middleware import admin_required
 from app.services.stats_facade import StatsFacade
+from app.services.stats_rebuild_service import StatsRebuildService
 from app.middleware.stats_middleware import (
     log_stats_operation,
     handle_stats_errors,
@@ -13,6 +15,7 @@ from app.middleware.stats_middleware import (
 )
 from app.utils.logger import get_logger
 from app.utils.response import success_response, error_response
+from app.query_budget import query_budget
 
 logger = get_logger(__name__)
 
@@ -21,6 +24,7 @@ stats_bp = Blueprint('stats', __name__)
 
 
 @stats_bp.route('', methods=['GET'])
+@query_budget(6)
 @handle_stats_errors
 @log_stats_operation('查询')
 @cache_stats_result(300)  # 缓存5分钟
@@ -37,7 +41,7 @@ def get_stats():
 @stats_bp.route('/rankings', methods=['GET'])
 @handle_stats_errors
 @log_stats_operation('排行榜查询')
-# @cache_stats_result(600)  # 暂时禁用缓存以便调试，或者需要根据参数生成缓存key
+@cache_stats_result(600)  # 缓存10分钟，键包含 season_id 等查询参数
 def get_rankings():
     """获取排行榜数据"""
     try:
@@ -84,3 +88,31 @@ def get_tournament_ranking(tournament_id, ranking_type):
     except Exception as e:
         logger.error(f"获取特定排行榜失败: {str(e)}")
         return error_response('TOURNAMENT_RANKING_ERROR', '获取排行榜失败', 500)
+
+
+@stats_bp.route('/cache', methods=['GET'])
+@jwt_required()
+def get_cache_stats():
+    """获取统计结果缓存的命中/未命中计数"""
+    from app.extensions import cache
+    return success_response(cache.stats(), message="缓存统计获取成功")
+
+
+@stats_bp.route('/rebuild', methods=['POST'])
+@admin_required
+def rebuild_stats():
+    """由事件全量重算统计并返回偏差报告；请求体 {"dryRun": true} 时只报告不修正"""
+    payload = request.get_json(silent=True) or {}
+    dry_run = bool(payload.get('dryRun', False))
+    batch_size = payload.get('batchSize') or StatsRebuildService.DEFAULT_BATCH_SIZE
+    try:
+        batch_size = max(1, int(batch_size))
+    except (TypeError, ValueError):
+        return error_response('INVALID_PARAMETER', 'batchSize 必须为正整数', 400)
+
+    try:
+        report = StatsRebuildService.rebuild(apply=not dry_run, batch_size=batch_size)
+    except Exception as e:
+        logger.error(f"统计重建失败: {str(e)}")
+        return error_response('STATS_REBUILD_ERROR', '统计重建失败', 500)
+    return success_response(report, message="统计偏差报告生成成功" if dry_run else "统计重建完成")
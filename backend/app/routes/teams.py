@@ -2,13 +2,15 @@
 球队路由层
 负责处理HTTP请求和响应
 """
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, current_app, request, jsonify
 from flask_jwt_extended import jwt_required
 from pydantic import ValidationError
 
 from app.services.team_service import TeamService
 from app.schemas import TeamCreate
 from app.utils.team_utils import TeamUtils
+from app.db_routing import read_replica
+from app.query_budget import query_budget
 
 teams_bp = Blueprint('teams', __name__)
 
@@ -57,17 +59,29 @@ def get_team(team_name):
 
 
 @teams_bp.route('', methods=['GET'])
+@query_budget(6)
+@read_replica
 def get_teams():
-    """获取所有球队信息（公共接口）"""
+    """获取所有球队信息（公共接口）：支持 limit + cursor 游标分页，includePlayers=false 省略球员名单"""
     try:
         # 解析查询参数
-        
-        teams_data, error = TeamService.get_all_teams(
-            group_by_name=request.args.get('group_by_name') == 'true'
-        )
-        
-        if error:
-            return jsonify({'error': error}), 500
+        group_by_name = request.args.get('group_by_name') == 'true'
+        include_players = request.args.get('includePlayers', 'true').lower() != 'false'
+        limit = request.args.get('limit', type=int)
+        cursor = request.args.get('cursor')
+        if limit is not None:
+            max_limit = current_app.config.get('MAX_ITEMS_PER_PAGE', 100)
+            limit = max(1, min(limit, max_limit))
+
+        meta = None
+        if group_by_name:
+            teams_data, error = TeamService.get_all_teams(group_by_name=True)
+            if error:
+                return jsonify({'error': error}), 500
+        else:
+            teams_data, meta = TeamService.list_teams(
+                include_players=include_players, limit=limit, cursor=cursor
+            )
         
         # 为每个球队添加match_type（如果没有的话）
         for team in teams_data:
@@ -77,8 +91,13 @@ def get_teams():
                 else:
                     team['match_type'] = TeamUtils.determine_match_type(None)
         
+        # 分页时返回 {data, meta}，否则保持原有的数组格式
+        if meta is not None:
+            return jsonify({'data': teams_data, 'meta': meta}), 200
         return jsonify(teams_data), 200
         
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': f'获取失败: {str(e)}'}), 500
 
@@ -7,11 +7,15 @@ from app.services.tournament_service import TournamentService
 from app.models.tournament import Tournament
 from app.utils.tournament_utils import TournamentUtils
 from app.schemas import TournamentInstanceCreate, TournamentUpdate, TournamentQuickCreate
+from app.db_routing import read_replica
+from app.query_budget import query_budget
 
 tournaments_bp = Blueprint('tournaments', __name__)
 
 
 @tournaments_bp.route('/<tournament_name>', methods=['GET'])
+@query_budget(8)
+@read_replica
 def get_tournament(tournament_name):
     """按数字ID或名称获取赛事。"""
     try:
@@ -20,12 +24,10 @@ def get_tournament(tournament_name):
             t_obj = Tournament.query.get(int(tournament_name))
             if t_obj:
                 # 复用已有统计构建逻辑：单个名称查询接口期望 records 列表
-                teams_data = TournamentService.get_tournament_teams_data(t_obj.id)
-                single_record = TournamentService.build_tournament_record_dict(t_obj, teams_data)
                 payload = {
                     'tournamentName': t_obj.name,
                     'totalSeasons': 1,
-                    'records': [single_record],
+                    'records': TournamentService.build_tournament_records([t_obj]),
                     'matchedMode': 'id'
                 }
                 return jsonify({'status': 'success', 'data': payload}), 200
@@ -45,6 +47,8 @@ def get_tournament(tournament_name):
 
 
 @tournaments_bp.route('', methods=['GET'])
+@query_budget(8)
+@read_replica
 def get_tournaments():
     """全部赛事列表。"""
     try:
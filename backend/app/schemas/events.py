@@ -7,19 +7,23 @@ from .base import SchemaBase
 
 
 class EventCreate(SchemaBase):
-    event_type: str
-    match_id: Optional[str] = None
-    team_id: Optional[int] = None
-    player_id: Optional[str] = None
-    event_time: Optional[int] = None
-    match_name: Optional[str] = None
-    player_name: Optional[str] = None
+    """别名与 EventService.create_event 读取的驼峰键一致（model_dump(by_alias=True)）"""
+    event_type: str = Field(..., alias='eventType')
+    match_id: Optional[str] = Field(None, alias='matchId')
+    team_id: Optional[int] = Field(None, alias='teamId')
+    player_id: Optional[str] = Field(None, alias='playerId')
+    event_time: Optional[int] = Field(None, alias='eventTime')
+    match_name: Optional[str] = Field(None, alias='matchName')
+    player_name: Optional[str] = Field(None, alias='playerName')
+    tournament_id: Optional[int] = Field(None, alias='tournamentId')  # 比赛名称匹配到多场时按赛事缩小范围
 
     @field_validator('event_type')
     @classmethod
     def validate_event_type(cls, v: str) -> str:
-        if v not in ('Goal', 'Card', 'Substitution'):
-            raise ValueError("Event type must be 'Goal', 'Card', or 'Substitution'")
+        # 与批量录入一致，使用数据库中的事件类型
+        from app.utils.event_utils import validate_event_type
+        if not validate_event_type(v):
+            raise ValueError("事件类型必须是 '进球'、'乌龙球'、'红牌' 或 '黄牌'")
         return v
 
 
@@ -1,6 +1,9 @@
 """
 事件服务层 - 处理事件相关的业务逻辑
 """
+from datetime import datetime
+from flask import current_app
+from sqlalchemy.orm import selectinload, joinedload
 from app.database import db
 from app.models.event import Event
 from app.models.match import Match
@@ -8,8 +11,13 @@ from app.models.player import Player
 from app.models.team import Team
 from app.models.player_team_history import PlayerTeamHistory
 from app.models.tournament import Tournament
+from app.models.team_tournament_participation import TeamTournamentParticipation
+from app.services.live_feed_service import LiveFeedService
+from app.services.match_resolver import MatchResolver
 from app.utils.logger import get_logger
-from typing import Optional, List, Dict, Any
+from app.utils.pagination import encode_cursor, decode_cursor
+from app.utils.tournament_utils import TournamentUtils
+from typing import Optional, List, Dict, Any, Tuple
 
 logger = get_logger(__name__)
 
@@ -24,10 +32,10 @@ class EventService:
             # 查找比赛
             match = None
             if event_data.get('matchId'):
-                match = Match.query.get(event_data['matchId'])
+                match = db.session.get(Match, event_data['matchId'])
             
             if not match and event_data.get('matchName'):
-                match = EventService._find_match(event_data['matchName'])
+                match = EventService._find_match(event_data['matchName'], event_data.get('tournamentId'))
                 
             if not match:
                 raise ValueError(f'比赛不存在: {event_data.get("matchName") or event_data.get("matchId")}')
@@ -72,6 +80,7 @@ class EventService:
             
             db.session.add(new_event)
             db.session.commit()
+            LiveFeedService.publish_event_created(new_event)
             
             logger.info(f"成功创建事件: ID={new_event.id}, 类型={event_data['eventType']}, "
                        f"球员={event_data['playerName']}, 时间={event_data['eventTime']}")
@@ -83,13 +92,188 @@ class EventService:
             logger.error(f"创建事件失败: {str(e)}")
             raise
     
+    @staticmethod
+    def create_events_batch(match_id: str, items: List[Dict[str, Any]], atomic: bool = True) -> Dict[str, Any]:
+        """批量创建同一场比赛的事件（单事务，逐条结果）
+
+        所有事件基于一次性加载的两队名单校验；atomic 为 True 时任一条无效则全部不写入。
+        每条仍以独立 INSERT 写入，数据库触发器对每一行照常生效。
+        """
+        from app.utils.event_utils import validate_event_type, validate_event_time
+
+        max_size = current_app.config.get('EVENT_BATCH_MAX_SIZE', 500)
+        if not items:
+            raise ValueError('事件列表不能为空')
+        if len(items) > max_size:
+            raise ValueError(f'单次最多提交 {max_size} 条事件')
+
+        match = db.session.get(Match, match_id)
+        if not match:
+            raise ValueError(f'比赛不存在: {match_id}')
+        if match.status == 'F':
+            raise ValueError('比赛已结束，不允许添加新事件')
+        if not match.home_team_id or not match.away_team_id:
+            raise ValueError('比赛队伍信息不完整')
+
+        # 两队名单：球员ID -> 名单记录，球员姓名 -> [名单记录]
+        roster = (
+            PlayerTeamHistory.query
+            .options(joinedload(PlayerTeamHistory.player))
+            .filter(
+                PlayerTeamHistory.tournament_id == match.tournament_id,
+                PlayerTeamHistory.team_id.in_([match.home_team_id, match.away_team_id])
+            )
+            .all()
+        )
+        by_id = {h.player_id: h for h in roster}
+        by_name: Dict[str, List[PlayerTeamHistory]] = {}
+        for history in roster:
+            if history.player:
+                by_name.setdefault(history.player.name, []).append(history)
+
+        def _field(item, *keys):
+            for key in keys:
+                if item.get(key) not in (None, ''):
+                    return item[key]
+            return None
+
+        results: List[Dict[str, Any]] = []
+        pending: List[Tuple[int, Event]] = []
+        for index, item in enumerate(items):
+            try:
+                if not isinstance(item, dict):
+                    raise ValueError('事件格式无效')
+                item_match = _field(item, 'matchId', 'match_id')
+                if item_match is not None and str(item_match) != match.id:
+                    raise ValueError(f'事件所属比赛 {item_match} 与 {match.id} 不一致')
+
+                event_type = _field(item, 'eventType', 'event_type')
+                if not validate_event_type(event_type):
+                    raise ValueError(f'无效的事件类型: {event_type}')
+                valid_time, event_time = validate_event_time(_field(item, 'eventTime', 'event_time'))
+                if not valid_time:
+                    raise ValueError('无效的事件时间')
+
+                player_id = _field(item, 'playerId', 'player_id')
+                player_name = _field(item, 'playerName', 'player_name')
+                if player_id is not None:
+                    history = by_id.get(str(player_id))
+                    if history is None:
+                        raise ValueError(f'球员 {player_id} 不属于本场比赛的参赛队伍')
+                elif player_name:
+                    candidates = by_name.get(player_name, [])
+                    if not candidates:
+                        raise ValueError(f'球员 {player_name} 不属于本场比赛的参赛队伍')
+                    if len(candidates) > 1:
+                        raise ValueError(f'球员姓名 {player_name} 不唯一，请使用球员ID')
+                    history = candidates[0]
+                else:
+                    raise ValueError('缺少球员信息')
+
+                team_id = _field(item, 'teamId', 'team_id')
+                if team_id is not None and int(team_id) != history.team_id:
+                    raise ValueError(f'球员 {history.player_id} 不属于球队 {team_id}')
+
+                pending.append((index, Event(
+                    event_type=event_type,
+                    match_id=match.id,
+                    team_id=history.team_id,
+                    player_id=history.player_id,
+                    event_time=event_time
+                )))
+                results.append({'index': index, 'status': 'pending'})
+            except (ValueError, TypeError) as e:
+                results.append({'index': index, 'status': 'error', 'message': str(e)})
+
+        failed = sum(1 for r in results if r['status'] == 'error')
+        if pending and not (atomic and failed):
+            try:
+                db.session.add_all([event for _, event in pending])
+                db.session.flush()
+                # 提交前读取ID与推送内容，避免提交后逐条重新加载已过期的事件
+                for index, event in pending:
+                    results[index] = {'index': index, 'status': 'created', 'id': event.id}
+                payloads = [LiveFeedService.event_payload(event) for _, event in pending]
+                db.session.commit()
+            except Exception as e:
+                db.session.rollback()
+                logger.error(f"批量创建事件失败: match={match.id}, {str(e)}")
+                raise
+            created = len(pending)
+            LiveFeedService.publish_events_batch(match.id, payloads)
+        else:
+            for index, _ in pending:
+                results[index] = {'index': index, 'status': 'skipped', 'message': '批次中存在无效事件，未写入'}
+            created = 0
+
+        logger.info(f"批量创建事件: match={match.id}, 提交 {len(items)} 条, 成功 {created} 条, 失败 {failed} 条")
+        return {
+            'matchId': match.id,
+            'total': len(items),
+            'success': created,
+            'failed': failed,
+            'results': results
+        }
+
     @staticmethod
     def get_all_events() -> List[Dict[str, Any]]:
         """获取所有事件"""
+        events_data, _ = EventService.list_events()
+        return events_data
+
+    @staticmethod
+    def list_events(filters: Optional[Dict[str, Any]] = None, limit: Optional[int] = None,
+                    cursor: Optional[str] = None) -> Tuple[List[Dict[str, Any]], Optional[Dict[str, Any]]]:
+        """按条件查询事件（按ID倒序），支持 limit + cursor 游标分页
+
+        filters: match_id / tournament_id / team_id / player_id / event_type / since / until
+                 （since/until 为比赛时间范围，ISO 格式）
+        返回 (事件列表, 分页元信息)；未分页时元信息为 None。
+        """
         try:
-            events = Event.query.order_by(Event.id.desc()).all()
+            filters = filters or {}
+            query = Event.query
+            if filters.get('match_id'):
+                query = query.filter(Event.match_id == filters['match_id'])
+            if filters.get('team_id'):
+                query = query.filter(Event.team_id == filters['team_id'])
+            if filters.get('player_id'):
+                query = query.filter(Event.player_id == filters['player_id'])
+            if filters.get('event_type'):
+                query = query.filter(Event.event_type == filters['event_type'])
+            if filters.get('tournament_id') or filters.get('since') or filters.get('until'):
+                query = query.join(Match, Event.match_id == Match.id)
+                if filters.get('tournament_id'):
+                    query = query.filter(Match.tournament_id == filters['tournament_id'])
+                if filters.get('since'):
+                    query = query.filter(Match.match_time >= EventService._parse_time_filter(filters['since']))
+                if filters.get('until'):
+                    query = query.filter(Match.match_time <= EventService._parse_time_filter(filters['until']))
+
+            paginated = bool(limit) or bool(cursor)
+            if cursor:
+                position = decode_cursor(cursor)
+                try:
+                    query = query.filter(Event.id < int(position['id']))
+                except (KeyError, TypeError, ValueError):
+                    raise ValueError('无效的分页游标')
+            query = query.order_by(Event.id.desc())
+            if paginated:
+                limit = limit or current_app.config.get('ITEMS_PER_PAGE', 20)
+                query = query.limit(limit + 1)
+
+            events = query.options(*EventService._enrichment_options()).all()
+            meta = None
+            if paginated:
+                has_more = len(events) > limit
+                events = events[:limit]
+                meta = {
+                    'limit': limit,
+                    'hasMore': has_more,
+                    'nextCursor': encode_cursor({'id': events[-1].id}) if has_more and events else None
+                }
+
             events_data = []
-            
             for event in events:
                 try:
                     event_dict = EventService._format_event_data(event)
@@ -99,11 +283,33 @@ class EventService:
                     # 添加基本事件信息，避免完全跳过
                     events_data.append(EventService._get_basic_event_data(event))
             
-            return events_data
+            return events_data, meta
             
+        except ValueError:
+            raise
         except Exception as e:
             logger.error(f"获取事件列表失败: {str(e)}")
             raise
+
+    @staticmethod
+    def _enrichment_options() -> Tuple:
+        """事件列表展示所需关联的批量预加载（每页固定查询次数）"""
+        return (
+            selectinload(Event.player),
+            selectinload(Event.team_participation).joinedload(TeamTournamentParticipation.team_base),
+            selectinload(Event.match).options(
+                joinedload(Match.tournament).joinedload(Tournament.competition),
+                selectinload(Match.home_team).joinedload(TeamTournamentParticipation.team_base),
+                selectinload(Match.away_team).joinedload(TeamTournamentParticipation.team_base),
+            ),
+        )
+
+    @staticmethod
+    def _parse_time_filter(value: str) -> datetime:
+        try:
+            return TournamentUtils.parse_datetime_from_iso(value)
+        except (TypeError, ValueError):
+            raise ValueError(f'无效的时间参数: {value}')
     
     @staticmethod
     def update_event(event_id: int, update_data: Dict[str, Any]) -> Event:
@@ -150,6 +356,7 @@ class EventService:
                 logger.info(f"更新球员为: {player.name} (ID: {player.id})")
             
             db.session.commit()
+            LiveFeedService.publish_event_updated(event)
             logger.info(f"事件 {event_id} 更新成功")
             
             return event
@@ -170,8 +377,10 @@ class EventService:
             logger.info(f"删除事件 {event_id}: 类型={event.event_type}, "
                        f"球员={event.player_id}, 时间={event.event_time}")
             
+            match_id = event.match_id
             db.session.delete(event)
             db.session.commit()
+            LiveFeedService.publish_event_deleted(match_id, event_id)
             
             logger.info(f"事件 {event_id} 删除成功")
             return True
@@ -182,71 +391,16 @@ class EventService:
             raise
     
     @staticmethod
-    def _find_match(match_name: str) -> Optional[Match]:
-        """查找比赛的辅助函数"""
-        try:
-            logger.info(f"查找比赛: {match_name}")
-            
-            # 首先尝试根据比赛ID查找 (String ID)
-            match = Match.query.filter_by(id=match_name).first()
-            if match:
-                logger.info(f"通过ID(String)找到比赛: {match.id}")
-                return match
-
-            # 其次尝试根据比赛名称查找
-            match = Match.query.filter_by(match_name=match_name).first()
-            if match:
-                logger.info(f"通过比赛名称找到比赛: {match.id}")
-                return match
-            
-            # 如果没找到，尝试直接匹配比赛ID（如果传入的是ID格式，且ID是数字的情况）
-            try:
-                match_id = int(match_name)
-                match = Match.query.filter_by(id=match_id).first()
-                if match:
-                    logger.info(f"通过ID找到比赛: {match.id}")
-                    return match
-            except (ValueError, TypeError):
-                pass
-            
-            # 如果还没找到，尝试根据主队vs客队格式查找
-            if 'vs' in match_name:
-                try:
-                    team_names = match_name.split(' vs ')
-                    if len(team_names) == 2:
-                        team1_name, team2_name = team_names[0].strip(), team_names[1].strip()
-                        logger.info(f"尝试通过队伍名称查找: {team1_name} vs {team2_name}")
-                        
-                        # 查找所有比赛并检查队伍名称
-                        matches = Match.query.all()
-                        for m in matches:
-                            try:
-                                home_team = Team.query.get(m.home_team_id)
-                                away_team = Team.query.get(m.away_team_id)
-                                
-                                if home_team and away_team:
-                                    if ((home_team.name == team1_name and away_team.name == team2_name) or
-                                        (home_team.name == team2_name and away_team.name == team1_name)):
-                                        logger.info(f"通过队伍名称找到比赛: {m.id}")
-                                        return m
-                            except Exception as e:
-                                logger.error(f"处理比赛 {m.id} 时出错: {str(e)}")
-                                continue
-                except Exception as e:
-                    logger.error(f"解析队伍名称时出错: {str(e)}")
-            
-            logger.warning(f"未找到比赛: {match_name}")
-            return None
-            
-        except Exception as e:
-            logger.error(f"查找比赛时出错: {str(e)}")
-            return None
+    def _find_match(match_name: str, tournament_id: Optional[int] = None) -> Optional[Match]:
+        """查找比赛的辅助函数（ID / 比赛名称 / "主队 vs 客队"），多场匹配时抛出 ValueError"""
+        logger.debug(f"查找比赛: {match_name}")
+        return MatchResolver.resolve(match_name, tournament_id)
     
     @staticmethod
     def _find_player_team(player_id: int, tournament_id: int, valid_team_ids: List[int]) -> Optional[int]:
         """查找球员在指定赛事中的队伍"""
         try:
-            logger.info(f"查找球员队伍: player_id={player_id}, tournament_id={tournament_id}, "
+            logger.debug(f"查找球员队伍: player_id={player_id}, tournament_id={tournament_id}, "
                        f"valid_teams={valid_team_ids}")
             
             # 查找球员在该赛事中的队伍历史
@@ -256,7 +410,7 @@ class EventService:
             ).first()
             
             if player_history:
-                logger.info(f"找到球员队伍历史: team_id={player_history.team_id}")
+                logger.debug(f"找到球员队伍历史: team_id={player_history.team_id}")
                 # 验证球员是否属于参赛队伍
                 if player_history.team_id in valid_team_ids:
                     return player_history.team_id
@@ -273,27 +427,26 @@ class EventService:
     
     @staticmethod
     def _format_event_data(event: Event) -> Dict[str, Any]:
-        """格式化事件数据"""
+        """格式化事件数据（通过关联属性读取，列表场景下已批量预加载）"""
         from app.utils.event_utils import determine_match_type
         
         event_dict = event.to_dict()
         
-        # 分别查询关联数据
-        match = Match.query.get(event.match_id)
+        match = event.match
         if match:
             # 优先使用比赛名称，如果没有则使用主队vs客队格式
             if match.match_name:
                 event_dict['matchName'] = match.match_name
             else:
-                home_team = Team.query.get(match.home_team_id)
-                away_team = Team.query.get(match.away_team_id)
+                home_team = match.home_team.team_base if match.home_team else None
+                away_team = match.away_team.team_base if match.away_team else None
                 
                 if home_team and away_team:
                     event_dict['matchName'] = f"{home_team.name} vs {away_team.name}"
                 else:
                     event_dict['matchName'] = '未知比赛'
             
-            tournament = Tournament.query.get(match.tournament_id)
+            tournament = match.tournament
             event_dict['matchType'] = determine_match_type(tournament)
             if tournament:
                 event_dict['competitionId'] = tournament.competition_id
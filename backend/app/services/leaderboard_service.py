@@ -0,0 +1,197 @@
+"""
+排行榜快照服务 - 维护按 (竞赛, 赛季, 榜单类型) 物化的排行榜
+
+读取: 一次取出赛季内全部快照，仅对缺失或过期的榜单重新聚合并回写
+      缺失的榜单先以过期状态建行并提交，再按常规流程刷新，刷新期间的写入仍能标记过期
+失效: 订阅领域变更通知，递增受影响作用域/榜单的变更版本（跨进程可见）
+"""
+
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import insert, update
+from sqlalchemy.exc import IntegrityError
+
+from app.database import db
+from app.db_routing import primary_scope
+from app.models.competition import Competition
+from app.models.season import Season
+from app.models.tournament import Tournament
+from app.models.leaderboard_snapshot import LeaderboardSnapshot
+from app.services.stats_service import StatsService
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class LeaderboardService:
+    """排行榜快照业务逻辑服务类"""
+
+    # 各类变更影响的榜单；比赛本身的变更只影响积分榜（进球/牌数由事件触发器维护）
+    ALL_BOARDS = LeaderboardSnapshot.BOARD_TYPES
+    MATCH_BOARDS = (LeaderboardSnapshot.BOARD_POINTS,)
+
+    @staticmethod
+    def get_rankings(season_id: Optional[int] = None) -> Dict[str, Any]:
+        """获取所有竞赛在指定赛季（默认最近赛季）的排行榜"""
+        try:
+            return LeaderboardService._get_rankings_from_snapshots(season_id)
+        except Exception as e:
+            # 快照表缺失或损坏时退回实时聚合，保证接口可用
+            db.session.rollback()
+            logger.warning(f"排行榜快照不可用，改为实时聚合: {e}")
+            return StatsService.get_all_rankings(season_id)
+
+    @staticmethod
+    @primary_scope()
+    def _get_rankings_from_snapshots(season_id: Optional[int]) -> Dict[str, Any]:
+        # 变更版本与聚合数据须来自同一数据源：副本滞后时不能以旧数据回写并标记为最新
+        logger.info(f"开始获取排行榜快照, season_id={season_id}")
+
+        if season_id:
+            season = db.session.get(Season, season_id)
+        else:
+            season = Season.query.order_by(Season.start_time.desc()).first()
+
+        competitions = Competition.query.all()
+        tournament_ids: Dict[int, List[int]] = {}
+        snapshots: Dict[Tuple[int, str], LeaderboardSnapshot] = {}
+        if season is not None:
+            rows = db.session.query(Tournament.competition_id, Tournament.id).filter(
+                Tournament.season_id == season.season_id
+            ).order_by(Tournament.id).all()
+            for competition_id, tournament_id in rows:
+                tournament_ids.setdefault(competition_id, []).append(tournament_id)
+            if tournament_ids:
+                snapshots = LeaderboardService._load_snapshots(season.season_id)
+                missing = [(competition_id, board_type) for competition_id in tournament_ids
+                           for board_type in LeaderboardService.ALL_BOARDS
+                           if (competition_id, board_type) not in snapshots]
+                if missing:
+                    LeaderboardService._create_missing(season.season_id, missing)
+                    snapshots = LeaderboardService._load_snapshots(season.season_id)
+
+        rankings = {}
+        refreshed = 0
+        for comp in competitions:
+            key = f"comp_{comp.competition_id}"
+            ids = tournament_ids.get(comp.competition_id)
+            if not ids:
+                rankings[key] = StatsService.empty_rankings()
+                rankings[key]['competitionName'] = comp.name
+                rankings[key]['seasonName'] = ''
+                continue
+
+            boards = {}
+            for board_type in LeaderboardService.ALL_BOARDS:
+                snap = snapshots.get((comp.competition_id, board_type))
+                if snap is None:
+                    # 建行后被并发删除（竞赛/赛季级联删除），本次直接聚合不回写
+                    boards[board_type] = StatsService.compute_board(board_type, ids)
+                    continue
+                if snap.is_stale:
+                    LeaderboardService._refresh_board(snap, ids)
+                    refreshed += 1
+                boards[board_type] = snap.payload
+
+            rankings[key] = StatsService.assemble_rankings(boards)
+            rankings[key]['competitionName'] = comp.name
+            rankings[key]['seasonName'] = season.name
+
+        if refreshed:
+            LeaderboardService._commit_refresh()
+            logger.info(f"排行榜快照增量刷新 {refreshed} 个榜单")
+        return rankings
+
+    @staticmethod
+    def _load_snapshots(season_id: int) -> Dict[Tuple[int, str], LeaderboardSnapshot]:
+        return {
+            (snap.competition_id, snap.board_type): snap
+            for snap in LeaderboardSnapshot.query.filter_by(season_id=season_id).all()
+        }
+
+    @staticmethod
+    def _create_missing(season_id: int, missing: List[Tuple[int, str]]) -> None:
+        """以过期状态（变更版本 1、刷新版本 0）补建缺失的快照行并单独提交；并发补建时忽略已存在的行
+
+        行先于聚合存在，聚合期间提交的写入会递增其变更版本，刷新后仍为过期，不会丢失失效。
+        """
+        table = LeaderboardSnapshot.__table__
+        columns = LeaderboardSnapshot.__mapper__.columns
+        stmt = insert(table).prefix_with('IGNORE', dialect='mysql').prefix_with('OR IGNORE', dialect='sqlite')
+        rows = [{
+            columns['competition_id'].key: competition_id,
+            columns['season_id'].key: season_id,
+            columns['board_type'].key: board_type,
+            columns['payload'].key: {},
+            columns['change_seq'].key: 1,
+            columns['refreshed_seq'].key: 0,
+        } for competition_id, board_type in missing]
+        db.session.execute(stmt, rows)
+        db.session.commit()
+
+    @staticmethod
+    def _refresh_board(snap: LeaderboardSnapshot, tournament_ids: List[int]) -> LeaderboardSnapshot:
+        """重新聚合单个榜单并写回快照（刷新版本回写为读取时的变更版本）"""
+        seen_seq = snap.change_seq
+        snap.payload = StatsService.compute_board(snap.board_type, tournament_ids)
+        snap.refreshed_seq = seen_seq
+        snap.refreshed_at = datetime.utcnow()
+        return snap
+
+    @staticmethod
+    def _commit_refresh():
+        # 刷新结果已在内存中可用；并发写入冲突时放弃本次回写，由下次读取重试
+        try:
+            db.session.commit()
+        except IntegrityError as e:
+            db.session.rollback()
+            logger.info(f"排行榜快照并发刷新冲突，跳过回写: {e.orig}")
+
+    @staticmethod
+    def mark_stale(competition_id: Optional[int] = None, season_id: Optional[int] = None,
+                   boards: Iterable[str] = ALL_BOARDS) -> None:
+        """递增作用域内榜单的变更版本；未指定作用域时标记全部快照"""
+        stmt = update(LeaderboardSnapshot).values(change_seq=LeaderboardSnapshot.change_seq + 1)
+        if competition_id is not None:
+            stmt = stmt.where(LeaderboardSnapshot.competition_id == competition_id)
+        if season_id is not None:
+            stmt = stmt.where(LeaderboardSnapshot.season_id == season_id)
+        stmt = stmt.where(LeaderboardSnapshot.board_type.in_(list(boards)))
+        # 在独立连接上执行：通知在会话提交后派发，此时会话不能再发出 SQL
+        with db.engine.begin() as conn:
+            conn.execute(stmt)
+
+
+def _on_scoped_change(boards):
+    def handler(sender, competition_id=None, season_id=None, **_):
+        if competition_id is None or season_id is None:
+            return
+        try:
+            LeaderboardService.mark_stale(competition_id, season_id, boards)
+        except Exception as e:
+            logger.warning(f"标记排行榜快照过期失败: {e}")
+    return handler
+
+
+def _on_reference_change(sender, **_):
+    try:
+        LeaderboardService.mark_stale()
+    except Exception as e:
+        logger.warning(f"标记排行榜快照过期失败: {e}")
+
+
+_handlers = {
+    'event': _on_scoped_change(LeaderboardService.ALL_BOARDS),
+    'roster': _on_scoped_change(LeaderboardService.ALL_BOARDS),
+    'match': _on_scoped_change(LeaderboardService.MATCH_BOARDS),
+}
+
+
+def connect_leaderboard_invalidation():
+    """订阅领域变更通知以标记受影响的排行榜快照"""
+    from app import signals
+    signals.event_changed.connect(_handlers['event'])
+    signals.roster_changed.connect(_handlers['roster'])
+    signals.match_changed.connect(_handlers['match'])
+    signals.match_finished.connect(_handlers['match'])
+    signals.reference_changed.connect(_on_reference_change)
@@ -0,0 +1,85 @@
+"""
+比赛实时增量服务 - 在写路径提交后构建比分/事件增量并发布到实时推送中心
+
+每次写操作只查询一次比分（触发器更新后的值），与订阅人数无关。
+发布失败只记录日志，不影响已提交的写入。
+"""
+
+from typing import Any, Dict, List, Optional
+
+from app.database import db
+from app.extensions import live_hub
+from app.models.event import Event
+from app.models.match import Match
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class LiveFeedService:
+    """比赛实时增量服务类"""
+
+    @staticmethod
+    def snapshot(match_id: str) -> Optional[Dict[str, Any]]:
+        """订阅建立时的初始快照（比分与状态）"""
+        row = db.session.query(Match.id, Match.home_score, Match.away_score, Match.status).filter(
+            Match.id == match_id
+        ).first()
+        if row is None:
+            return None
+        return {
+            'type': 'snapshot',
+            'matchId': row.id,
+            'score': {'home': row.home_score or 0, 'away': row.away_score or 0},
+            'status': row.status or 'P'
+        }
+
+    @staticmethod
+    def publish_event_created(event: Event):
+        LiveFeedService._publish(event.match_id, 'event.created', event=LiveFeedService.event_payload(event))
+
+    @staticmethod
+    def publish_event_updated(event: Event):
+        LiveFeedService._publish(event.match_id, 'event.updated', event=LiveFeedService.event_payload(event))
+
+    @staticmethod
+    def publish_event_deleted(match_id: str, event_id: int):
+        LiveFeedService._publish(match_id, 'event.deleted', eventId=event_id)
+
+    @staticmethod
+    def publish_events_batch(match_id: str, payloads: List[Dict[str, Any]]):
+        """payloads 由 event_payload 在提交前生成"""
+        LiveFeedService._publish(match_id, 'event.batch', events=payloads)
+
+    @staticmethod
+    def publish_match_finished(match_id: str):
+        LiveFeedService._publish(match_id, 'match.finished')
+
+    @staticmethod
+    def event_payload(event: Event) -> Dict[str, Any]:
+        participation = event.team_participation
+        return {
+            'id': event.id,
+            'eventType': event.event_type,
+            'eventTime': event.event_time,
+            'playerId': event.player_id,
+            'playerName': event.player.name if event.player else None,
+            'teamId': event.team_id,
+            'teamName': participation.team_base.name if participation and participation.team_base else None
+        }
+
+    @staticmethod
+    def _publish(match_id: str, message_type: str, **payload):
+        # 无人订阅时同样发布：序号与回放缓冲供断线重连补齐
+        try:
+            snapshot = LiveFeedService.snapshot(match_id) or {}
+            message = {
+                'type': message_type,
+                'matchId': match_id,
+                'score': snapshot.get('score'),
+                'status': snapshot.get('status'),
+                **payload
+            }
+            live_hub.publish(match_id, message)
+        except Exception as e:
+            logger.warning(f"发布比赛 {match_id} 实时增量失败: {e}")
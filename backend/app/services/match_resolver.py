@@ -0,0 +1,105 @@
+"""
+比赛解析器 - 将用户输入（比赛ID / 比赛名称 / "主队 vs 客队"）解析为唯一比赛
+
+每种查找方式各一条基于索引的查询：
+  - 比赛ID: 主键
+  - 比赛名称: idx_match_name
+  - 队伍对: team_base.球队名称 唯一索引 -> 参与表 -> match(主队ID / 客队ID) 索引
+匹配到多场比赛时抛出 ValueError 并列出候选，而不是静默返回第一条。
+"""
+
+import re
+from typing import List, Optional
+
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import aliased
+
+from app.database import db
+from app.models.match import Match
+from app.models.team_base import TeamBase
+from app.models.team_tournament_participation import TeamTournamentParticipation
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# "A vs B" / "A VS B" / "A vs. B"
+_TEAM_PAIR_PATTERN = re.compile(r'^\s*(.+?)\s+vs\.?\s+(.+?)\s*$', re.IGNORECASE)
+
+
+class MatchResolver:
+    """比赛解析器"""
+
+    MAX_CANDIDATES = 10
+
+    @staticmethod
+    def resolve(identifier: str, tournament_id: Optional[int] = None) -> Optional[Match]:
+        """解析为唯一比赛；未找到返回 None，存在多个候选时抛出 ValueError"""
+        if not identifier or not str(identifier).strip():
+            return None
+        identifier = str(identifier).strip()
+        if tournament_id is not None:
+            try:
+                tournament_id = int(tournament_id)
+            except (TypeError, ValueError):
+                raise ValueError(f'赛事ID无效: {tournament_id}')
+
+        match = db.session.get(Match, identifier)
+        if match and (tournament_id is None or match.tournament_id == tournament_id):
+            logger.info(f"通过ID找到比赛: {match.id}")
+            return match
+
+        for source, candidates in (
+            ('比赛名称', lambda: MatchResolver._by_name(identifier, tournament_id)),
+            ('队伍名称', lambda: MatchResolver._by_team_pair(identifier, tournament_id)),
+        ):
+            found = candidates()
+            if len(found) == 1:
+                logger.info(f"通过{source}找到比赛: {found[0].id}")
+                return found[0]
+            if len(found) > 1:
+                MatchResolver._raise_ambiguous(identifier, found)
+
+        logger.warning(f"未找到比赛: {identifier}")
+        return None
+
+    @staticmethod
+    def _by_name(name: str, tournament_id: Optional[int]) -> List[Match]:
+        query = Match.query.filter(Match.match_name == name)
+        if tournament_id is not None:
+            query = query.filter(Match.tournament_id == tournament_id)
+        return query.order_by(Match.match_time.desc()).limit(MatchResolver.MAX_CANDIDATES).all()
+
+    @staticmethod
+    def _by_team_pair(text: str, tournament_id: Optional[int]) -> List[Match]:
+        parsed = _TEAM_PAIR_PATTERN.match(text)
+        if not parsed:
+            return []
+        first, second = parsed.group(1), parsed.group(2)
+
+        home = aliased(TeamTournamentParticipation)
+        away = aliased(TeamTournamentParticipation)
+        home_base = aliased(TeamBase)
+        away_base = aliased(TeamBase)
+        query = (
+            Match.query
+            .join(home, Match.home_team_id == home.id)
+            .join(home_base, home.team_base_id == home_base.id)
+            .join(away, Match.away_team_id == away.id)
+            .join(away_base, away.team_base_id == away_base.id)
+            .filter(or_(
+                and_(home_base.name == first, away_base.name == second),
+                and_(home_base.name == second, away_base.name == first),
+            ))
+        )
+        if tournament_id is not None:
+            query = query.filter(Match.tournament_id == tournament_id)
+        return query.order_by(Match.match_time.desc()).limit(MatchResolver.MAX_CANDIDATES).all()
+
+    @staticmethod
+    def _raise_ambiguous(identifier: str, candidates: List[Match]):
+        described = ', '.join(
+            f"{m.id}({m.match_time.strftime('%Y-%m-%d %H:%M') if m.match_time else '未定时间'})"
+            for m in candidates
+        )
+        logger.warning(f"比赛不唯一: {identifier} -> {described}")
+        raise ValueError(f'比赛不唯一: "{identifier}" 匹配到多场比赛 {described}，请使用比赛ID或指定赛事')
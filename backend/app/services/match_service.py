@@ -3,8 +3,11 @@
 """
 
 from typing import Dict, Any, List, Optional, Tuple
-from sqlalchemy import or_
+from sqlalchemy import or_, and_
+from sqlalchemy.orm import selectinload, joinedload
+from flask import current_app
 from app.database import db
+from app.extensions import cache
 from app.models.match import Match
 from app.models.team import Team
 from app.models.team_base import TeamBase
@@ -14,7 +17,9 @@ from app.models.competition import Competition
 from app.models.event import Event
 from app.models.player import Player
 from app.models.player_team_history import PlayerTeamHistory
+from app.services.live_feed_service import LiveFeedService
 from app.utils.match_utils import MatchUtils
+from app.utils.pagination import encode_cursor, decode_cursor, parse_cursor_datetime
 from app.utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -149,8 +154,8 @@ class MatchService:
             db.session.commit()
             
             # 构建返回数据
-            tournament = Tournament.query.get(tournament_id)
-            match_dict = self._build_match_response(new_match, tournament)
+            projected = self._get_projected_match(match_id) or new_match
+            match_dict = self._build_match_response(projected, projected.tournament)
             match_dict['team1'] = team1.name
             match_dict['team2'] = team2.name
             
@@ -183,6 +188,7 @@ class MatchService:
         
         match.status = 'F'
         db.session.commit()
+        LiveFeedService.publish_match_finished(match_id)
         
         MatchUtils.log_match_operation("完赛比赛", match_id)
         
@@ -195,8 +201,14 @@ class MatchService:
             }
         }
 
-    def get_all_matches(self, status: str = None, match_type: str = None) -> Dict[str, Any]:
-        """获取所有比赛"""
+    def get_all_matches(self, status: str = None, match_type: str = None, sort: str = None,
+                        limit: int = None, cursor: str = None) -> Dict[str, Any]:
+        """获取所有比赛
+
+        sort: 'asc' / 'desc' 按比赛时间排序（走 idx_match_time 索引）
+        limit: 单页数量；提供时返回 meta.nextCursor 供下一页使用
+        cursor: 上一页返回的游标令牌（keyset 分页，不使用 OFFSET）
+        """
         query = Match.query
         
         if status:
@@ -204,8 +216,38 @@ class MatchService:
             
         if match_type:
             query = query.join(Tournament).join(Competition).filter(Competition.name == match_type)
+
+        paginated = bool(limit) or bool(cursor)
+        direction = sort if sort in ('asc', 'desc') else ('asc' if paginated else None)
+
+        if cursor:
+            position = decode_cursor(cursor)
+            cursor_time = parse_cursor_datetime(position.get('t'))
+            cursor_id = str(position.get('id', ''))
+            if direction == 'desc':
+                query = query.filter(or_(
+                    Match.match_time < cursor_time,
+                    and_(Match.match_time == cursor_time, Match.id < cursor_id)
+                ))
+            else:
+                query = query.filter(or_(
+                    Match.match_time > cursor_time,
+                    and_(Match.match_time == cursor_time, Match.id > cursor_id)
+                ))
+
+        if direction == 'desc':
+            query = query.order_by(Match.match_time.desc(), Match.id.desc())
+        elif direction == 'asc':
+            query = query.order_by(Match.match_time.asc(), Match.id.asc())
+
+        if limit:
+            # 多取一条用于判断是否还有下一页
+            query = query.limit(limit + 1)
             
-        matches = query.all()
+        matches = self._load_projected_matches(query)
+        has_more = bool(limit) and len(matches) > limit
+        if has_more:
+            matches = matches[:limit]
         matches_data = []
         
         # 自动更新比赛状态
@@ -227,8 +269,7 @@ class MatchService:
             #     if match.status != original_status:
             #         status_updated = True
 
-            tournament = Tournament.query.get(match.tournament_id)
-            match_dict = MatchUtils.build_match_dict_with_type(match, tournament)
+            match_dict = MatchUtils.build_match_dict_with_type(match, match.tournament)
             matches_data.append(match_dict)
         
         if status_updated:
@@ -238,10 +279,22 @@ class MatchService:
                 logger.error(f"自动更新比赛状态失败: {e}")
                 db.session.rollback()
         
-        return {
+        result = {
             'status': 'success',
             'data': matches_data
         }
+        if paginated:
+            next_cursor = None
+            if has_more and matches:
+                last = matches[-1]
+                next_cursor = encode_cursor({'t': last.match_time, 'id': last.id})
+            result['meta'] = {
+                'limit': limit,
+                'sort': direction,
+                'hasMore': has_more,
+                'nextCursor': next_cursor
+            }
+        return result
 
     def update_match(self, match_id: str, data: Dict[str, Any]) -> Dict[str, Any]:
         """更新比赛信息"""
@@ -257,7 +310,7 @@ class MatchService:
             
             if comp:
                 # 尝试在当前比赛所属的赛季中查找该赛事的 Tournament
-                current_tournament = Tournament.query.get(match.tournament_id)
+                current_tournament = Tournament.get_memoized(match.tournament_id)
                 if current_tournament:
                     target_tournament = Tournament.query.filter_by(
                         competition_id=comp.competition_id,
@@ -314,8 +367,8 @@ class MatchService:
         db.session.commit()
         
         # 返回更新后的数据
-        tournament = Tournament.query.get(match.tournament_id)
-        match_dict = MatchUtils.build_match_dict_with_type(match, tournament)
+        projected = self._get_projected_match(match.id) or match
+        match_dict = MatchUtils.build_match_dict_with_type(projected, projected.tournament)
         
         MatchUtils.log_match_operation("更新比赛", match_id, f"更新字段: {list(data.keys())}")
         
@@ -372,9 +425,9 @@ class MatchService:
             )
 
         total = query.count()
-        matches = query.order_by(Match.match_time.desc()).offset(
-            (page - 1) * page_size
-        ).limit(page_size).all()
+        matches = self._load_projected_matches(
+            query.order_by(Match.match_time.desc()).offset((page - 1) * page_size).limit(page_size)
+        )
 
         # 构建返回数据
         records = []
@@ -386,7 +439,7 @@ class MatchService:
             match_dict['home_own_goals'] = 0
             match_dict['away_own_goals'] = 0
             
-            tournament = Tournament.query.get(match.tournament_id)
+            tournament = match.tournament
             match_dict['matchType'] = MatchUtils.determine_match_type(tournament)
             match_dict['competitionId'] = tournament.competition_id if tournament else None
             match_dict['competitionName'] = tournament.competition.name if tournament and tournament.competition else None
@@ -404,8 +457,26 @@ class MatchService:
         }
 
     def get_match_detail(self, match_id: str) -> Dict[str, Any]:
-        """获取比赛详细信息"""
-        match = Match.query.get(match_id.strip())
+        """获取比赛详细信息（按比赛缓存，事件/比赛变更时失效）"""
+        match_id = match_id.strip()
+        cache_key = f"match_detail:{match_id}"
+        cached = cache.get(cache_key)
+        if cached is not None:
+            return {
+                'status': 'success',
+                'data': cached
+            }
+
+        match = (
+            Match.query
+            .options(
+                joinedload(Match.home_team).joinedload(TeamTournamentParticipation.team_base),
+                joinedload(Match.away_team).joinedload(TeamTournamentParticipation.team_base),
+                joinedload(Match.tournament).joinedload(Tournament.competition),
+            )
+            .filter(Match.id == match_id)
+            .first()
+        )
         if not match:
             raise ValueError(f'未找到ID为{match_id}的比赛')
         
@@ -413,17 +484,42 @@ class MatchService:
         events = Event.query.filter_by(match_id=match_id).order_by(Event.event_time.asc()).all()
         logger.info(f"找到 {len(events)} 个事件记录")
         
-        # 构建返回数据
-        events_data = self._build_events_data(events, match.tournament_id)
+        # 构建返回数据（球员/名单/球队名称一次性批量加载）
+        context = self._load_detail_context(events, match)
+        events_data = self._build_events_data(events, context)
         statistics = self._calculate_match_statistics(events, match.home_team_id, match.away_team_id)
-        players_data = self._get_players_data(events, match)
-        match_data = self._build_detailed_match_data(match, statistics, players_data, events_data)
+        players_data = self._get_players_data(events, context)
+        match_data = self._build_detailed_match_data(match, statistics, players_data, events_data,
+                                                     context['total_players'])
+
+        cache.set(cache_key, match_data,
+                  timeout=current_app.config.get('MATCH_DETAIL_CACHE_TIMEOUT', 300),
+                  tags=['match_detail', f"match_detail:match:{match_id}",
+                        f"match_detail:tournament:{match.tournament_id}"])
         
         return {
             'status': 'success',
             'data': match_data
         }
 
+    @staticmethod
+    def _projection_options() -> Tuple:
+        """比赛列表投影所需的关联预加载选项（主客队名称、赛事、竞赛）"""
+        return (
+            selectinload(Match.home_team).joinedload(TeamTournamentParticipation.team_base),
+            selectinload(Match.away_team).joinedload(TeamTournamentParticipation.team_base),
+            selectinload(Match.tournament).joinedload(Tournament.competition),
+        )
+
+    def _load_projected_matches(self, query) -> List[Match]:
+        """批量加载比赛及其投影关联，查询次数固定，与比赛数量无关"""
+        return query.options(*self._projection_options()).all()
+
+    def _get_projected_match(self, match_id: str) -> Optional[Match]:
+        """按ID加载单场比赛的投影数据"""
+        matches = self._load_projected_matches(Match.query.filter(Match.id == match_id))
+        return matches[0] if matches else None
+
     def _build_match_response(self, match, tournament) -> Dict[str, Any]:
         """构建比赛响应数据"""
         match_dict = match.to_dict()
@@ -434,7 +530,79 @@ class MatchService:
             match_dict['competitionId'] = tournament.competition_id
         return match_dict
 
-    def _build_events_data(self, events: List, tournament_id: int) -> List[Dict[str, Any]]:
+    def _load_detail_context(self, events: List, match) -> Dict[str, Any]:
+        """批量加载详情所需的球员、赛事名单与球队名称（查询次数与事件/球员数量无关）"""
+        event_player_ids = {event.player_id for event in events if event.player_id}
+        squad_team_ids = [tid for tid in (match.home_team_id, match.away_team_id) if tid]
+
+        # 两队名单 + 事件球员在本赛事的名单记录
+        conditions = []
+        if squad_team_ids and match.home_team_id and match.away_team_id:
+            conditions.append(PlayerTeamHistory.team_id.in_(squad_team_ids))
+        if event_player_ids:
+            conditions.append(PlayerTeamHistory.player_id.in_(event_player_ids))
+        histories = []
+        if conditions:
+            histories = (
+                PlayerTeamHistory.query
+                .options(joinedload(PlayerTeamHistory.player))
+                .filter(PlayerTeamHistory.tournament_id == match.tournament_id, or_(*conditions))
+                .order_by(PlayerTeamHistory.id)
+                .all()
+            )
+
+        squad = [h for h in histories if h.team_id in squad_team_ids] \
+            if match.home_team_id and match.away_team_id else []
+        home_squad = [h for h in squad if h.team_id == match.home_team_id]
+        away_squad = [h for h in squad if h.team_id == match.away_team_id]
+
+        # 球员在本赛事的队伍归属：优先本场两队中的记录
+        player_histories: Dict[str, PlayerTeamHistory] = {}
+        for history in histories:
+            current = player_histories.get(history.player_id)
+            if current is None or (current.team_id not in squad_team_ids and history.team_id in squad_team_ids):
+                player_histories[history.player_id] = history
+
+        players = {h.player_id: h.player for h in histories if h.player}
+        missing_players = event_player_ids - set(players)
+        if missing_players:
+            players.update({p.id: p for p in Player.query.filter(Player.id.in_(missing_players)).all()})
+
+        # 参与ID -> 球队名称
+        team_ids = {h.team_id for h in histories if h.team_id} | {e.team_id for e in events if e.team_id}
+        team_names: Dict[int, str] = {}
+        for participation in (match.home_team, match.away_team):
+            if participation and participation.team_base:
+                team_names[participation.id] = participation.team_base.name
+        unresolved = team_ids - set(team_names)
+        if unresolved:
+            rows = (
+                db.session.query(TeamTournamentParticipation.id, TeamBase.name)
+                .join(TeamBase, TeamTournamentParticipation.team_base_id == TeamBase.id)
+                .filter(TeamTournamentParticipation.id.in_(unresolved))
+                .all()
+            )
+            team_names.update({participation_id: name for participation_id, name in rows})
+
+        # 球员展示顺序：主队名单、客队名单、其余事件球员
+        ordered_ids: List[str] = []
+        for history in sorted(home_squad, key=lambda h: (h.player_number or 0, h.player_id)) + \
+                sorted(away_squad, key=lambda h: (h.player_number or 0, h.player_id)):
+            if history.player_id not in ordered_ids:
+                ordered_ids.append(history.player_id)
+        for event in events:
+            if event.player_id and event.player_id not in ordered_ids:
+                ordered_ids.append(event.player_id)
+
+        return {
+            'players': players,
+            'player_histories': player_histories,
+            'team_names': team_names,
+            'player_order': ordered_ids,
+            'total_players': len(home_squad) + len(away_squad)
+        }
+
+    def _build_events_data(self, events: List, context: Dict[str, Any]) -> List[Dict[str, Any]]:
         """构建事件数据用于前端展示"""
         events_data = []
         for event in events:
@@ -442,26 +610,16 @@ class MatchService:
             team_name = '未知球队'
             
             if event.player_id:
-                player = Player.query.get(event.player_id)
+                player = context['players'].get(event.player_id)
                 if player:
                     player_name = player.name or '未知球员'
-                    # 优先从球员队伍历史记录获取队伍名称
-                team_history = PlayerTeamHistory.query.filter_by(
-                    player_id=event.player_id,
-                    tournament_id=tournament_id
-                ).first()
-                if team_history and team_history.team_info:
-                    # 通过team_base获取球队名称
-                    if hasattr(team_history.team_info, 'team_base') and team_history.team_info.team_base:
-                        team_name = team_history.team_info.team_base.name
-                    else:
-                        team_name = '未知球队'
-                elif hasattr(player, 'team') and player.team:
-                    team_name = player.team.name            # 如果事件直接关联了队伍，使用事件的队伍信息
-            if event.team_id:
-                team = Team.query.get(event.team_id)
-                if team:
-                    team_name = team.name
+                # 优先从球员队伍历史记录获取队伍名称
+                team_history = context['player_histories'].get(event.player_id)
+                if team_history:
+                    team_name = context['team_names'].get(team_history.team_id, '未知球队')
+            # 如果事件直接关联了队伍，使用事件的队伍信息
+            if event.team_id and event.team_id in context['team_names']:
+                team_name = context['team_names'][event.team_id]
             
             event_data = {
                 'id': event.id,
@@ -511,98 +669,44 @@ class MatchService:
             'away_score_from_events': away_score_from_events
         }
 
-    def _get_players_data(self, events: List, match) -> List[Dict[str, Any]]:
+    def _get_players_data(self, events: List, context: Dict[str, Any]) -> List[Dict[str, Any]]:
         """获取参赛球员信息"""
         players_data = []
-        all_players = set()
-        
-        # 从事件中获取参与的球员
+        logger.info(f"找到 {len(context['player_order'])} 个参赛球员")
+
+        events_by_player: Dict[str, List] = {}
         for event in events:
             if event.player_id:
-                all_players.add(event.player_id)
-        
-        # 获取两支队伍的所有球员
-        total_team_players = 0
-        if match.home_team_id and match.away_team_id:
-            home_team_histories = PlayerTeamHistory.query.filter_by(
-                team_id=match.home_team_id,
-                tournament_id=match.tournament_id
-            ).all()
-            
-            away_team_histories = PlayerTeamHistory.query.filter_by(
-                team_id=match.away_team_id,
-                tournament_id=match.tournament_id
-            ).all()
-            
-            total_team_players = len(home_team_histories) + len(away_team_histories)
-            
-            # 将所有队伍球员加入到all_players集合中
-            for history in home_team_histories + away_team_histories:
-                if history.player_id:
-                    all_players.add(history.player_id)
-        
-        logger.info(f"找到 {len(all_players)} 个参赛球员")
+                events_by_player.setdefault(event.player_id, []).append(event)
         
         # 为每个球员统计数据
-        for player_id in all_players:
-            try:
-                player = Player.query.get(player_id)
-                if not player:
-                    continue
-                
-                # 获取球员在此赛事中的队伍归属
-                team_history = PlayerTeamHistory.query.filter_by(
-                    player_id=player_id,
-                    tournament_id=match.tournament_id
-                ).first()
-                
-                # 统计该球员在本场比赛的各类事件
-                player_events = [e for e in events if e.player_id == player_id]
-                player_goals = sum(1 for e in player_events if e.event_type == '进球')
-                player_own_goals = sum(1 for e in player_events if e.event_type == '乌龙球')
-                player_yellow_cards = sum(1 for e in player_events if e.event_type == '黄牌')
-                player_red_cards = sum(1 for e in player_events if e.event_type == '红牌')
-                
-                # 获取球员号码和队伍名称
-                player_number = 0
-                team_name = '未知球队'
-                
-                if team_history:
-                    player_number = team_history.player_number or 0
-                    # 通过team_base获取球队名称
-                    if team_history.team_info and hasattr(team_history.team_info, 'team_base') and team_history.team_info.team_base:
-                        team_name = team_history.team_info.team_base.name
-                    else:
-                        team_name = '未知球队'
-                elif hasattr(player, 'team') and player.team:
-                    team_name = player.team.name
-                    player_number = player.number or 0
-                
-                players_data.append({
-                    'player_id': player.id,
-                    'player_name': player.name or '未知球员',
-                    'team_name': team_name,
-                    'player_number': player_number,
-                    'goals': player_goals,
-                    'own_goals': player_own_goals,
-                    'yellow_cards': player_yellow_cards,
-                    'red_cards': player_red_cards
-                })
-                
-            except Exception as player_error:
-                logger.error(f"处理球员{player_id}数据时出错: {player_error}")
+        for player_id in context['player_order']:
+            player = context['players'].get(player_id)
+            if not player:
                 continue
+
+            # 统计该球员在本场比赛的各类事件
+            player_events = events_by_player.get(player_id, [])
+            team_history = context['player_histories'].get(player_id)
+
+            players_data.append({
+                'player_id': player.id,
+                'player_name': player.name or '未知球员',
+                'team_name': context['team_names'].get(team_history.team_id, '未知球队') if team_history else '未知球队',
+                'player_number': (team_history.player_number or 0) if team_history else 0,
+                'goals': sum(1 for e in player_events if e.event_type == '进球'),
+                'own_goals': sum(1 for e in player_events if e.event_type == '乌龙球'),
+                'yellow_cards': sum(1 for e in player_events if e.event_type == '黄牌'),
+                'red_cards': sum(1 for e in player_events if e.event_type == '红牌')
+            })
         
-        # 设置总球员数
-        setattr(self, '_total_players', total_team_players)
         return players_data
 
     def _build_detailed_match_data(self, match, statistics: Dict[str, Any], 
                                  players_data: List[Dict[str, Any]], 
-                                 events_data: List[Dict[str, Any]]) -> Dict[str, Any]:
+                                 events_data: List[Dict[str, Any]], total_players: int = 0) -> Dict[str, Any]:
         """构建详细的比赛数据"""
-        total_players = getattr(self, '_total_players', 0)
-        
+
         match_data = {
             'id': match.id,
             'home_team_name': match.home_team.team_base.name if match.home_team and match.home_team.team_base else '主队',
@@ -622,3 +726,29 @@ class MatchService:
         match_data.update(statistics)
         
         return match_data
+
+
+def _invalidate_match_detail(sender, match_id=None, **_):
+    """本场事件或比赛信息变更：失效该场详情缓存"""
+    if match_id is not None:
+        cache.invalidate_tags([f"match_detail:match:{match_id}"])
+
+
+def _invalidate_tournament_match_details(sender, tournament_id=None, **_):
+    """名单变更：失效该赛事所有比赛详情缓存（球员号码/归属可能变化）"""
+    if tournament_id is not None:
+        cache.invalidate_tags([f"match_detail:tournament:{tournament_id}"])
+
+
+def _invalidate_all_match_details(sender, **_):
+    """球员/球队/赛事名称等基础数据变更"""
+    cache.invalidate_tags(['match_detail'])
+
+
+def connect_match_detail_invalidation():
+    """订阅领域变更通知以失效比赛详情缓存"""
+    from app import signals
+    signals.event_changed.connect(_invalidate_match_detail)
+    signals.match_changed.connect(_invalidate_match_detail)
+    signals.roster_changed.connect(_invalidate_tournament_match_details)
+    signals.reference_changed.connect(_invalidate_all_match_details)
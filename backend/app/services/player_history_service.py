@@ -7,12 +7,14 @@
 from app.models import Player, PlayerTeamHistory, Tournament, Season, Competition, TeamBase
 from app.utils.player_history_utils import PlayerHistoryUtils
 from app.database import db
+from app.db_routing import read_replica
 from sqlalchemy import desc, func
 from collections import defaultdict
 from datetime import datetime
 from typing import List, Dict, Optional, Any
 
 
+@read_replica
 class PlayerHistoryService:
     """球员历史数据服务类"""
     
@@ -1,6 +1,8 @@
 """
 球员服务层 - 处理球员相关的业务逻辑
 """
+from sqlalchemy.orm import joinedload
+
 from app.database import db
 from app.models.player import Player
 from app.models.player_team_history import PlayerTeamHistory
@@ -21,6 +23,10 @@ class PlayerService:
         try:
             players = Player.query.all()
             players_data = []
+            # 赛事数量有限，一次加载并预热请求级缓存，避免每条球员历史单独查询
+            Tournament.prime_memo(Tournament.query.options(
+                joinedload(Tournament.season), joinedload(Tournament.competition)
+            ).all())
 
             for player in players:
                 try:
@@ -185,7 +191,7 @@ class PlayerService:
                 team_info, match_type, _ = PlayerService._get_history_team_info(history)
                 team_histories.append(team_info)
 
-                tournament = Tournament.query.get(history.tournament_id)
+                tournament = Tournament.get_memoized(history.tournament_id)
                 if tournament and tournament.season_name:
                     season_key = tournament.season_name
                     if season_key not in seasons_data:
@@ -232,7 +238,7 @@ class PlayerService:
     @staticmethod
     def _get_history_team_info(history: PlayerTeamHistory) -> Tuple[Dict[str, Any], str, Optional[int]]:
         """从历史记录中提取队伍信息和比赛类型"""
-        tournament = Tournament.query.get(history.tournament_id) if history.tournament_id else None
+        tournament = Tournament.get_memoized(history.tournament_id)
         match_type = ''
         competition_id = None
         tournament_name = None
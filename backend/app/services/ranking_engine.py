@@ -0,0 +1,188 @@
+"""
+排行榜查询引擎 - 一次查询计算所有竞赛的 Top-N 榜单
+
+每类榜单一条 SQL：按 (竞赛, 分组键) 聚合后用
+ROW_NUMBER() OVER (PARTITION BY competition_id ORDER BY ...) 截取前 N 名；
+数据库不支持窗口函数时（MySQL < 8.0 / SQLite < 3.25）退回同一聚合查询 + Python 分组截取。
+并列名次以球员ID/球队名称作确定性次序。
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+from sqlalchemy import func, or_
+
+from app.database import db
+from app.models.competition import Competition
+from app.models.season import Season
+from app.models.tournament import Tournament
+from app.models.team import Team
+from app.models.player import Player
+from app.models.player_team_history import PlayerTeamHistory
+from app.models.team_tournament_participation import TeamTournamentParticipation
+from app.models.team_base import TeamBase
+from app.services.stats_service import StatsService
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class RankingEngine:
+    """跨竞赛排行榜查询引擎"""
+
+    DEFAULT_LIMIT = 5
+    TOP_N_BOARDS = ('player_goals', 'team_goals', 'player_cards', 'team_cards')
+
+    @staticmethod
+    def supports_window_functions() -> bool:
+        """当前数据库是否支持窗口函数"""
+        dialect = db.engine.dialect
+        if dialect.name == 'sqlite':
+            import sqlite3
+            return sqlite3.sqlite_version_info >= (3, 25, 0)
+        if dialect.name in ('mysql', 'mariadb'):
+            version = dialect.server_version_info or ()
+            if getattr(dialect, 'is_mariadb', False):
+                return version >= (10, 2)
+            return version >= (8, 0)
+        # PostgreSQL 等主流数据库均支持
+        return True
+
+    @staticmethod
+    def all_rankings(season_id: Optional[int] = None, limit: int = DEFAULT_LIMIT,
+                     use_window: Optional[bool] = None) -> Dict[str, Any]:
+        """所有竞赛在指定赛季（默认最近赛季）的排行榜，结构与 StatsService.get_all_rankings 一致"""
+        if season_id:
+            season = db.session.get(Season, season_id)
+        else:
+            season = Season.query.order_by(Season.start_time.desc()).first()
+
+        competitions = Competition.query.all()
+        if season is None:
+            return {
+                f"comp_{comp.competition_id}": dict(StatsService.empty_rankings(),
+                                                   competitionName=comp.name, seasonName='')
+                for comp in competitions
+            }
+
+        if use_window is None:
+            use_window = RankingEngine.supports_window_functions()
+
+        active = {
+            row[0] for row in db.session.query(Tournament.competition_id)
+            .filter(Tournament.season_id == season.season_id).distinct().all()
+        }
+
+        boards: Dict[str, Dict[int, List[Dict[str, Any]]]] = {}
+        for board_type in RankingEngine.TOP_N_BOARDS:
+            query, order_by = RankingEngine._board_query(board_type, season.season_id)
+            boards[board_type] = RankingEngine._top_n(board_type, query, order_by, limit, use_window)
+        query, order_by = RankingEngine._board_query('points', season.season_id)
+        boards['points'] = RankingEngine._top_n('points', query, order_by, None, use_window)
+
+        rankings = {}
+        for comp in competitions:
+            key = f"comp_{comp.competition_id}"
+            if comp.competition_id in active:
+                rankings[key] = StatsService.assemble_rankings({
+                    board_type: rows.get(comp.competition_id, []) for board_type, rows in boards.items()
+                })
+                rankings[key]['seasonName'] = season.name
+            else:
+                rankings[key] = StatsService.empty_rankings()
+                rankings[key]['seasonName'] = ''
+            rankings[key]['competitionName'] = comp.name
+        return rankings
+
+    @staticmethod
+    def _top_n(board_type: str, query, order_by: Tuple, limit: Optional[int],
+               use_window: bool) -> Dict[int, List[Dict[str, Any]]]:
+        """执行榜单查询并按竞赛分组（limit 为 None 时不截取）"""
+        if limit is not None and use_window:
+            rn = func.row_number().over(partition_by=Tournament.competition_id, order_by=order_by).label('rn')
+            sub = query.add_columns(rn).subquery()
+            rows = (
+                db.session.query(sub)
+                .filter(sub.c.rn <= limit)
+                .order_by(sub.c.competition_id, sub.c.rn)
+                .all()
+            )
+        else:
+            rows = query.order_by(Tournament.competition_id, *order_by).all()
+
+        grouped: Dict[int, List[Dict[str, Any]]] = {}
+        for row in rows:
+            bucket = grouped.setdefault(row.competition_id, [])
+            if limit is None or len(bucket) < limit:
+                bucket.append(StatsService.format_board_row(board_type, row))
+        return grouped
+
+    @staticmethod
+    def _board_query(board_type: str, season_id: int):
+        """构造按 (竞赛, 分组键) 聚合的查询及其排序表达式"""
+        competition_id = Tournament.competition_id.label('competition_id')
+
+        if board_type in ('player_goals', 'player_cards'):
+            goals = func.sum(PlayerTeamHistory.tournament_goals)
+            yellow = func.sum(PlayerTeamHistory.tournament_yellow_cards)
+            red = func.sum(PlayerTeamHistory.tournament_red_cards)
+            if board_type == 'player_goals':
+                columns = (goals.label('goals'),)
+                condition = PlayerTeamHistory.tournament_goals > 0
+                order_by = (goals.desc(), PlayerTeamHistory.player_id)
+            else:
+                columns = (yellow.label('yellow_cards'), red.label('red_cards'))
+                condition = or_(PlayerTeamHistory.tournament_yellow_cards > 0,
+                                PlayerTeamHistory.tournament_red_cards > 0)
+                order_by = (red.desc(), yellow.desc(), PlayerTeamHistory.player_id)
+            query = (
+                db.session.query(
+                    competition_id,
+                    PlayerTeamHistory.player_id.label('player_id'),
+                    Player.name.label('player_name'),
+                    TeamBase.name.label('team_name'),
+                    *columns
+                )
+                .join(Tournament, PlayerTeamHistory.tournament_id == Tournament.id)
+                .join(Player, PlayerTeamHistory.player_id == Player.id)
+                .outerjoin(TeamTournamentParticipation, PlayerTeamHistory.team_id == TeamTournamentParticipation.id)
+                .outerjoin(TeamBase, TeamTournamentParticipation.team_base_id == TeamBase.id)
+                .filter(Tournament.season_id == season_id, condition)
+                .group_by(Tournament.competition_id, PlayerTeamHistory.player_id, Player.name, TeamBase.name)
+            )
+            return query, order_by
+
+        goals = func.sum(Team.tournament_goals)
+        conceded = func.sum(Team.tournament_goals_conceded)
+        difference = func.sum(Team.tournament_goal_difference)
+        yellow = func.sum(Team.tournament_yellow_cards)
+        red = func.sum(Team.tournament_red_cards)
+        condition = None
+        if board_type == 'team_goals':
+            columns = (goals.label('goals'), conceded.label('goals_conceded'), difference.label('goal_difference'))
+            condition = Team.tournament_goals > 0
+            order_by = (goals.desc(), Team.name)
+        elif board_type == 'team_cards':
+            columns = (yellow.label('yellow_cards'), red.label('red_cards'))
+            condition = or_(Team.tournament_yellow_cards > 0, Team.tournament_red_cards > 0)
+            order_by = (red.desc(), yellow.desc(), Team.name)
+        elif board_type == 'points':
+            points = func.sum(Team.tournament_points)
+            columns = (
+                func.sum(Team.matches_played).label('matches_played'),
+                points.label('points'),
+                goals.label('goals'),
+                conceded.label('goals_conceded'),
+                difference.label('goal_difference')
+            )
+            order_by = (points.desc(), difference.desc(), goals.desc(), Team.name)
+        else:
+            raise ValueError(f'未知的榜单类型: {board_type}')
+
+        query = (
+            db.session.query(competition_id, Team.name.label('team_name'), *columns)
+            .join(Tournament, Team.tournament_id == Tournament.id)
+            .filter(Tournament.season_id == season_id)
+            .group_by(Tournament.competition_id, Team.name)
+        )
+        if condition is not None:
+            query = query.filter(condition)
+        return query, order_by
@@ -0,0 +1,419 @@
+"""
+应用层增量统计聚合 - 可替代 football_new.sql 中的统计触发器
+
+对应关系:
+  after_event_insert / after_event_update / after_event_delete  -> 事件增量（比分、失球、进球、红黄牌）
+  trg_update_points_and_ranking_after_match_finish            -> 完赛积分、胜平负与排名
+  trg_ttp_before_insert / trg_ttp_before_update               -> 净胜球 = 进球 - 失球
+
+启用方式: STATS_AGGREGATION = 'app'（默认 'trigger' 由数据库触发器维护）。
+两种方式不可同时生效，否则统计会被重复累加；启用前需删除上述统计触发器。
+
+实现要点:
+  - 在 after_flush 中于同一连接、同一事务内执行，与触发器一样随写入一起提交或回滚
+  - 校验与报错信息和触发器一致，违反时抛出 ValueError
+  - 同一次 flush 内的增量按行合并（批量录入时每个球员/球队/比赛各一条 UPDATE）；
+    递减按触发器语义下限为 0
+  - 事件修改时，球队与事件类型均未变化则不调整统计（与 after_event_update 一致）
+  - Query.delete() 批量删除事件时经 do_orm_execute 先回滚对应统计
+"""
+
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from flask import current_app, has_app_context
+from sqlalchemy import bindparam, case, event as sa_event, inspect, select, text, update
+
+from app.models.event import Event
+from app.models.match import Match
+from app.models.player import Player
+from app.models.player_team_history import PlayerTeamHistory
+from app.models.team_tournament_participation import TeamTournamentParticipation
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# 触发器名称（启用应用层聚合前需删除）
+STATS_TRIGGERS = (
+    'after_event_insert',
+    'after_event_update',
+    'after_event_delete',
+    'trg_update_points_and_ranking_after_match_finish',
+)
+
+_trigger_check = {'done': False}
+
+
+class StatsDelta:
+    """一次 flush 内累积的统计增量（按行合并）"""
+
+    def __init__(self):
+        self.matches: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        self.teams: Dict[int, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        self.players: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        self.histories: Dict[Tuple[str, int, int], Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+
+    def __bool__(self):
+        return bool(self.matches or self.teams or self.players or self.histories)
+
+
+class StatsAggregator:
+    """应用层统计聚合器"""
+
+    GOAL = '进球'
+    OWN_GOAL = '乌龙球'
+    RED_CARD = '红牌'
+    YELLOW_CARD = '黄牌'
+
+    @staticmethod
+    def enabled() -> bool:
+        return has_app_context() and current_app.config.get('STATS_AGGREGATION', 'trigger') == 'app'
+
+    # ---------------- 事件增量 ----------------
+    @staticmethod
+    def add_event_delta(delta: StatsDelta, match_info: Dict[str, Any], team_id: int,
+                        player_id: Optional[str], event_type: str, sign: int) -> None:
+        """按事件类型累积增量；sign 为 +1（新增）或 -1（回滚）"""
+        match_id = match_info['id']
+        home, away, tournament_id = match_info['home'], match_info['away'], match_info['tournament_id']
+
+        if event_type == StatsAggregator.GOAL:
+            if team_id == home:
+                delta.matches[match_id]['home_score'] += sign
+                delta.teams[away]['tournament_goals_conceded'] += sign
+            elif team_id == away:
+                delta.matches[match_id]['away_score'] += sign
+                delta.teams[home]['tournament_goals_conceded'] += sign
+            delta.teams[team_id]['tournament_goals'] += sign
+            delta.players[player_id]['career_goals'] += sign
+            delta.histories[(player_id, team_id, tournament_id)]['tournament_goals'] += sign
+
+        elif event_type == StatsAggregator.OWN_GOAL:
+            # 乌龙球只计入对方比分与本方失球，不计入对方进球与球员数据（与触发器一致）
+            if team_id == home:
+                delta.matches[match_id]['away_score'] += sign
+                delta.teams[home]['tournament_goals_conceded'] += sign
+            elif team_id == away:
+                delta.matches[match_id]['home_score'] += sign
+                delta.teams[away]['tournament_goals_conceded'] += sign
+
+        elif event_type == StatsAggregator.RED_CARD:
+            delta.teams[team_id]['tournament_red_cards'] += sign
+            delta.players[player_id]['career_red_cards'] += sign
+            delta.histories[(player_id, team_id, tournament_id)]['tournament_red_cards'] += sign
+
+        elif event_type == StatsAggregator.YELLOW_CARD:
+            delta.teams[team_id]['tournament_yellow_cards'] += sign
+            delta.players[player_id]['career_yellow_cards'] += sign
+            delta.histories[(player_id, team_id, tournament_id)]['tournament_yellow_cards'] += sign
+
+    @staticmethod
+    def apply(conn, delta: StatsDelta) -> None:
+        """将合并后的增量写入数据库"""
+        for match_id, columns in delta.matches.items():
+            values = StatsAggregator._values(Match, columns)
+            if values:
+                conn.execute(update(Match).where(Match.id == match_id).values(StatsAggregator._keyed(Match, values)))
+
+        for team_id, columns in delta.teams.items():
+            values = StatsAggregator._values(TeamTournamentParticipation, columns)
+            if not values:
+                continue
+            # 净胜球先于进球/失球赋值，MySQL 按从左到右求值时仍基于旧值计算
+            goals = values.get('tournament_goals', TeamTournamentParticipation.tournament_goals)
+            conceded = values.get('tournament_goals_conceded', TeamTournamentParticipation.tournament_goals_conceded)
+            ordered = [(TeamTournamentParticipation.tournament_goal_difference, goals - conceded)]
+            ordered += [(getattr(TeamTournamentParticipation, name), value) for name, value in values.items()]
+            conn.execute(
+                update(TeamTournamentParticipation)
+                .where(TeamTournamentParticipation.id == team_id)
+                .ordered_values(*ordered)
+            )
+
+        for player_id, columns in delta.players.items():
+            values = StatsAggregator._values(Player, columns)
+            if values:
+                conn.execute(update(Player).where(Player.id == player_id).values(StatsAggregator._keyed(Player, values)))
+
+        for (player_id, team_id, tournament_id), columns in delta.histories.items():
+            values = StatsAggregator._values(PlayerTeamHistory, columns)
+            if values:
+                conn.execute(
+                    update(PlayerTeamHistory)
+                    .where(PlayerTeamHistory.player_id == player_id,
+                           PlayerTeamHistory.team_id == team_id,
+                           PlayerTeamHistory.tournament_id == tournament_id)
+                    .values(StatsAggregator._keyed(PlayerTeamHistory, values))
+                )
+
+    @staticmethod
+    def _values(model, columns: Dict[str, int]) -> Dict[str, Any]:
+        values = {}
+        for name, amount in columns.items():
+            if amount == 0:
+                continue
+            column = getattr(model, name)
+            if amount > 0:
+                values[name] = column + amount
+            else:
+                values[name] = case((column + amount > 0, column + amount), else_=0)
+        return values
+
+    @staticmethod
+    def _keyed(model, values: Dict[str, Any]) -> Dict[Any, Any]:
+        # 以映射属性为键，列名为中文时 Core 执行也能正确对应
+        return {getattr(model, name): value for name, value in values.items()}
+
+    # ---------------- 完赛积分与排名 ----------------
+    @staticmethod
+    def apply_match_finished(conn, match_id: str) -> None:
+        """比赛首次完赛：按当前比分计算积分、胜平负并重排赛事排名"""
+        row = conn.execute(
+            select(Match.home_team_id.label('home_team_id'), Match.away_team_id.label('away_team_id'),
+                   Match.tournament_id.label('tournament_id'), Match.home_score.label('home_score'),
+                   Match.away_score.label('away_score'))
+            .where(Match.id == match_id)
+        ).first()
+        if row is None or row.home_team_id is None or row.away_team_id is None:
+            raise ValueError('比赛主客队信息不完整，无法计算积分')
+
+        home_score, away_score = row.home_score or 0, row.away_score or 0
+        if home_score > away_score:
+            outcomes = ((row.home_team_id, 3, 'wins'), (row.away_team_id, 0, 'losses'))
+        elif home_score < away_score:
+            outcomes = ((row.home_team_id, 0, 'losses'), (row.away_team_id, 3, 'wins'))
+        else:
+            outcomes = ((row.home_team_id, 1, 'draws'), (row.away_team_id, 1, 'draws'))
+
+        for (team_id, points, result_column), side in zip(outcomes, ('主队', '客队')):
+            result = conn.execute(
+                update(TeamTournamentParticipation)
+                .where(TeamTournamentParticipation.id == team_id,
+                       TeamTournamentParticipation.tournament_id == row.tournament_id)
+                .values({
+                    TeamTournamentParticipation.tournament_points: TeamTournamentParticipation.tournament_points + points,
+                    TeamTournamentParticipation.matches_played: TeamTournamentParticipation.matches_played + 1,
+                    getattr(TeamTournamentParticipation, result_column):
+                        getattr(TeamTournamentParticipation, result_column) + 1,
+                })
+            )
+            if result.rowcount == 0:
+                raise ValueError(f'{side}积分更新失败，球队参与记录不存在')
+
+        StatsAggregator.rerank_tournament(conn, row.tournament_id)
+
+    @staticmethod
+    def rerank_tournament(conn, tournament_id: int) -> None:
+        """按 积分、净胜球、进球、参与ID 重写赛事内有效参赛队的排名"""
+        ttp = TeamTournamentParticipation
+        ids = conn.execute(
+            select(ttp.id)
+            .where(ttp.tournament_id == tournament_id, ttp.status == 'active')
+            .order_by(ttp.tournament_points.desc(), ttp.tournament_goal_difference.desc(),
+                      ttp.tournament_goals.desc(), ttp.id)
+        ).scalars().all()
+        if not ids:
+            raise ValueError('排名更新失败，请检查赛事参与记录')
+        conn.execute(
+            update(ttp.__table__)
+            .where(ttp.__table__.c['参与ID'] == bindparam('b_id'))
+            .values({ttp.__table__.c['赛事排名']: bindparam('b_rank')}),
+            [{'b_id': team_id, 'b_rank': rank} for rank, team_id in enumerate(ids, start=1)]
+        )
+
+
+class _FlushContext:
+    """单次 flush 内的比赛/参赛队查询缓存"""
+
+    def __init__(self, session, conn):
+        self.conn = conn
+        self.matches: Dict[str, Optional[Dict[str, Any]]] = {}
+        self.active_teams: Dict[int, Set[int]] = {}
+        # 同一 flush 内被删除的比赛在 flush 后已不存在，使用会话中的对象信息
+        self.deleted_matches = {obj.id: obj for obj in session.deleted if isinstance(obj, Match)}
+
+    def match(self, match_id: str) -> Optional[Dict[str, Any]]:
+        if match_id not in self.matches:
+            row = self.conn.execute(
+                select(Match.id.label('id'), Match.home_team_id.label('home_team_id'),
+                       Match.away_team_id.label('away_team_id'), Match.tournament_id.label('tournament_id'),
+                       Match.status.label('status'))
+                .where(Match.id == match_id)
+            ).first()
+            if row is None:
+                row = self.deleted_matches.get(match_id)
+            info = None
+            if row is not None:
+                info = {'id': row.id, 'home': row.home_team_id, 'away': row.away_team_id,
+                        'tournament_id': row.tournament_id, 'status': row.status}
+            if info is not None and (info['home'] is None or info['away'] is None or info['tournament_id'] is None):
+                info = None
+            self.matches[match_id] = info
+        return self.matches[match_id]
+
+    def team_active(self, team_id: int, tournament_id: int) -> bool:
+        if tournament_id not in self.active_teams:
+            ttp = TeamTournamentParticipation
+            self.active_teams[tournament_id] = set(self.conn.execute(
+                select(ttp.id).where(ttp.tournament_id == tournament_id, ttp.status == 'active')
+            ).scalars().all())
+        return team_id in self.active_teams[tournament_id]
+
+
+def _old_value(obj, attr: str):
+    history = inspect(obj).attrs[attr].history
+    if history.deleted:
+        return history.deleted[0]
+    return getattr(obj, attr)
+
+
+def _add_inserted(ctx: _FlushContext, delta: StatsDelta, ev: Event) -> None:
+    if ev.team_id is None:
+        raise ValueError('事件必须指定有效的球队ID')
+    info = ctx.match(ev.match_id)
+    if info is None:
+        raise ValueError('比赛信息不存在或不完整')
+    if ev.team_id not in (info['home'], info['away']):
+        raise ValueError('球队未参与此比赛')
+    if not ctx.team_active(ev.team_id, info['tournament_id']):
+        raise ValueError('球队未报名参与此赛事或状态异常')
+    if info['status'] == 'F':
+        raise ValueError('比赛已结束，不允许添加新事件')
+    StatsAggregator.add_event_delta(delta, info, ev.team_id, ev.player_id, ev.event_type, +1)
+
+
+def _add_updated(ctx: _FlushContext, delta: StatsDelta, ev: Event) -> None:
+    if ev.team_id is None:
+        raise ValueError('事件必须指定有效的球队ID')
+    info = ctx.match(ev.match_id)
+    if info is None:
+        raise ValueError('比赛信息不存在或不完整')
+    if info['status'] == 'F':
+        raise ValueError('比赛已结束，不允许修改事件')
+
+    old_team, old_type = _old_value(ev, 'team_id'), _old_value(ev, 'event_type')
+    old_player, old_match = _old_value(ev, 'player_id'), _old_value(ev, 'match_id')
+    if not ctx.team_active(old_team, info['tournament_id']) or not ctx.team_active(ev.team_id, info['tournament_id']):
+        raise ValueError('相关球队记录不存在或状态异常')
+    if old_team == ev.team_id and old_type == ev.event_type:
+        return
+
+    # 回滚时比分行按旧比赛、主客队与赛事按新比赛判定（与触发器一致）
+    old_info = dict(info, id=old_match)
+    StatsAggregator.add_event_delta(delta, old_info, old_team, old_player, old_type, -1)
+    StatsAggregator.add_event_delta(delta, info, ev.team_id, ev.player_id, ev.event_type, +1)
+
+
+def _add_deleted(ctx: _FlushContext, delta: StatsDelta, match_id: str, team_id: Optional[int],
+                 player_id: Optional[str], event_type: str) -> None:
+    if team_id is None:
+        raise ValueError('无法处理球队ID为空的事件删除')
+    info = ctx.match(match_id)
+    if info is None:
+        raise ValueError('比赛信息不存在，无法回滚统计')
+    if info['status'] == 'F':
+        raise ValueError('比赛已结束，不允许删除事件')
+    if not ctx.team_active(team_id, info['tournament_id']):
+        raise ValueError('球队记录不存在或状态异常，无法回滚统计')
+    StatsAggregator.add_event_delta(delta, info, team_id, player_id, event_type, -1)
+
+
+def _ensure_no_triggers(conn) -> None:
+    """首次写入时确认数据库中没有统计触发器，避免与应用层聚合重复累加"""
+    if _trigger_check['done']:
+        return
+    if conn.dialect.name in ('mysql', 'mariadb'):
+        names = set(conn.execute(
+            text('SELECT TRIGGER_NAME FROM information_schema.TRIGGERS WHERE TRIGGER_SCHEMA = DATABASE()')
+        ).scalars().all())
+        conflict = [name for name in STATS_TRIGGERS if name in names]
+        if conflict:
+            raise RuntimeError(f"STATS_AGGREGATION=app 但数据库仍存在统计触发器 {', '.join(conflict)}，"
+                               f"请先删除这些触发器或改用 STATS_AGGREGATION=trigger")
+    _trigger_check['done'] = True
+
+
+def _before_flush(session, flush_context, instances):
+    if not StatsAggregator.enabled():
+        return
+    # 对应 trg_ttp_before_insert / trg_ttp_before_update
+    for obj in list(session.new) + list(session.dirty):
+        if isinstance(obj, TeamTournamentParticipation):
+            obj.tournament_goal_difference = (obj.tournament_goals or 0) - (obj.tournament_goals_conceded or 0)
+
+
+def _after_flush(session, flush_context):
+    if not StatsAggregator.enabled():
+        return
+
+    inserted = [obj for obj in session.new if isinstance(obj, Event)]
+    updated = [obj for obj in session.dirty if isinstance(obj, Event)
+               and session.is_modified(obj, include_collections=False)]
+    deleted = [obj for obj in session.deleted if isinstance(obj, Event)]
+    finished: List[str] = []
+    for obj in session.dirty:
+        if not isinstance(obj, Match):
+            continue
+        history = inspect(obj).attrs.status.history
+        old_status = history.deleted[0] if history.deleted else None
+        if history.added and obj.status == 'F' and old_status is not None and old_status != 'F':
+            finished.append(obj.id)
+        elif history.added and old_status == 'F' and obj.status == 'P':
+            logger.warning(f"比赛 {obj.id} 状态从已完成改为进行中，积分和排名可能需要手动调整")
+
+    if not (inserted or updated or deleted or finished):
+        return
+
+    conn = session.connection()
+    _ensure_no_triggers(conn)
+    ctx = _FlushContext(session, conn)
+    delta = StatsDelta()
+    for ev in deleted:
+        _add_deleted(ctx, delta, ev.match_id, ev.team_id, ev.player_id, ev.event_type)
+    for ev in updated:
+        _add_updated(ctx, delta, ev)
+    for ev in inserted:
+        _add_inserted(ctx, delta, ev)
+    if delta:
+        StatsAggregator.apply(conn, delta)
+    for match_id in finished:
+        StatsAggregator.apply_match_finished(conn, match_id)
+
+
+def _do_orm_execute(state):
+    """Query.delete() 批量删除事件时，先回滚被删除事件的统计"""
+    if not state.is_delete or not StatsAggregator.enabled():
+        return None
+    if not any(mapper.class_ is Event for mapper in state.all_mappers):
+        return None
+
+    session = state.session
+    criteria = state.statement.whereclause
+    query = select(Event.match_id.label('match_id'), Event.team_id.label('team_id'),
+                   Event.player_id.label('player_id'), Event.event_type.label('event_type'))
+    if criteria is not None:
+        query = query.where(criteria)
+    conn = session.connection()
+    rows = conn.execute(query).all()
+    if not rows:
+        return None
+
+    _ensure_no_triggers(conn)
+    ctx = _FlushContext(session, conn)
+    delta = StatsDelta()
+    for row in rows:
+        _add_deleted(ctx, delta, row.match_id, row.team_id, row.player_id, row.event_type)
+    StatsAggregator.apply(conn, delta)
+    return None
+
+
+def register_stats_aggregator(session) -> None:
+    """在会话（或 scoped_session）上注册应用层聚合钩子（幂等）；是否生效由 STATS_AGGREGATION 决定"""
+    for name, fn in (('before_flush', _before_flush),
+                     ('after_flush', _after_flush),
+                     ('do_orm_execute', _do_orm_execute)):
+        if not sa_event.contains(session, name, fn):
+            sa_event.listen(session, name, fn)
+
+
+__all__ = ['StatsAggregator', 'StatsDelta', 'STATS_TRIGGERS', 'register_stats_aggregator']
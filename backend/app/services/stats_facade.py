@@ -4,6 +4,7 @@
 """
 from typing import Any, Dict, List
 from app.services.stats_service import StatsService
+from app.services.leaderboard_service import LeaderboardService
 from app.services.participation_stats_service import ParticipationStatsService
 from app.utils.logger import get_logger
 
@@ -17,8 +18,8 @@ class StatsFacade:
 
     @staticmethod
     def all_rankings(season_id: int = None) -> Dict[str, Any]:
-        """所有赛事的多维排行榜（射手 / 牌数 / 积分）"""
-        return StatsService.get_all_rankings(season_id)
+        """所有赛事的多维排行榜（射手 / 牌数 / 积分），读取物化快照"""
+        return LeaderboardService.get_rankings(season_id)
 
     @staticmethod
     def tournament_points_ranking(tournament_id: int) -> List[Dict[str, Any]]:
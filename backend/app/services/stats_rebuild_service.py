@@ -0,0 +1,302 @@
+"""
+统计重建服务 - 由 event 与已完赛 match 全量重算聚合统计，输出偏差报告并批量修正
+
+重算范围（与触发器 / 应用层聚合口径一致，乌龙球只计入本方失球与对方比分）:
+  - team_tournament_participation: 进球、失球、净胜球、红黄牌、积分、轮数、胜平负、排名
+  - player_team_history: 赛事进球、红黄牌
+  - player: 职业生涯进球、红黄牌
+积分按已完赛比赛的已存比分计算（比分可由管理员直接修改，不以事件覆盖，仅在报告中列出不一致）；
+排名仅对存在已完赛比赛的赛事重排。
+
+查询: 事件按 (比赛, 球队, 球员, 类型) 分组一次、已完赛比赛一次、三张统计表各一次，
+其余在内存中完成；修正按批 executemany 写回，每批一个事务。
+"""
+
+import time
+from collections import Counter, defaultdict
+from typing import Any, Dict, List, Tuple
+
+from flask import current_app, has_app_context
+from sqlalchemy import bindparam, func, select, update
+
+from app.database import db
+from app.models.event import Event
+from app.models.match import Match
+from app.models.player import Player
+from app.models.player_team_history import PlayerTeamHistory
+from app.models.team_tournament_participation import TeamTournamentParticipation
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# 属性名 -> 重算字段名
+TEAM_FIELDS = {
+    'tournament_goals': 'goals',
+    'tournament_goals_conceded': 'conceded',
+    'tournament_goal_difference': 'difference',
+    'tournament_red_cards': 'red',
+    'tournament_yellow_cards': 'yellow',
+    'tournament_points': 'points',
+    'matches_played': 'played',
+    'wins': 'wins',
+    'draws': 'draws',
+    'losses': 'losses',
+}
+HISTORY_FIELDS = {
+    'tournament_goals': 'goals',
+    'tournament_red_cards': 'red',
+    'tournament_yellow_cards': 'yellow',
+}
+PLAYER_FIELDS = {
+    'career_goals': 'goals',
+    'career_red_cards': 'red',
+    'career_yellow_cards': 'yellow',
+}
+
+CARD_FIELDS = {'红牌': 'red', '黄牌': 'yellow'}
+
+
+class StatsRebuildService:
+    """统计重建业务逻辑服务类"""
+
+    DEFAULT_BATCH_SIZE = 500
+    SAMPLE_SIZE = 20
+
+    @staticmethod
+    def rebuild(apply: bool = True, batch_size: int = DEFAULT_BATCH_SIZE) -> Dict[str, Any]:
+        """全量重算并返回偏差报告；apply 为 False 时只报告不写入"""
+        started = time.perf_counter()
+        computed = StatsRebuildService._compute()
+
+        team_rows = db.session.execute(select(
+            TeamTournamentParticipation.id.label('id'),
+            TeamTournamentParticipation.tournament_id.label('tournament_id'),
+            TeamTournamentParticipation.tournament_rank.label('tournament_rank'),
+            *[getattr(TeamTournamentParticipation, attr).label(attr) for attr in TEAM_FIELDS]
+        )).all()
+        history_rows = db.session.execute(select(
+            PlayerTeamHistory.id.label('id'),
+            PlayerTeamHistory.player_id.label('player_id'),
+            PlayerTeamHistory.team_id.label('team_id'),
+            PlayerTeamHistory.tournament_id.label('tournament_id'),
+            *[getattr(PlayerTeamHistory, attr).label(attr) for attr in HISTORY_FIELDS]
+        )).all()
+        player_rows = db.session.execute(select(
+            Player.id.label('id'),
+            *[getattr(Player, attr).label(attr) for attr in PLAYER_FIELDS]
+        )).all()
+
+        ranks = StatsRebuildService._ranks(team_rows, computed)
+        team_fields = dict(TEAM_FIELDS, tournament_rank='rank')
+        team_drift = StatsRebuildService._diff(
+            team_rows, team_fields,
+            lambda row: dict(computed['teams'].get(row.id, {}), rank=ranks.get(row.id, row.tournament_rank))
+        )
+        history_drift = StatsRebuildService._diff(
+            history_rows, HISTORY_FIELDS,
+            lambda row: computed['histories'].get((row.player_id, row.team_id, row.tournament_id), {})
+        )
+        player_drift = StatsRebuildService._diff(
+            player_rows, PLAYER_FIELDS,
+            lambda row: computed['players'].get(row.id, {})
+        )
+
+        if apply:
+            StatsRebuildService._write(TeamTournamentParticipation, team_fields, team_drift, batch_size)
+            StatsRebuildService._write(PlayerTeamHistory, HISTORY_FIELDS, history_drift, batch_size)
+            StatsRebuildService._write(Player, PLAYER_FIELDS, player_drift, batch_size)
+            if team_drift or history_drift or player_drift:
+                StatsRebuildService._notify()
+
+        report = {
+            'dryRun': not apply,
+            'participations': StatsRebuildService._summary(team_rows, team_drift, apply),
+            'playerHistories': StatsRebuildService._summary(history_rows, history_drift, apply),
+            'players': StatsRebuildService._summary(player_rows, player_drift, apply),
+            'matchScoreMismatches': computed['score_mismatches'][:StatsRebuildService.SAMPLE_SIZE],
+            'matchScoreMismatchCount': len(computed['score_mismatches']),
+            'durationMs': round((time.perf_counter() - started) * 1000, 1),
+        }
+        logger.info(
+            f"统计重建{'（仅报告）' if not apply else ''}: 参赛记录偏差 {len(team_drift)}, "
+            f"球员赛事记录偏差 {len(history_drift)}, 球员生涯偏差 {len(player_drift)}, "
+            f"耗时 {report['durationMs']}ms"
+        )
+        return report
+
+    @staticmethod
+    def _compute() -> Dict[str, Any]:
+        """由事件与已完赛比赛重算全部统计"""
+        teams: Dict[int, Counter] = defaultdict(Counter)
+        histories: Dict[Tuple[str, int, int], Counter] = defaultdict(Counter)
+        players: Dict[str, Counter] = defaultdict(Counter)
+        event_scores: Dict[str, List[int]] = defaultdict(lambda: [0, 0])
+
+        rows = db.session.execute(
+            select(
+                Event.match_id.label('match_id'),
+                Event.team_id.label('team_id'),
+                Event.player_id.label('player_id'),
+                Event.event_type.label('event_type'),
+                Match.home_team_id.label('home'),
+                Match.away_team_id.label('away'),
+                Match.tournament_id.label('tournament_id'),
+                func.count().label('n'),
+            )
+            .join(Match, Event.match_id == Match.id)
+            .group_by(Event.match_id, Event.team_id, Event.player_id, Event.event_type,
+                      Match.home_team_id, Match.away_team_id, Match.tournament_id)
+        ).all()
+
+        for row in rows:
+            n = row.n
+            if row.team_id == row.home:
+                opponent, side = row.away, 0
+            elif row.team_id == row.away:
+                opponent, side = row.home, 1
+            else:
+                opponent, side = None, None
+
+            if row.event_type == '进球':
+                teams[row.team_id]['goals'] += n
+                if side is not None:
+                    event_scores[row.match_id][side] += n
+                    teams[opponent]['conceded'] += n
+                histories[(row.player_id, row.team_id, row.tournament_id)]['goals'] += n
+                players[row.player_id]['goals'] += n
+            elif row.event_type == '乌龙球':
+                if side is not None:
+                    event_scores[row.match_id][1 - side] += n
+                    teams[row.team_id]['conceded'] += n
+            elif row.event_type in CARD_FIELDS:
+                field = CARD_FIELDS[row.event_type]
+                teams[row.team_id][field] += n
+                histories[(row.player_id, row.team_id, row.tournament_id)][field] += n
+                players[row.player_id][field] += n
+
+        for counter in teams.values():
+            counter['difference'] = counter['goals'] - counter['conceded']
+
+        finished = db.session.execute(
+            select(
+                Match.id.label('id'),
+                Match.home_team_id.label('home'),
+                Match.away_team_id.label('away'),
+                Match.tournament_id.label('tournament_id'),
+                Match.home_score.label('home_score'),
+                Match.away_score.label('away_score'),
+            ).where(Match.status == 'F')
+        ).all()
+
+        score_mismatches = []
+        ranked_tournaments = set()
+        for match in finished:
+            home_score, away_score = match.home_score or 0, match.away_score or 0
+            ranked_tournaments.add(match.tournament_id)
+            for team_id, mine, theirs in ((match.home, home_score, away_score), (match.away, away_score, home_score)):
+                counter = teams[team_id]
+                counter['played'] += 1
+                if mine > theirs:
+                    counter['points'] += 3
+                    counter['wins'] += 1
+                elif mine < theirs:
+                    counter['losses'] += 1
+                else:
+                    counter['points'] += 1
+                    counter['draws'] += 1
+            from_events = event_scores.get(match.id, [0, 0])
+            if [home_score, away_score] != from_events:
+                score_mismatches.append({
+                    'matchId': match.id,
+                    'stored': [home_score, away_score],
+                    'fromEvents': from_events,
+                })
+
+        return {
+            'teams': teams,
+            'histories': histories,
+            'players': players,
+            'ranked_tournaments': ranked_tournaments,
+            'score_mismatches': score_mismatches,
+        }
+
+    @staticmethod
+    def _ranks(team_rows, computed) -> Dict[int, int]:
+        """存在已完赛比赛的赛事：按 积分、净胜球、进球、参与ID 重排有效参赛队"""
+        active_ids = set(db.session.execute(
+            select(TeamTournamentParticipation.id).where(TeamTournamentParticipation.status == 'active')
+        ).scalars().all())
+        by_tournament: Dict[int, List[int]] = defaultdict(list)
+        for row in team_rows:
+            if row.tournament_id in computed['ranked_tournaments'] and row.id in active_ids:
+                by_tournament[row.tournament_id].append(row.id)
+
+        teams = computed['teams']
+        ranks = {}
+        for ids in by_tournament.values():
+            ids.sort(key=lambda pid: (-teams[pid]['points'], -teams[pid]['difference'], -teams[pid]['goals'], pid))
+            ranks.update({pid: rank for rank, pid in enumerate(ids, start=1)})
+        return ranks
+
+    @staticmethod
+    def _diff(rows, fields: Dict[str, str], expected_for) -> List[Dict[str, Any]]:
+        """返回存在偏差的行：{'id', 'values': 重算值, 'changes': {属性: [已存, 重算]}}"""
+        drift = []
+        for row in rows:
+            expected = expected_for(row)
+            values, changes = {}, {}
+            for attr, key in fields.items():
+                stored = getattr(row, attr)
+                value = expected.get(key, 0)
+                values[attr] = value
+                if (stored or 0) != (value or 0) or (stored is None) != (value is None):
+                    changes[attr] = [stored, value]
+            if changes:
+                drift.append({'id': row.id, 'values': values, 'changes': changes})
+        return drift
+
+    @staticmethod
+    def _write(model, fields: Dict[str, str], drift: List[Dict[str, Any]], batch_size: int) -> None:
+        """按批 executemany 写回重算值（每批一个事务）"""
+        if not drift:
+            return
+        table = model.__table__
+        pk = model.__mapper__.primary_key[0]
+        columns = {attr: model.__mapper__.columns[attr] for attr in fields}
+        stmt = (
+            update(table)
+            .where(pk == bindparam('b_id'))
+            .values({column: bindparam(f'b_{attr}') for attr, column in columns.items()})
+        )
+        for start in range(0, len(drift), batch_size):
+            chunk = drift[start:start + batch_size]
+            params = [
+                dict({'b_id': item['id']}, **{f'b_{attr}': item['values'][attr] for attr in fields})
+                for item in chunk
+            ]
+            try:
+                db.session.execute(stmt, params)
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                raise
+        logger.info(f"统计重建: {table.name} 修正 {len(drift)} 行")
+
+    @staticmethod
+    def _notify() -> None:
+        # 直接写表不经过 ORM 变更收集，手动通知缓存与排行榜快照全部失效
+        from app import signals
+        sender = current_app._get_current_object() if has_app_context() else None
+        signals.reference_changed.send(sender, table='stats_rebuild', ident=None)
+
+    @staticmethod
+    def _summary(rows, drift: List[Dict[str, Any]], applied: bool) -> Dict[str, Any]:
+        return {
+            'checked': len(rows),
+            'drifted': len(drift),
+            'corrected': len(drift) if applied else 0,
+            'samples': [
+                {'id': item['id'], 'changes': item['changes']}
+                for item in drift[:StatsRebuildService.SAMPLE_SIZE]
+            ],
+        }
@@ -6,6 +6,7 @@ from typing import List, Dict, Any, Optional, Tuple
 from sqlalchemy import func, and_, case, or_
 
 from app.database import db
+from app.db_routing import read_replica
 from app.models.match import Match
 from app.models.team import Team
 from app.models.tournament import Tournament
@@ -21,6 +22,7 @@ from app.utils.logger import get_logger
 logger = get_logger(__name__)
 
 
+@read_replica
 class StatsService:
     """统计业务逻辑服务类"""
     
@@ -96,27 +98,40 @@ class StatsService:
     
     @staticmethod
     def get_all_rankings(season_id: int = None) -> Dict[str, Any]:
-        """获取所有赛事的排行榜数据"""
+        """获取所有赛事的排行榜数据（窗口函数引擎，每类榜单一条查询）"""
+        from app.services.ranking_engine import RankingEngine
         try:
             logger.info(f"开始获取排行榜数据, season_id={season_id}")
+            rankings = RankingEngine.all_rankings(season_id)
+            logger.info(f"成功获取 {len(rankings)} 个赛事的排行榜数据")
+            return rankings
+        except Exception as e:
+            logger.warning(f"排行榜引擎查询失败，改为逐竞赛聚合: {str(e)}")
+            db.session.rollback()
+            return StatsService.get_all_rankings_per_competition(season_id)
+
+    @staticmethod
+    def get_all_rankings_per_competition(season_id: int = None) -> Dict[str, Any]:
+        """逐竞赛聚合的排行榜（原实现，作为引擎降级路径与基准对照）"""
+        try:
+            logger.info(f"开始逐竞赛获取排行榜数据, season_id={season_id}")
             
             competitions = Competition.query.all()
             rankings = {}
+
+            # 未指定赛季时取最近一个赛季（循环外只查询一次）
+            target_season_id = season_id
+            if not target_season_id:
+                latest_season = Season.query.order_by(Season.start_time.desc()).first()
+                target_season_id = latest_season.season_id if latest_season else None
             
             for comp in competitions:
                 # 构建基础查询
                 query = Tournament.query.join(Season).filter(Tournament.competition_id == comp.competition_id)
                 
                 target_tournaments = []
-                if season_id:
-                    # 如果指定了赛季，获取该赛季的所有赛事
-                    target_tournaments = query.filter(Tournament.season_id == season_id).all()
-                else:
-                    # 否则获取最新的赛事（可能需要定义什么是"最新"，这里假设是最近一个赛季的所有赛事）
-                    # 先找到最近的赛季ID
-                    latest_season = Season.query.order_by(Season.start_time.desc()).first()
-                    if latest_season:
-                        target_tournaments = query.filter(Tournament.season_id == latest_season.season_id).all()
+                if target_season_id:
+                    target_tournaments = query.filter(Tournament.season_id == target_season_id).all()
                 
                 key = f"comp_{comp.competition_id}"
                 if target_tournaments:
@@ -127,13 +142,9 @@ class StatsService:
                     # 使用第一个赛事的赛季名称
                     rankings[key]['seasonName'] = target_tournaments[0].season.name if target_tournaments[0].season else ''
                 else:
-                    rankings[key] = {
-                        'topScorers': {'players': [], 'teams': []},
-                        'cards': {'players': [], 'teams': []},
-                        'points': [],
-                        'competitionName': comp.name,
-                        'seasonName': ''
-                    }
+                    rankings[key] = StatsService.empty_rankings()
+                    rankings[key]['competitionName'] = comp.name
+                    rankings[key]['seasonName'] = ''
             
             logger.info(f"成功获取 {len(rankings)} 个赛事的排行榜数据")
             return rankings
@@ -201,79 +212,107 @@ class StatsService:
                 'points': []
             }
     
+    @staticmethod
+    def empty_rankings() -> Dict[str, Any]:
+        """空排行榜结构"""
+        return {
+            'topScorers': {'players': [], 'teams': []},
+            'cards': {'players': [], 'teams': []},
+            'points': []
+        }
+
+    @staticmethod
+    def format_board_row(board_type: str, row: Any) -> Dict[str, Any]:
+        """将聚合查询行格式化为榜单条目"""
+        if board_type == 'player_goals':
+            return {
+                'id': row.player_id,
+                'name': row.player_name,
+                'team': row.team_name,
+                'goals': int(row.goals or 0)
+            }
+        if board_type == 'team_goals':
+            return {
+                'team': row.team_name,
+                'goals': int(row.goals or 0),
+                'goalsConceded': int(row.goals_conceded or 0),
+                'goalDifference': int(row.goal_difference or 0)
+            }
+        if board_type == 'player_cards':
+            return {
+                'id': row.player_id,
+                'name': row.player_name,
+                'team': row.team_name,
+                'yellowCards': int(row.yellow_cards or 0),
+                'redCards': int(row.red_cards or 0)
+            }
+        if board_type == 'team_cards':
+            return {
+                'team': row.team_name,
+                'yellowCards': int(row.yellow_cards or 0),
+                'redCards': int(row.red_cards or 0)
+            }
+        if board_type == 'points':
+            return {
+                'team': row.team_name,
+                'matchesPlayed': int(row.matches_played or 0),
+                'points': int(row.points or 0),
+                'goals': int(row.goals or 0),
+                'goalsConceded': int(row.goals_conceded or 0),
+                'goalDifference': int(row.goal_difference or 0)
+            }
+        raise ValueError(f'未知的榜单类型: {board_type}')
+
+    @staticmethod
+    def compute_board(board_type: str, tournament_ids: List[int]) -> List[Dict[str, Any]]:
+        """计算单个榜单（player_goals / team_goals / player_cards / team_cards / points）"""
+        if board_type == 'player_goals':
+            rows = StatsService._get_top_scorers_players(tournament_ids)
+        elif board_type == 'team_goals':
+            rows = StatsService._get_top_scorers_teams(tournament_ids)
+        elif board_type == 'player_cards':
+            rows = StatsService._get_player_cards_stats(tournament_ids)
+        elif board_type == 'team_cards':
+            rows = StatsService._get_team_cards_stats(tournament_ids)
+        elif board_type == 'points':
+            # 积分榜按球队名称聚合同赛季内所有赛事（与 TeamService 的聚合口径一致）
+            return StatsService._calculate_aggregated_team_points(tournament_ids)
+        else:
+            raise ValueError(f'未知的榜单类型: {board_type}')
+        return [StatsService.format_board_row(board_type, row) for row in rows]
+
+    @staticmethod
+    def assemble_rankings(boards: Dict[str, List[Dict[str, Any]]]) -> Dict[str, Any]:
+        """将各榜单组装为接口返回结构"""
+        return {
+            'topScorers': {
+                'players': boards.get('player_goals', []),
+                'teams': boards.get('team_goals', [])
+            },
+            'cards': {
+                'players': boards.get('player_cards', []),
+                'teams': boards.get('team_cards', [])
+            },
+            'points': boards.get('points', [])
+        }
+
     @staticmethod
     def _get_aggregated_rankings(tournaments: List[Tournament]) -> Dict[str, Any]:
         """获取聚合的排行榜数据（支持多个赛事）"""
         try:
             tournament_ids = [t.id for t in tournaments]
             if not tournament_ids:
-                return {
-                    'topScorers': {'players': [], 'teams': []},
-                    'cards': {'players': [], 'teams': []},
-                    'points': []
-                }
+                return StatsService.empty_rankings()
 
-            # 获取各项排行数据
-            player_goals = StatsService._get_top_scorers_players(tournament_ids)
-            team_goals = StatsService._get_top_scorers_teams(tournament_ids)
-            player_cards = StatsService._get_player_cards_stats(tournament_ids)
-            team_cards = StatsService._get_team_cards_stats(tournament_ids)
-            # 积分榜通常按赛事独立计算，聚合可能比较复杂，这里暂时只取第一个赛事的积分榜，或者需要重新计算
-            # 如果是同一赛季的多个阶段（如小组赛+淘汰赛），积分榜可能只针对小组赛
-            # 这里简单处理：合并所有赛事的积分榜，或者只取第一个
-            # 为了准确性，我们尝试聚合所有赛事的积分（如果有意义的话）
-            # 但通常积分榜是针对特定赛制的。这里我们假设取第一个赛事的积分榜作为展示，或者重新计算
-            # 考虑到 TeamService 是聚合的，这里也尝试聚合
-            team_points = StatsService._calculate_aggregated_team_points(tournament_ids)
-            
-            return {
-                'topScorers': {
-                    'players': [
-                        {
-                            'id': player.player_id,
-                            'name': player.player_name,
-                            'team': player.team_name,
-                            'goals': int(player.goals or 0)
-                        } for player in player_goals
-                    ],
-                    'teams': [
-                        {
-                            'team': team.team_name,
-                            'goals': int(team.goals or 0),
-                            'goalsConceded': int(team.goals_conceded or 0),
-                            'goalDifference': int(team.goal_difference or 0)
-                        } for team in team_goals
-                    ]
-                },
-                'cards': {
-                    'players': [
-                        {
-                            'id': player.player_id,
-                            'name': player.player_name,
-                            'team': player.team_name,
-                            'yellowCards': int(player.yellow_cards or 0),
-                            'redCards': int(player.red_cards or 0)
-                        } for player in player_cards
-                    ],
-                    'teams': [
-                        {
-                            'team': team.team_name,
-                            'yellowCards': int(team.yellow_cards or 0),
-                            'redCards': int(team.red_cards or 0)
-                        } for team in team_cards
-                    ]
-                },
-                'points': team_points
-            }
+            return StatsService.assemble_rankings({
+                board_type: StatsService.compute_board(board_type, tournament_ids)
+                for board_type in ('player_goals', 'team_goals', 'player_cards', 'team_cards', 'points')
+            })
             
         except Exception as e:
             logger.error(f"获取聚合排行榜失败: {str(e)}")
             # 即使失败也返回空结构，避免前端 500
-            return {
-                'topScorers': {'players': [], 'teams': []},
-                'cards': {'players': [], 'teams': []},
-                'points': []
-            }
+            return StatsService.empty_rankings()
 
     @staticmethod
     def _get_top_scorers_players(tournament_ids: List[int], limit: int = 5) -> List[Any]:
@@ -427,16 +466,7 @@ class StatsService:
             .all()
         )
         
-        return [
-            {
-                'team': team.team_name,
-                'matchesPlayed': int(team.matches_played or 0),
-                'points': int(team.points or 0),
-                'goals': int(team.goals or 0),
-                'goalsConceded': int(team.goals_conceded or 0),
-                'goalDifference': int(team.goal_difference or 0)
-            } for team in teams
-        ]
+        return [StatsService.format_board_row('points', team) for team in teams]
     
     @staticmethod
     def get_tournament_statistics(tournament_id: int) -> Dict[str, Any]:
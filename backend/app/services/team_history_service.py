@@ -6,10 +6,12 @@
 from app.models import TeamBase, TeamTournamentParticipation, Tournament, Season, PlayerTeamHistory
 from app.utils.team_history_utils import TeamHistoryUtils
 from app.database import db
+from app.db_routing import read_replica
 from sqlalchemy import desc, func
 from collections import defaultdict
 
 
+@read_replica
 class TeamHistoryService:
     """球队历史查询服务"""
     
@@ -83,20 +85,17 @@ class TeamHistoryService:
             # 获取该赛事中的球员统计 (从内存中获取)
             players_stats = player_stats_map.get(participation.id, [])
             
-            # 重新使用球员统计数据进行累加，以确保数据准确性（解决数据库中 participation 统计可能为 0 的问题）
-            # 同时保持了 N+1 优化的成果（数据已预加载）
-            p_goals = sum(p.tournament_goals for p in players_stats if p.tournament_goals)
-            p_yellow = sum(p.tournament_yellow_cards for p in players_stats if p.tournament_yellow_cards)
-            p_red = sum(p.tournament_red_cards for p in players_stats if p.tournament_red_cards)
-            
+            # 参赛记录的统计列由触发器/应用层聚合维护，偏差可通过 `flask stats rebuild` 修正
+            goals = participation.tournament_goals or 0
+            conceded = participation.tournament_goals_conceded or 0
             tournament_stats = {
                 'players_count': len(players_stats),
-                'total_goals': p_goals,
-                'total_goals_conceded': participation.tournament_goals_conceded if participation.tournament_goals_conceded is not None else 0, # 失球数通常只在球队记录中有
-                'total_goal_difference': participation.tournament_goal_difference if participation.tournament_goal_difference is not None else (p_goals - (participation.tournament_goals_conceded or 0)),
+                'total_goals': goals,
+                'total_goals_conceded': conceded,
+                'total_goal_difference': participation.tournament_goal_difference if participation.tournament_goal_difference is not None else goals - conceded,
                 'total_points': participation.tournament_points if participation.tournament_points is not None else 0,
-                'total_yellow_cards': p_yellow,
-                'total_red_cards': p_red
+                'total_yellow_cards': participation.tournament_yellow_cards or 0,
+                'total_red_cards': participation.tournament_red_cards or 0
             }
             
             # 序列化球员列表
@@ -244,20 +243,22 @@ class TeamHistoryService:
         total_ranking = 0
         ranking_count = 0
         
+        # 各参赛记录的球员人数一次分组统计；进球与红黄牌使用参赛记录的统计列
+        players_count = dict(
+            db.session.query(PlayerTeamHistory.team_id, func.count(PlayerTeamHistory.id))
+            .filter(PlayerTeamHistory.team_id.in_([p.id for p in participations]))
+            .group_by(PlayerTeamHistory.team_id)
+            .all()
+        )
+        
         for participation in participations:
             tournament = participation.tournament
             
-            # 获取该赛事中的球员统计
-            players_stats = PlayerTeamHistory.query.filter_by(
-                team_id=participation.id,
-                tournament_id=tournament.id
-            ).all()
-            
             tournament_stats = {
-                'players_count': len(players_stats),
-                'total_goals': sum(p.tournament_goals for p in players_stats),
-                'total_yellow_cards': sum(p.tournament_yellow_cards for p in players_stats),
-                'total_red_cards': sum(p.tournament_red_cards for p in players_stats)
+                'players_count': players_count.get(participation.id, 0),
+                'total_goals': participation.tournament_goals or 0,
+                'total_yellow_cards': participation.tournament_yellow_cards or 0,
+                'total_red_cards': participation.tournament_red_cards or 0
             }
             
             performance_record = {
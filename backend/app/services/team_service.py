@@ -1,12 +1,17 @@
 """球队服务层: 提供球队查询/创建/更新/删除与参赛实例及球员历史的组合逻辑。"""
+from collections import defaultdict
 from typing import Dict, List, Any, Optional, Tuple
+from flask import current_app
+from sqlalchemy.orm import joinedload
 from app.database import db
 from app.models.team import Team
 from app.models.team_base import TeamBase
 from app.models.team_tournament_participation import TeamTournamentParticipation
 from app.models.player import Player
 from app.models.player_team_history import PlayerTeamHistory
+from app.models.tournament import Tournament
 from app.utils.logger import get_logger
+from app.utils.pagination import decode_cursor, encode_cursor
 from app.utils.team_utils import TeamUtils
 
 logger = get_logger(__name__)
@@ -195,11 +200,13 @@ class TeamService:
         """获取所有球队信息"""
         try:
             if group_by_name:
-                teams = Team.query.all()
+                teams = Team.query.order_by(Team.id).all()
+                tournaments = TeamService._load_tournaments(teams)
                 teams_grouped = {}
                 
                 for team in teams:
                     team_name = team.name
+                    tournament = tournaments.get(team.tournament_id)
                     if team_name not in teams_grouped:
                         teams_grouped[team_name] = {
                             'team_name': team_name,
@@ -211,8 +218,8 @@ class TeamService:
                             'total_points': 0,
                             'best_rank': None,
                             'tournaments': [],
-                            'season_id': team.tournament.season_id if team.tournament else None, # 添加 seasonId
-                            'season_name': team.tournament.season.name if team.tournament and team.tournament.season else None # 添加 seasonName
+                            'season_id': tournament.season_id if tournament else None, # 添加 seasonId
+                            'season_name': tournament.season.name if tournament and tournament.season else None # 添加 seasonName
                         }
                     
                     teams_grouped[team_name]['total_goals'] += team.tournament_goals
@@ -229,62 +236,120 @@ class TeamService:
                     
                     teams_grouped[team_name]['tournaments'].append({
                         'tournament_id': team.tournament_id,
-                        'tournament_name': team.tournament.name if team.tournament else None
+                        'tournament_name': tournament.name if tournament else None
                     })
                 
                 return list(teams_grouped.values()), None
             else:
-                teams = Team.query.all()
-                teams_data = []
-                
-                for team in teams:
-                    team_players = []
-                    player_histories = PlayerTeamHistory.query.filter_by(
-                        team_id=team.id, 
-                        tournament_id=team.tournament_id
-                    ).all()
-                    
-                    for history in player_histories:
-                        team_players.append({
-                            'name': history.player.name,
-                            'player_id': history.player_id,
-                            'student_id': history.player_id,
-                            'id': history.player_id,
-                            'number': str(history.player_number),
-                            'goals': history.tournament_goals,
-                            'red_cards': history.tournament_red_cards,
-                            'yellow_cards': history.tournament_yellow_cards
-                        })
-                    
-                    standardized_team = {
-                        'id': team.id,
-                        'team_name': team.name,
-                        'name': team.name,
-                        'tournament_id': team.tournament_id,
-                        'tournament_name': team.tournament.name if team.tournament else None,
-                        'season_id': team.tournament.season_id if team.tournament else None,
-                        'season_name': team.tournament.season.name if team.tournament and team.tournament.season else None,
-                        'competition_id': team.tournament.competition_id if team.tournament else None,
-                        'competition_name': team.tournament.competition.name if team.tournament and team.tournament.competition else None,
-                        'group_id': team.group_id,
-                        'rank': team.tournament_rank,
-                        'goals': team.tournament_goals,
-                        'goals_conceded': team.tournament_goals_conceded,
-                        'goal_difference': team.tournament_goal_difference,
-                        'red_cards': team.tournament_red_cards,
-                        'yellow_cards': team.tournament_yellow_cards,
-                        'points': team.tournament_points,
-                        'players': team_players,
-                        'created_at': team.created_at.isoformat() if hasattr(team, 'created_at') and team.created_at else None
-                    }
-                    
-                    teams_data.append(standardized_team)
-                
+                teams_data, _ = TeamService.list_teams()
                 return teams_data, None
                 
         except Exception as e:
             logger.error(f"Error getting all teams: {e}")
             return None, f'获取失败: {str(e)}'
+
+    @staticmethod
+    def list_teams(include_players: bool = True, limit: Optional[int] = None,
+                   cursor: Optional[str] = None) -> Tuple[List[Dict[str, Any]], Optional[Dict[str, Any]]]:
+        """球队列表（按参赛ID升序），支持 limit + cursor 游标分页与省略球员名单
+
+        查询数固定：球队一次、赛事(含赛季/赛事类型)一次、球员历史(含球员)一次 IN 查询，
+        与球队数量无关。返回 (球队列表, 分页元信息)；未分页时元信息为 None，游标无效抛出 ValueError。
+        """
+        query = Team.query
+        paginated = bool(limit) or bool(cursor)
+        if cursor:
+            position = decode_cursor(cursor)
+            try:
+                query = query.filter(Team.id > int(position['id']))
+            except (KeyError, TypeError, ValueError):
+                raise ValueError('无效的分页游标')
+        query = query.order_by(Team.id)
+        if paginated:
+            limit = limit or current_app.config.get('ITEMS_PER_PAGE', 20)
+            query = query.limit(limit + 1)
+
+        teams = query.all()
+        meta = None
+        if paginated:
+            has_more = len(teams) > limit
+            teams = teams[:limit]
+            meta = {
+                'limit': limit,
+                'hasMore': has_more,
+                'nextCursor': encode_cursor({'id': teams[-1].id}) if has_more and teams else None
+            }
+
+        tournaments = TeamService._load_tournaments(teams)
+        rosters = TeamService._load_rosters(teams) if include_players else {}
+
+        teams_data = []
+        for team in teams:
+            tournament = tournaments.get(team.tournament_id)
+            standardized_team = {
+                'id': team.id,
+                'team_name': team.name,
+                'name': team.name,
+                'tournament_id': team.tournament_id,
+                'tournament_name': tournament.name if tournament else None,
+                'season_id': tournament.season_id if tournament else None,
+                'season_name': tournament.season.name if tournament and tournament.season else None,
+                'competition_id': tournament.competition_id if tournament else None,
+                'competition_name': tournament.competition.name if tournament and tournament.competition else None,
+                'group_id': team.group_id,
+                'rank': team.tournament_rank,
+                'goals': team.tournament_goals,
+                'goals_conceded': team.tournament_goals_conceded,
+                'goal_difference': team.tournament_goal_difference,
+                'red_cards': team.tournament_red_cards,
+                'yellow_cards': team.tournament_yellow_cards,
+                'points': team.tournament_points,
+                'created_at': None
+            }
+            if include_players:
+                standardized_team['players'] = [
+                    {
+                        'name': history.player.name,
+                        'player_id': history.player_id,
+                        'student_id': history.player_id,
+                        'id': history.player_id,
+                        'number': str(history.player_number),
+                        'goals': history.tournament_goals,
+                        'red_cards': history.tournament_red_cards,
+                        'yellow_cards': history.tournament_yellow_cards
+                    }
+                    for history in rosters.get((team.id, team.tournament_id), [])
+                ]
+            teams_data.append(standardized_team)
+
+        return teams_data, meta
+
+    @staticmethod
+    def _load_tournaments(teams: List[Team]) -> Dict[int, Tournament]:
+        """一次查询加载球队所属赛事及其赛季、赛事类型（Team.tournament 每次访问都会单独查询）"""
+        tournament_ids = {team.tournament_id for team in teams if team.tournament_id}
+        if not tournament_ids:
+            return {}
+        tournaments = Tournament.query.options(
+            joinedload(Tournament.season),
+            joinedload(Tournament.competition)
+        ).filter(Tournament.id.in_(tournament_ids)).all()
+        Tournament.prime_memo(tournaments)
+        return {tournament.id: tournament for tournament in tournaments}
+
+    @staticmethod
+    def _load_rosters(teams: List[Team]) -> Dict[Tuple[int, int], List[PlayerTeamHistory]]:
+        """一次 IN 查询加载全部球员历史（含球员），按 (参赛ID, 赛事ID) 分组"""
+        team_ids = [team.id for team in teams]
+        rosters: Dict[Tuple[int, int], List[PlayerTeamHistory]] = defaultdict(list)
+        if not team_ids:
+            return rosters
+        histories = PlayerTeamHistory.query.options(
+            joinedload(PlayerTeamHistory.player)
+        ).filter(PlayerTeamHistory.team_id.in_(team_ids)).order_by(PlayerTeamHistory.id).all()
+        for history in histories:
+            rosters[(history.team_id, history.tournament_id)].append(history)
+        return rosters
     
     @staticmethod
     def create_team(data: Dict[str, Any]) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
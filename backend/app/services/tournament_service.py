@@ -1,14 +1,19 @@
 """赛事服务层: 查询/聚合/快速创建赛事及实例。"""
+from collections import defaultdict
 from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime
 import urllib.parse
-from sqlalchemy import text
+from flask import current_app
+from sqlalchemy import func, text
+from sqlalchemy.orm import joinedload
 
 from app.database import db
+from app.extensions import cache, tournament_index
 from app.models.tournament import Tournament
 from app.models.competition import Competition
 from app.models.season import Season
 from app.models.team import Team
+from app.models.team_tournament_participation import TeamTournamentParticipation
 from app.models.player_team_history import PlayerTeamHistory
 from app.models.match import Match
 from app.utils.logger import get_logger
@@ -21,50 +26,41 @@ class TournamentService:
     
     @staticmethod
     def find_tournament_by_name(tournament_name: str) -> Tuple[List[Tournament], List[str]]:
-        """名称(精确/模糊/忽略大小写)查找。"""
+        """名称(精确/忽略大小写与空白/子串)查找，经进程内名称索引，只按主键加载命中的赛事。"""
         decoded_name = urllib.parse.unquote(tournament_name, encoding='utf-8').strip()
-
-        # 由于 Tournament.name 是 @property (包装 competition.name)，不能直接在查询表达式中使用
-        # 必须通过关联 competition 表字段 competition.name 进行筛选
-        from app.models.competition import Competition as _Competition
-
-        base_query = Tournament.query.join(_Competition, Tournament.competition_id == _Competition.competition_id)
-
-        all_tournaments = base_query.all()
-        all_names = [t.name for t in all_tournaments]
-
-        # 精确匹配
-        tournament_records = base_query.filter(_Competition.name == decoded_name).all()
-
-        # 模糊匹配
-        if not tournament_records:
-            tournament_records = base_query.filter(_Competition.name.like(f"%{decoded_name}%")).all()
-
-        # 忽略大小写匹配 (使用 lower 比较)
-        if not tournament_records:
-            from sqlalchemy import func
-            tournament_records = base_query.filter(func.lower(_Competition.name).like(f"%{decoded_name.lower()}%")) .all()
-
+        tournament_ids, all_names = tournament_index.lookup(decoded_name)
+        if not tournament_ids:
+            return [], all_names
+        tournament_records = Tournament.query.options(
+            joinedload(Tournament.season), joinedload(Tournament.competition)
+        ).filter(Tournament.id.in_(tournament_ids)).order_by(Tournament.id).all()
         return tournament_records, all_names
     
     @staticmethod
     def get_tournament_teams_data(tournament_id: int) -> List[Dict[str, Any]]:
         """列出赛事内球队及球员统计。"""
-        tournament_teams = Team.query.filter(Team.tournament_id == tournament_id).all()
-        teams_data = []
-        
+        return TournamentService._teams_data_by_tournament([tournament_id]).get(tournament_id, [])
+
+    @staticmethod
+    def _teams_data_by_tournament(tournament_ids: List[int]) -> Dict[int, List[Dict[str, Any]]]:
+        """批量构建多个赛事的球队及球员统计：球队一次、球员历史(含球员)一次查询。"""
+        tournament_teams = Team.query.filter(Team.tournament_id.in_(tournament_ids)).order_by(Team.id).all()
+        histories = PlayerTeamHistory.query.options(joinedload(PlayerTeamHistory.player)).filter(
+            PlayerTeamHistory.tournament_id.in_(tournament_ids)
+        ).order_by(PlayerTeamHistory.id).all()
+
+        rosters = defaultdict(list)
+        for player_history in histories:
+            rosters[(player_history.team_id, player_history.tournament_id)].append(player_history)
+
+        teams_by_tournament = defaultdict(list)
         for team in tournament_teams:
-            team_players = PlayerTeamHistory.query.filter(
-                PlayerTeamHistory.team_id == team.id,
-                PlayerTeamHistory.tournament_id == tournament_id
-            ).all()
-            
             players_data = []
-            for player_history in team_players:
+            for player_history in rosters.get((team.id, team.tournament_id), []):
                 try:
                     player_dict = {
                         'player_id': player_history.player_id,
-                        'player_name': player_history.player.name if hasattr(player_history, 'player') and player_history.player else f'球员{player_history.player_id}',
+                        'player_name': player_history.player.name if player_history.player else f'球员{player_history.player_id}',
                         'player_number': player_history.player_number,
                         'goals': player_history.tournament_goals or 0,
                         'redCards': player_history.tournament_red_cards or 0,
@@ -90,21 +86,35 @@ class TournamentService:
                 'players': players_data,
                 'playerCount': len(players_data)
             }
-            teams_data.append(team_dict)
+            teams_by_tournament[team.tournament_id].append(team_dict)
         
-        return teams_data
+        return teams_by_tournament
 
     @staticmethod
     def get_tournament_matches_data(tournament_id: int) -> List[Dict[str, Any]]:
         """列出赛事内的比赛列表"""
-        matches = Match.query.filter(Match.tournament_id == tournament_id).order_by(Match.match_time.asc()).all()
-        return [m.to_dict() for m in matches]
+        return TournamentService._matches_data_by_tournament([tournament_id]).get(tournament_id, [])
+
+    @staticmethod
+    def _matches_data_by_tournament(tournament_ids: List[int]) -> Dict[int, List[Dict[str, Any]]]:
+        """批量列出多个赛事的比赛（预加载双方球队名称与赛事类型，to_dict 不再逐场懒加载）"""
+        matches = Match.query.options(
+            joinedload(Match.home_team).joinedload(TeamTournamentParticipation.team_base),
+            joinedload(Match.away_team).joinedload(TeamTournamentParticipation.team_base),
+            joinedload(Match.tournament).joinedload(Tournament.competition)
+        ).filter(Match.tournament_id.in_(tournament_ids)).order_by(Match.match_time.asc()).all()
+        matches_by_tournament = defaultdict(list)
+        for match in matches:
+            matches_by_tournament[match.tournament_id].append(match.to_dict())
+        return matches_by_tournament
     
     @staticmethod
-    def build_tournament_record_dict(tournament: Tournament, teams_data: List[Dict[str, Any]]) -> Dict[str, Any]:
+    def build_tournament_record_dict(tournament: Tournament, teams_data: List[Dict[str, Any]],
+                                     matches_data: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
         """单个赛事记录结构化。"""
         total_goals = sum(team_data['goals'] for team_data in teams_data)
-        matches_data = TournamentService.get_tournament_matches_data(tournament.id)
+        if matches_data is None:
+            matches_data = TournamentService.get_tournament_matches_data(tournament.id)
         
         season_start_time = None
         season_end_time = None
@@ -136,6 +146,40 @@ class TournamentService:
             'isGrouped': tournament.is_grouped or False,
             'seasonName': tournament.season_name or tournament.name
         }
+
+    @staticmethod
+    def build_tournament_records(tournaments: List[Tournament]) -> List[Dict[str, Any]]:
+        """批量构建赛事记录：按赛事缓存，未命中的赛事合并为固定数量的批量查询（与赛季/球队数量无关）。
+        赛事需预加载 season / competition，否则逐个懒加载。构建失败的赛事记录日志后跳过。"""
+        records: Dict[int, Dict[str, Any]] = {}
+        missing = []
+        for tournament in tournaments:
+            cached = cache.get(f"tournament_record:{tournament.id}")
+            if cached is not None:
+                records[tournament.id] = cached
+            else:
+                missing.append(tournament)
+
+        if missing:
+            missing_ids = [tournament.id for tournament in missing]
+            teams_by_tournament = TournamentService._teams_data_by_tournament(missing_ids)
+            matches_by_tournament = TournamentService._matches_data_by_tournament(missing_ids)
+            timeout = current_app.config.get('TOURNAMENT_RECORD_CACHE_TIMEOUT', 300)
+            for tournament in missing:
+                try:
+                    record = TournamentService.build_tournament_record_dict(
+                        tournament,
+                        teams_by_tournament.get(tournament.id, []),
+                        matches_by_tournament.get(tournament.id, [])
+                    )
+                except Exception as record_error:
+                    logger.error(f"处理赛事记录失败: {record_error}")
+                    continue
+                cache.set(f"tournament_record:{tournament.id}", record, timeout=timeout,
+                          tags=['tournament_record', f"tournament_record:{tournament.id}"])
+                records[tournament.id] = record
+
+        return [records[tournament.id] for tournament in tournaments if tournament.id in records]
     
     @staticmethod
     def get_tournament_info_by_name(tournament_name: str) -> Dict[str, Any]:
@@ -146,27 +190,19 @@ class TournamentService:
             decoded_name = urllib.parse.unquote(tournament_name, encoding='utf-8').strip()
             raise ValueError(f'赛事"{decoded_name}"不存在')
         
-        tournament_info = {
+        records = TournamentService.build_tournament_records(tournament_records)
+        return {
             'tournamentName': urllib.parse.unquote(tournament_name, encoding='utf-8').strip(),
             'totalSeasons': len(tournament_records),
-            'records': []
+            'records': records
         }
-        
-        for record in tournament_records:
-            try:
-                teams_data = TournamentService.get_tournament_teams_data(record.id)
-                record_dict = TournamentService.build_tournament_record_dict(record, teams_data)
-                tournament_info['records'].append(record_dict)
-            except Exception as record_error:
-                logger.error(f"处理赛事记录失败: {record_error}")
-                continue
-        
-        return tournament_info
     
     @staticmethod
     def get_all_tournaments(group_by_name: bool = False) -> List[Dict[str, Any]]:
         """全部赛事(可按名称分组)。"""
-        tournaments = Tournament.query.all()
+        tournaments = Tournament.query.options(
+            joinedload(Tournament.season), joinedload(Tournament.competition)
+        ).order_by(Tournament.id).all()
         
         if not tournaments:
             return []
@@ -180,6 +216,7 @@ class TournamentService:
     def _get_tournaments_grouped_by_name(tournaments: List[Tournament]) -> List[Dict[str, Any]]:
         """名称分组聚合。"""
         tournaments_grouped = {}
+        team_totals = TournamentService._team_totals_by_tournament()
         
         for tournament in tournaments:
             tournament_name = tournament.name
@@ -192,18 +229,17 @@ class TournamentService:
                     'seasons': []
                 }
             
-            tournament_teams = Team.query.filter(Team.tournament_id == tournament.id).all()
-            total_goals = sum(team.tournament_goals or 0 for team in tournament_teams)
+            team_count, total_goals = team_totals.get(tournament.id, (0, 0))
             
             tournaments_grouped[tournament_name]['totalSeasons'] += 1
-            tournaments_grouped[tournament_name]['totalTeams'] += len(tournament_teams)
+            tournaments_grouped[tournament_name]['totalTeams'] += team_count
             tournaments_grouped[tournament_name]['totalGoals'] += total_goals
             
             season_info = {
                 'tournament_id': tournament.id,
                 'season_name': tournament.season_name or '',
                 'is_grouped': tournament.is_grouped or False,
-                'team_count': len(tournament_teams),
+                'team_count': team_count,
                 'total_goals': total_goals
             }
             
@@ -225,21 +261,20 @@ class TournamentService:
         
         return list(tournaments_grouped.values())
     
+    @staticmethod
+    def _team_totals_by_tournament() -> Dict[int, Tuple[int, int]]:
+        """一次聚合查询：各赛事 (有效参赛队数, 总进球)"""
+        rows = db.session.query(
+            Team.tournament_id,
+            func.count(Team.id),
+            func.coalesce(func.sum(Team.tournament_goals), 0)
+        ).group_by(Team.tournament_id).all()
+        return {tournament_id: (int(team_count), int(total_goals)) for tournament_id, team_count, total_goals in rows}
+    
     @staticmethod
     def _get_all_tournaments_detailed(tournaments: List[Tournament]) -> List[Dict[str, Any]]:
         """详细赛事列表。"""
-        tournaments_data = []
-        
-        for tournament in tournaments:
-            try:
-                teams_data = TournamentService.get_tournament_teams_data(tournament.id)
-                tournament_dict = TournamentService.build_tournament_record_dict(tournament, teams_data)
-                tournaments_data.append(tournament_dict)
-            except Exception as tournament_error:
-                logger.error(f"处理赛事数据失败: {tournament_error}")
-                continue
-        
-        return tournaments_data
+        return TournamentService.build_tournament_records(tournaments)
     
     @staticmethod
     def create_tournament(data: Dict[str, Any]) -> Tournament:
@@ -473,4 +508,30 @@ class TournamentService:
                 'season': False,
                 'tournament': True
             }
-        }
\ No newline at end of file
+        }
+
+
+_INDEXED_TABLES = ('competition', 'season', 'tournament')
+
+
+def _on_reference_change(sender, table=None, **_):
+    # 球员/球队/赛事名称等基础数据变更：全部赛事记录缓存失效
+    cache.invalidate_tags(['tournament_record'])
+    if table in _INDEXED_TABLES:
+        tournament_index.invalidate()
+
+
+def _invalidate_tournament_record(sender, tournament_id=None, **_):
+    """事件/比赛/名单变更：失效所属赛事记录缓存"""
+    if tournament_id is not None:
+        cache.invalidate_tags([f"tournament_record:{tournament_id}"])
+
+
+def connect_tournament_cache_invalidation():
+    """竞赛/赛季/赛事写入提交后使赛事名称索引及赛事记录缓存失效"""
+    from app import signals
+    signals.event_changed.connect(_invalidate_tournament_record)
+    signals.match_changed.connect(_invalidate_tournament_record)
+    signals.match_finished.connect(_invalidate_tournament_record)
+    signals.roster_changed.connect(_invalidate_tournament_record)
+    signals.reference_changed.connect(_on_reference_change)
@@ -0,0 +1,179 @@
+"""signals.py
+领域变更通知: 通过 SQLAlchemy after_flush 收集写入，after_commit 后统一派发。
+
+信号 (blinker)，接收者签名为 fn(sender, **payload):
+  - event_changed(match_id, tournament_id, season_id, competition_id)
+  - match_changed(match_id, tournament_id, season_id, competition_id)
+  - match_finished(match_id, tournament_id, season_id, competition_id)
+  - roster_changed(participation_id, tournament_id, season_id, competition_id)
+  - reference_changed(table, ident)
+
+说明:
+  - 仅在事务成功提交后派发；回滚时丢弃已收集的变更
+  - 作用域 (赛季/竞赛) 在 flush 阶段解析，接收者无需也不应在派发时访问数据库
+  - 数据库触发器维护的聚合 (比分/积分/排名) 由 event_changed / match_finished 隐含
+"""
+import logging
+from typing import Any, Dict, Optional, Tuple
+
+from blinker import Namespace
+from sqlalchemy import event as sa_event, inspect
+
+logger = logging.getLogger(__name__)
+
+_signals = Namespace()
+
+event_changed = _signals.signal('event-changed')
+match_changed = _signals.signal('match-changed')
+match_finished = _signals.signal('match-finished')
+roster_changed = _signals.signal('roster-changed')
+reference_changed = _signals.signal('reference-changed')
+
+_PENDING_KEY = '_domain_changes'
+
+
+def _pending(session) -> Dict[Tuple, Tuple[Any, Dict[str, Any]]]:
+    return session.info.setdefault(_PENDING_KEY, {})
+
+
+def _record(session, signal, **payload):
+    key = (signal.name,) + tuple(sorted(payload.items()))
+    _pending(session).setdefault(key, (signal, payload))
+
+
+def _tournament_scope(session, tournament_id: Optional[int], memo: Dict) -> Dict[str, Any]:
+    """解析赛事所属赛季/竞赛（优先使用会话内已加载对象）"""
+    from app.models.tournament import Tournament
+
+    if tournament_id is None:
+        return {'tournament_id': None, 'season_id': None, 'competition_id': None}
+    if tournament_id not in memo:
+        tournament = session.identity_map.get(inspect(Tournament).identity_key_from_primary_key((tournament_id,)))
+        if tournament is not None:
+            memo[tournament_id] = (tournament.season_id, tournament.competition_id)
+        else:
+            with session.no_autoflush:
+                row = session.query(Tournament.season_id, Tournament.competition_id).filter(
+                    Tournament.id == tournament_id
+                ).first()
+            memo[tournament_id] = (row[0], row[1]) if row else (None, None)
+    season_id, competition_id = memo[tournament_id]
+    return {'tournament_id': tournament_id, 'season_id': season_id, 'competition_id': competition_id}
+
+
+def _match_tournament(session, match_id: Optional[str]) -> Optional[int]:
+    from app.models.match import Match
+
+    if match_id is None:
+        return None
+    match = session.identity_map.get(inspect(Match).identity_key_from_primary_key((match_id,)))
+    if match is not None:
+        return match.tournament_id
+    with session.no_autoflush:
+        return session.query(Match.tournament_id).filter(Match.id == match_id).scalar()
+
+
+def _attr_values(obj, attr: str, deleted: bool) -> set:
+    """当前值与本次 flush 前的旧值（用于外键被修改的情形）"""
+    history = inspect(obj).attrs[attr].history
+    values = set(history.added) | set(history.deleted) | set(history.unchanged)
+    if deleted or not values:
+        values.add(getattr(obj, attr, None))
+    values.discard(None)
+    return values
+
+
+def _collect(session, flush_context):
+    from app.models.event import Event
+    from app.models.match import Match
+    from app.models.team_tournament_participation import TeamTournamentParticipation
+    from app.models.player_team_history import PlayerTeamHistory
+    from app.models.tournament import Tournament
+    from app.models.competition import Competition
+    from app.models.season import Season
+    from app.models.team_base import TeamBase
+    from app.models.player import Player
+
+    reference_models = (Tournament, Competition, Season, TeamBase, Player)
+    memo: Dict = {}
+    changed = [(obj, False) for obj in session.new] + [(obj, False) for obj in session.dirty] \
+        + [(obj, True) for obj in session.deleted]
+
+    for obj, deleted in changed:
+        if not deleted and obj in session.dirty and not session.is_modified(obj, include_collections=False):
+            continue
+
+        if isinstance(obj, Event):
+            for match_id in _attr_values(obj, 'match_id', deleted):
+                scope = _tournament_scope(session, _match_tournament(session, match_id), memo)
+                _record(session, event_changed, match_id=match_id, **scope)
+
+        elif isinstance(obj, Match):
+            for tournament_id in _attr_values(obj, 'tournament_id', deleted):
+                scope = _tournament_scope(session, tournament_id, memo)
+                _record(session, match_changed, match_id=obj.id, **scope)
+                status_history = inspect(obj).attrs.status.history
+                if not deleted and obj.status == 'F' and 'F' not in status_history.deleted \
+                        and (status_history.added or obj in session.new):
+                    _record(session, match_finished, match_id=obj.id, **scope)
+
+        elif isinstance(obj, TeamTournamentParticipation):
+            for tournament_id in _attr_values(obj, 'tournament_id', deleted):
+                _record(session, roster_changed, participation_id=obj.id,
+                        **_tournament_scope(session, tournament_id, memo))
+
+        elif isinstance(obj, PlayerTeamHistory):
+            for tournament_id in _attr_values(obj, 'tournament_id', deleted):
+                _record(session, roster_changed, participation_id=obj.team_id,
+                        **_tournament_scope(session, tournament_id, memo))
+
+        elif isinstance(obj, reference_models):
+            ident = inspect(obj).identity
+            _record(session, reference_changed, table=obj.__tablename__,
+                    ident=ident[0] if ident and len(ident) == 1 else ident)
+
+
+def _after_flush(session, flush_context):
+    try:
+        _collect(session, flush_context)
+    except Exception as e:
+        # 通知收集失败不能影响业务写入
+        logger.warning(f"领域变更收集失败: {e}")
+
+
+def _after_commit(session):
+    pending = session.info.pop(_PENDING_KEY, None)
+    if not pending:
+        return
+    sender = _current_sender()
+    for signal, payload in pending.values():
+        try:
+            signal.send(sender, **payload)
+        except Exception as e:
+            logger.warning(f"领域变更通知派发失败 {signal.name}: {e}")
+
+
+def _after_rollback(session, previous_transaction):
+    # 仅在最外层事务回滚时丢弃；SAVEPOINT 回滚最多导致多一次失效
+    if previous_transaction.parent is None:
+        session.info.pop(_PENDING_KEY, None)
+
+
+def _current_sender():
+    from flask import current_app, has_app_context
+    return current_app._get_current_object() if has_app_context() else None
+
+
+def register_change_hooks(session) -> None:
+    """在会话（或 scoped_session）上注册变更收集与派发钩子（幂等）"""
+    for name, fn in (('after_flush', _after_flush),
+                     ('after_commit', _after_commit),
+                     ('after_soft_rollback', _after_rollback)):
+        if not sa_event.contains(session, name, fn):
+            sa_event.listen(session, name, fn)
+
+
+__all__ = [
+    'event_changed', 'match_changed', 'match_finished', 'roster_changed', 'reference_changed',
+    'register_change_hooks',
+]
@@ -1,7 +1,148 @@
+import atexit
 import logging
 import logging.handlers
 import os
+import queue
+import threading
+import time
 from pathlib import Path
+from typing import Dict, Optional
+
+
+class BoundedQueueHandler(logging.handlers.QueueHandler):
+    """非阻塞入队：队列满时丢弃并计数，磁盘阻塞不会拖慢请求线程"""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self._lock = threading.Lock()
+        self.enqueued = 0
+        self.dropped = 0
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+            return
+        with self._lock:
+            self.enqueued += 1
+
+
+class SamplingFilter(logging.Filter):
+    """按 logger 名前缀对 WARNING 以下日志采样（保留比例）或限速（每秒条数）；WARNING 及以上始终保留"""
+
+    def __init__(self, sample_rates: Dict[str, float], rate_limits: Dict[str, float]):
+        super().__init__()
+        self.sample_rates = sample_rates
+        self.rate_limits = rate_limits
+        self._lock = threading.Lock()
+        self._credit: Dict[str, float] = {}
+        self._buckets: Dict[str, list] = {}
+        self._rules: Dict[str, tuple] = {}
+        self.sampled_out = 0
+        self.rate_limited = 0
+
+    def _rule(self, name: str) -> tuple:
+        # 最长前缀匹配，结果按 logger 名缓存
+        rule = self._rules.get(name)
+        if rule is None:
+            sample = max((p for p in self.sample_rates if name == p or name.startswith(p + '.')), key=len, default=None)
+            limit = max((p for p in self.rate_limits if name == p or name.startswith(p + '.')), key=len, default=None)
+            rule = self._rules[name] = (sample, limit)
+        return rule
+
+    def filter(self, record) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        sample, limit = self._rule(record.name)
+        if sample is None and limit is None:
+            return True
+        with self._lock:
+            if sample is not None:
+                # 累计额度，确定性地保留 rate 比例
+                credit = self._credit.get(sample, 0.0) + self.sample_rates[sample]
+                if credit < 1.0:
+                    self._credit[sample] = credit
+                    self.sampled_out += 1
+                    return False
+                self._credit[sample] = credit - 1.0
+            if limit is not None:
+                per_second = self.rate_limits[limit]
+                now = time.monotonic()
+                bucket = self._buckets.setdefault(limit, [per_second, now])
+                bucket[0] = min(per_second, bucket[0] + (now - bucket[1]) * per_second)
+                bucket[1] = now
+                if bucket[0] < 1.0:
+                    self.rate_limited += 1
+                    return False
+                bucket[0] -= 1.0
+        return True
+
+
+_queue_handler: Optional[BoundedQueueHandler] = None
+_listener: Optional[logging.handlers.QueueListener] = None
+_sampling: Optional[SamplingFilter] = None
+_queue_size = 10000
+
+
+def _parse_mapping(value) -> Dict[str, float]:
+    """'a.b=0.1,c=20' 或 dict -> {'a.b': 0.1, 'c': 20.0}"""
+    if not value:
+        return {}
+    if isinstance(value, dict):
+        return {str(k): float(v) for k, v in value.items()}
+    mapping = {}
+    for item in str(value).split(','):
+        if '=' in item:
+            name, number = item.split('=', 1)
+            mapping[name.strip()] = float(number)
+    return mapping
+
+
+def _start_listener(handlers):
+    global _listener
+    _listener = logging.handlers.QueueListener(_queue_handler.queue, *handlers, respect_handler_level=True)
+    _listener.start()
+
+
+def _stop_listener():
+    global _listener
+    if _listener is not None:
+        try:
+            _listener.stop()  # 处理完队列中剩余记录后退出
+        except Exception:
+            pass
+        _listener = None
+
+
+def _restart_listener_in_child():
+    # 预派生服务器 fork 后监听线程不会被继承：换新队列并在工作进程内重新启动监听
+    if _queue_handler is None or _listener is None:
+        return
+    handlers = _listener.handlers
+    _queue_handler.queue = queue.Queue(_queue_size)
+    _start_listener(handlers)
+
+
+# 进程退出时写出积压日志（gunicorn 工作进程以 sys.exit 退出，同样执行）
+atexit.register(_stop_listener)
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_restart_listener_in_child)
+
+
+def logging_stats() -> Dict[str, int]:
+    """异步日志管道计数（入队、队列满丢弃、采样/限速丢弃、当前积压）"""
+    if _queue_handler is None:
+        return {}
+    return {
+        'enqueued': _queue_handler.enqueued,
+        'dropped': _queue_handler.dropped,
+        'sampled_out': _sampling.sampled_out if _sampling else 0,
+        'rate_limited': _sampling.rate_limited if _sampling else 0,
+        'backlog': _queue_handler.queue.qsize(),
+        'capacity': _queue_size,
+    }
 
 
 def setup_logging(app):
@@ -10,7 +151,11 @@ def setup_logging(app):
     约束：
     - 仅根 logger 绑定处理器，避免重复；模块内使用 get_logger(__name__) 输出，向上冒泡。
     - 开发模式避免对项目目录内日志文件写入导致的热重载循环（默认将日志写到临时目录；若手动设置了项目内路径，则不清空）。
+    - LOG_ASYNC 开启时根 logger 只挂一个有界队列处理器，文件写入与轮转由后台监听线程完成；
+      队列满（LOG_QUEUE_SIZE）时丢弃并计数。LOG_SAMPLE_RATES / LOG_RATE_LIMITS 对热点 logger 的
+      INFO/DEBUG 日志采样或限速。
     """
+    global _queue_handler, _sampling, _queue_size
     # 目录与文件准备
     log_path = Path(app.config['LOG_FILE']).expanduser()
     log_path.parent.mkdir(parents=True, exist_ok=True)
@@ -26,14 +171,17 @@ def setup_logging(app):
     except Exception as e:
         print(f"无法清空日志文件: {e}")
 
-    # 文件处理器
-    file_handler = logging.handlers.RotatingFileHandler(
-        str(log_path),
-        maxBytes=app.config['LOG_MAX_BYTES'],
-        backupCount=app.config['LOG_BACKUP_COUNT'],
-        encoding='utf-8',
-        mode='a'
-    )
+    # 文件处理器：多个进程各自按大小轮转同一文件会互相覆盖，多进程部署改由外部轮转
+    if app.config.get('LOG_ROTATION', 'size') == 'external':
+        file_handler = logging.handlers.WatchedFileHandler(str(log_path), encoding='utf-8', mode='a')
+    else:
+        file_handler = logging.handlers.RotatingFileHandler(
+            str(log_path),
+            maxBytes=app.config['LOG_MAX_BYTES'],
+            backupCount=app.config['LOG_BACKUP_COUNT'],
+            encoding='utf-8',
+            mode='a'
+        )
     file_handler.setFormatter(logging.Formatter('[%(asctime)s] %(levelname)s in %(module)s: %(message)s'))
     file_handler.setLevel(getattr(logging, app.config['LOG_LEVEL']))
 
@@ -46,8 +194,22 @@ def setup_logging(app):
     root_logger = logging.getLogger()
     root_logger.handlers.clear()
     root_logger.setLevel(getattr(logging, app.config['LOG_LEVEL']))
-    root_logger.addHandler(file_handler)
-    root_logger.addHandler(console_handler)
+    _stop_listener()
+    _sampling = SamplingFilter(
+        _parse_mapping(app.config.get('LOG_SAMPLE_RATES')),
+        _parse_mapping(app.config.get('LOG_RATE_LIMITS'))
+    )
+    if app.config.get('LOG_ASYNC', True):
+        _queue_size = app.config.get('LOG_QUEUE_SIZE', 10000)
+        _queue_handler = BoundedQueueHandler(queue.Queue(_queue_size))
+        _queue_handler.addFilter(_sampling)
+        root_logger.addHandler(_queue_handler)
+        _start_listener([file_handler, console_handler])
+    else:
+        _queue_handler = None
+        for handler in (file_handler, console_handler):
+            handler.addFilter(_sampling)
+            root_logger.addHandler(handler)
 
     # app.logger 仅设置级别，开启冒泡，不直接加处理器
     app.logger.handlers.clear()
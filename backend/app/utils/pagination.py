@@ -0,0 +1,39 @@
+"""
+分页工具
+提供基于游标（keyset）的分页令牌编解码，令牌对客户端不透明
+"""
+
+import base64
+import json
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+
+def encode_cursor(payload: Dict[str, Any]) -> str:
+    """将游标位置编码为不透明令牌（datetime 以 ISO 字符串保存）"""
+    data = {
+        key: value.isoformat() if isinstance(value, datetime) else value
+        for key, value in payload.items()
+    }
+    raw = json.dumps(data, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(token: str) -> Dict[str, Any]:
+    """解码游标令牌；令牌无效时抛出 ValueError"""
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')).decode('utf-8'))
+    except Exception:
+        raise ValueError('无效的分页游标')
+    if not isinstance(data, dict):
+        raise ValueError('无效的分页游标')
+    return data
+
+
+def parse_cursor_datetime(value: Optional[str]) -> datetime:
+    """解析游标中的时间字段"""
+    try:
+        return datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise ValueError('无效的分页游标')
@@ -4,6 +4,7 @@
 """
 from typing import Dict, Any, List, Optional
 from datetime import datetime
+import unicodedata
 import urllib.parse
 
 from app.models.tournament import Tournament
@@ -159,3 +160,8 @@ class TournamentUtils:
         variations.append(name.upper())
         
         return list(set(variations))  # 去重
+
+    @staticmethod
+    def normalize_tournament_name(name: str) -> str:
+        """名称索引键：全角转半角、忽略大小写并去除全部空白（覆盖上面的全部变体）"""
+        return ''.join(unicodedata.normalize('NFKC', name or '').casefold().split())
@@ -0,0 +1 @@
+"""性能基准脚本（针对当前配置的数据库运行，在 backend 目录下以 python -m benchmarks.<name> 执行）"""
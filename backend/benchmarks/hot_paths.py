@@ -0,0 +1,207 @@
+"""
+热点服务路径基准：冷/热两种状态下的耗时与 SQL 语句数，结果写入 JSON 以便跨提交比较
+
+用法（backend 目录下，先用 benchmarks.synthetic_data 生成数据集）:
+    python -m benchmarks.hot_paths --sqlite /tmp/bench.db --repeat 20 --output before.json
+    python -m benchmarks.hot_paths --sqlite /tmp/bench.db --repeat 20 --output after.json
+    python -m benchmarks.hot_paths --compare before.json after.json
+    # 仅运行部分路径
+    python -m benchmarks.hot_paths --sqlite /tmp/bench.db --only teams,match_detail
+
+冷启动: 每次调用前清空结果缓存、赛事名称索引并释放会话（新会话、无已加载实体），重复 --cold-repeat 次；
+热运行: 先调用一次预热，之后连续调用 --repeat 次，缓存与索引保持。
+只读，不修改数据。不传 --sqlite 时使用 FLASK_ENV 对应配置的数据库。
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+from sqlalchemy import event, func
+
+from app import create_app
+from app.config import get_config
+from app.extensions import cache, db, tournament_index
+from app.models import Competition, Event, Match, TeamTournamentParticipation
+from app.services.event_service import EventService
+from app.services.match_service import MatchService
+from app.services.stats_service import StatsService
+from app.services.team_history_service import TeamHistoryService
+from app.services.team_service import TeamService
+from app.services.tournament_service import TournamentService
+
+
+def _pick_arguments() -> dict:
+    """按数据集选取代表性参数：事件最多的比赛、报名最多的球队、赛季最多的竞赛"""
+    match_id = db.session.query(Event.match_id).group_by(Event.match_id).order_by(
+        func.count(Event.id).desc(), Event.match_id).limit(1).scalar()
+    if match_id is None:
+        match_id = db.session.query(Match.id).order_by(Match.id).limit(1).scalar()
+    team_base_id = db.session.query(TeamTournamentParticipation.team_base_id).group_by(
+        TeamTournamentParticipation.team_base_id).order_by(
+        func.count(TeamTournamentParticipation.id).desc(), TeamTournamentParticipation.team_base_id).limit(1).scalar()
+    competition_name = db.session.query(Competition.name).order_by(Competition.competition_id).limit(1).scalar()
+    db.session.remove()
+    return {'match_id': match_id, 'team_base_id': team_base_id, 'tournament_name': competition_name}
+
+
+def _cases(arguments: dict) -> dict:
+    match_service = MatchService()
+    return {
+        'rankings': lambda: StatsService.get_all_rankings(),
+        'teams': lambda: TeamService.get_all_teams(),
+        'match_detail': lambda: match_service.get_match_detail(arguments['match_id']),
+        'tournament_by_name': lambda: TournamentService.get_tournament_info_by_name(arguments['tournament_name']),
+        'team_history': lambda: TeamHistoryService.get_team_complete_history(arguments['team_base_id']),
+        'events': lambda: EventService.get_all_events(),
+    }
+
+
+def _reset_state():
+    cache.clear()
+    tournament_index.invalidate()
+    db.session.remove()
+
+
+def _timed(fn, statements):
+    before = len(statements)
+    start = time.perf_counter()
+    fn()
+    return (time.perf_counter() - start) * 1000, len(statements) - before
+
+
+def _summary(durations, queries) -> dict:
+    ordered = sorted(durations)
+    return {
+        'runs': len(ordered),
+        'median_ms': round(statistics.median(ordered), 3),
+        'p95_ms': round(ordered[max(0, int(len(ordered) * 0.95) - 1)], 3),
+        'min_ms': round(ordered[0], 3),
+        'queries_per_call': round(sum(queries) / len(queries), 1),
+    }
+
+
+def _measure(fn, repeat: int, cold_repeat: int) -> dict:
+    statements = []
+
+    def _count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db.engine, 'before_cursor_execute', _count)
+    try:
+        cold = []
+        for _ in range(cold_repeat):
+            _reset_state()
+            cold.append(_timed(fn, statements))
+        fn()
+        warm = [_timed(fn, statements) for _ in range(repeat)]
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', _count)
+        db.session.remove()
+    return {
+        'cold': _summary([d for d, _ in cold], [q for _, q in cold]),
+        'warm': _summary([d for d, _ in warm], [q for _, q in warm]),
+    }
+
+
+def _dataset_counts() -> dict:
+    from app.models import Player, Tournament
+    counts = {model.__tablename__: db.session.query(func.count()).select_from(model).scalar()
+              for model in (Tournament, TeamTournamentParticipation, Player, Match, Event)}
+    db.session.remove()
+    return counts
+
+
+def _git_revision() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ''
+
+
+def _compare(left_path: str, right_path: str) -> None:
+    with open(left_path, encoding='utf-8') as f:
+        left = json.load(f)
+    with open(right_path, encoding='utf-8') as f:
+        right = json.load(f)
+    print(f"{left['meta'].get('revision') or left_path} -> {right['meta'].get('revision') or right_path}")
+    if left['meta'].get('dataset') != right['meta'].get('dataset'):
+        print('注意: 两次运行的数据集规模不同')
+    for name in sorted(set(left['results']) | set(right['results'])):
+        if name not in left['results'] or name not in right['results']:
+            print(f'{name:<20} 仅存在于一侧')
+            continue
+        for phase in ('cold', 'warm'):
+            old, new = left['results'][name][phase], right['results'][name][phase]
+            change = (new['median_ms'] - old['median_ms']) / old['median_ms'] * 100 if old['median_ms'] else 0.0
+            print(f"{name:<20} {phase:<4} median {old['median_ms']:>10.3f} -> {new['median_ms']:>10.3f}ms "
+                  f"({change:+.1f}%)  queries {old['queries_per_call']} -> {new['queries_per_call']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='热点服务路径基准（冷/热运行）')
+    parser.add_argument('--sqlite', help='SQLite 基准库（由 benchmarks.synthetic_data 生成）')
+    parser.add_argument('--repeat', type=int, default=20, help='热运行次数')
+    parser.add_argument('--cold-repeat', type=int, default=3, help='冷启动次数')
+    parser.add_argument('--only', help='逗号分隔的路径名，默认全部')
+    parser.add_argument('--output', help='将结果写入 JSON 文件')
+    parser.add_argument('--compare', nargs=2, metavar=('LEFT', 'RIGHT'), help='比对两次运行输出的结果')
+    args = parser.parse_args()
+
+    if args.compare:
+        _compare(*args.compare)
+        return
+
+    if args.sqlite:
+        if not os.path.exists(args.sqlite):
+            sys.exit(f'{args.sqlite} 不存在，请先运行 python -m benchmarks.synthetic_data')
+        from benchmarks.synthetic_data import sqlite_config
+        config = sqlite_config(args.sqlite)
+    else:
+        config = get_config(os.environ.get('FLASK_ENV', 'development'))
+    app = create_app(config)
+
+    with app.app_context():
+        arguments = _pick_arguments()
+        cases = _cases(arguments)
+        if args.only:
+            selected = [name.strip() for name in args.only.split(',')]
+            unknown = [name for name in selected if name not in cases]
+            if unknown:
+                sys.exit(f"未知路径: {', '.join(unknown)}（可选: {', '.join(cases)}）")
+            cases = {name: cases[name] for name in selected}
+
+        results = {}
+        for name, fn in cases.items():
+            results[name] = _measure(fn, args.repeat, args.cold_repeat)
+            cold, warm = results[name]['cold'], results[name]['warm']
+            print(f"{name:<20} cold median={cold['median_ms']:>10.3f}ms queries={cold['queries_per_call']:<6} "
+                  f"warm median={warm['median_ms']:>10.3f}ms p95={warm['p95_ms']:>10.3f}ms "
+                  f"queries={warm['queries_per_call']}")
+        meta = {
+            'revision': _git_revision(),
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'database': db.engine.url.render_as_string(hide_password=True),
+            'cache_backend': app.config.get('CACHE_BACKEND') if app.config.get('CACHE_ENABLED') else 'disabled',
+            'dataset': _dataset_counts(),
+            'arguments': arguments,
+            'repeat': args.repeat,
+            'cold_repeat': args.cold_repeat,
+        }
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'meta': meta, 'results': results}, f, ensure_ascii=False, indent=2, sort_keys=True)
+        print(f'结果已写入 {args.output}')
+
+
+if __name__ == '__main__':
+    main()
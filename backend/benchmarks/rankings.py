@@ -0,0 +1,97 @@
+"""
+排行榜基准：窗口函数引擎 vs 逐竞赛聚合
+
+用法（backend 目录下）:
+    python -m benchmarks.rankings --repeat 20 [--season-id 3]
+
+使用 FLASK_ENV 对应配置连接数据库，只读，不修改数据。
+输出每种实现的耗时中位数 / P95 与 SQL 语句数，并校验结果一致（并列名次按数值比较）。
+"""
+
+import argparse
+import os
+import statistics
+import time
+
+from sqlalchemy import event
+
+from app import create_app
+from app.config import get_config
+from app.extensions import db
+from app.services.ranking_engine import RankingEngine
+from app.services.stats_service import StatsService
+
+
+def _normalize(rankings):
+    """忽略并列名次的先后顺序，仅比较各榜单的数值序列"""
+    result = {}
+    for key, data in rankings.items():
+        result[key] = (
+            data['competitionName'],
+            data['seasonName'],
+            sorted(item['goals'] for item in data['topScorers']['players']),
+            sorted(item['goals'] for item in data['topScorers']['teams']),
+            sorted((item['redCards'], item['yellowCards']) for item in data['cards']['players']),
+            sorted((item['redCards'], item['yellowCards']) for item in data['cards']['teams']),
+            data['points'],
+        )
+    return result
+
+
+def _measure(fn, repeat):
+    statements = []
+
+    def _count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    durations = []
+    result = None
+    event.listen(db.engine, 'before_cursor_execute', _count)
+    try:
+        for _ in range(repeat):
+            db.session.expire_all()
+            start = time.perf_counter()
+            result = fn()
+            durations.append((time.perf_counter() - start) * 1000)
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', _count)
+    durations.sort()
+    return result, {
+        'median_ms': round(statistics.median(durations), 2),
+        'p95_ms': round(durations[max(0, int(len(durations) * 0.95) - 1)], 2),
+        'queries_per_call': len(statements) // repeat,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='排行榜查询基准')
+    parser.add_argument('--repeat', type=int, default=20, help='每种实现的重复次数')
+    parser.add_argument('--season-id', type=int, default=None, help='赛季ID（默认最近赛季）')
+    args = parser.parse_args()
+
+    app = create_app(get_config(os.environ.get('FLASK_ENV', 'development')))
+    with app.app_context():
+        cases = {
+            'per_competition_loop': lambda: StatsService.get_all_rankings_per_competition(args.season_id),
+            'engine_window': lambda: RankingEngine.all_rankings(args.season_id, use_window=True),
+            'engine_python_fallback': lambda: RankingEngine.all_rankings(args.season_id, use_window=False),
+        }
+        if not RankingEngine.supports_window_functions():
+            cases.pop('engine_window')
+            print('当前数据库不支持窗口函数，跳过 engine_window')
+
+        results = {}
+        for name, fn in cases.items():
+            results[name], metrics = _measure(fn, args.repeat)
+            print(f"{name:<24} median={metrics['median_ms']:>8}ms  p95={metrics['p95_ms']:>8}ms  "
+                  f"queries={metrics['queries_per_call']}")
+
+        baseline = _normalize(results['per_competition_loop'])
+        for name, result in results.items():
+            if name != 'per_competition_loop':
+                status = '一致' if _normalize(result) == baseline else '不一致'
+                print(f"{name} 与逐竞赛结果{status}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,39 @@
+"""
+SQLite 基准库结构：按模型建表，并将 team 替换为与 football_new.sql 相同定义的视图
+
+SQLite 中没有触发器，统计需使用应用层聚合（STATS_AGGREGATION=app）。
+"""
+
+import os
+import re
+
+from sqlalchemy import text
+
+from app.extensions import db
+
+SCHEMA_SQL = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+                          'football_new.sql')
+
+
+def team_view_sql() -> str:
+    """从 football_new.sql 取出 team 视图定义（去掉注释）"""
+    with open(SCHEMA_SQL, encoding='utf-8') as f:
+        content = f.read()
+    found = re.search(r'CREATE VIEW `team` AS(.*?);', content, re.S)
+    if not found:
+        raise RuntimeError('football_new.sql 中未找到 team 视图定义')
+    body = '\n'.join(line.split('--', 1)[0] for line in found.group(1).splitlines())
+    return f'CREATE VIEW team AS {body}'
+
+
+def create_sqlite_schema() -> None:
+    """在当前应用上下文的 SQLite 库中建表（需在 app_context 内调用）"""
+    if db.engine.dialect.name != 'sqlite':
+        raise RuntimeError('仅用于 SQLite 基准库')
+    db.create_all(bind_key=None)  # 只建主库；副本等其他 bind 由复制产生
+    kind = db.session.execute(text("SELECT type FROM sqlite_master WHERE name = 'team'")).scalar()
+    if kind == 'table':
+        db.session.execute(text('DROP TABLE team'))
+    if kind != 'view':
+        db.session.execute(text(team_view_sql()))
+    db.session.commit()
@@ -0,0 +1,201 @@
+"""
+合成数据集生成：按固定随机种子生成可复现的 SQLite 基准库
+
+用法（backend 目录下；目标文件必须不存在，--force 时先删除）:
+    python -m benchmarks.synthetic_data --sqlite /tmp/bench.db --scale small
+    python -m benchmarks.synthetic_data --sqlite /tmp/bench_large.db --scale large --seed 7
+    # 单项覆盖预设规模
+    python -m benchmarks.synthetic_data --sqlite /tmp/bench.db --scale medium --events 50000
+
+生成内容: 竞赛 × 赛季 = 赛事实例；每个赛事实例抽取部分球队报名，每队从本队球员池抽取名单；
+参赛球队单循环对阵，除最后一个赛季外比赛均已完赛，事件随机分布在已完赛比赛中，比分由进球/乌龙球事件得出。
+写入使用批量 INSERT（不经过会话 flush，不触发应用层聚合），结束后由 StatsRebuildService 全量重算统计与排名。
+同一种子与规模生成的数据完全相同，便于跨提交比较基准结果。
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert
+
+from app import create_app
+from app.config import get_config
+from app.extensions import db
+from app.models import (Competition, Season, Tournament, TeamBase, TeamTournamentParticipation, Player,
+                        PlayerTeamHistory, Match, Event)
+from app.services.stats_rebuild_service import StatsRebuildService
+
+PREFIX = 'SYN'
+BATCH_SIZE = 5000
+
+# 事件类型及权重（进球、乌龙球决定比分）
+EVENT_TYPES = (('进球', 45), ('黄牌', 40), ('红牌', 5), ('乌龙球', 10))
+
+SCALES = {
+    'small': dict(competitions=2, seasons=3, teams=8, players=240, events=2000,
+                  teams_per_tournament=6, roster_size=12),
+    'medium': dict(competitions=4, seasons=10, teams=16, players=1000, events=20000,
+                   teams_per_tournament=12, roster_size=16),
+    'large': dict(competitions=4, seasons=50, teams=32, players=5000, events=200000,
+                  teams_per_tournament=16, roster_size=18),
+}
+
+
+def _insert(model, rows):
+    for start in range(0, len(rows), BATCH_SIZE):
+        db.session.execute(insert(model), rows[start:start + BATCH_SIZE])
+
+
+def generate(seed: int, competitions: int, seasons: int, teams: int, players: int, events: int,
+             teams_per_tournament: int, roster_size: int) -> dict:
+    """写入合成数据并重算统计，返回各表行数（需在 app_context 内调用）"""
+    rnd = random.Random(seed)
+    teams_per_tournament = min(teams_per_tournament, teams)
+
+    _insert(Competition, [{'competition_id': i, 'name': f'{PREFIX} 联赛{i:02d}'}
+                          for i in range(1, competitions + 1)])
+    season_rows = []
+    for i in range(1, seasons + 1):
+        start = datetime(2000 + i, 3, 1)
+        season_rows.append({'season_id': i, 'name': f'{PREFIX} {2000 + i}赛季',
+                             'start_time': start, 'end_time': start + timedelta(days=270)})
+    _insert(Season, season_rows)
+    _insert(TeamBase, [{'id': i, 'name': f'{PREFIX} 球队{i:03d}', 'created_at': datetime(2000, 1, 1)}
+                       for i in range(1, teams + 1)])
+
+    # 球员按序号轮流归属各球队的球员池，同一赛事中每名球员只会出现在一支球队
+    pools = {team: [] for team in range(1, teams + 1)}
+    player_rows = []
+    for i in range(1, players + 1):
+        player_id = f'{PREFIX}{i:07d}'
+        player_rows.append({'id': player_id, 'name': f'球员{i:05d}'})
+        pools[(i - 1) % teams + 1].append(player_id)
+    _insert(Player, player_rows)
+
+    tournament_rows, participation_rows, roster_rows, match_rows = [], [], [], []
+    rosters = {}
+    finished = []
+    tournament_id = participation_id = roster_id = 0
+    for season in season_rows:
+        is_current = season['season_id'] == seasons
+        for competition_id in range(1, competitions + 1):
+            tournament_id += 1
+            tournament_rows.append({'id': tournament_id, 'competition_id': competition_id,
+                                    'season_id': season['season_id'], 'is_grouped': False})
+            entrants = []
+            for team in sorted(rnd.sample(range(1, teams + 1), teams_per_tournament)):
+                participation_id += 1
+                entrants.append((participation_id, team))
+                participation_rows.append({'id': participation_id, 'team_base_id': team,
+                                           'tournament_id': tournament_id, 'status': 'active',
+                                           'registration_time': season['start_time']})
+                squad = rnd.sample(pools[team], min(roster_size, len(pools[team])))
+                rosters[participation_id] = squad
+                for number, player_id in enumerate(squad, start=1):
+                    roster_id += 1
+                    roster_rows.append({'id': roster_id, 'player_id': player_id, 'player_number': number,
+                                        'team_id': participation_id, 'tournament_id': tournament_id})
+
+            round_number = 0
+            for i, (home_id, home_team) in enumerate(entrants):
+                for away_id, away_team in entrants[i + 1:]:
+                    round_number += 1
+                    match = {'id': f'{PREFIX}-{tournament_id}-{round_number:04d}',
+                             'match_name': f'{PREFIX} 球队{home_team:03d} vs {PREFIX} 球队{away_team:03d}',
+                             'match_time': season['start_time'] + timedelta(days=round_number % 270,
+                                                                           hours=rnd.randint(14, 20)),
+                             'location': f'场地{rnd.randint(1, 8)}',
+                             'home_team_id': home_id, 'away_team_id': away_id, 'tournament_id': tournament_id,
+                             'home_score': 0, 'away_score': 0, 'status': 'P' if is_current else 'F'}
+                    match_rows.append(match)
+                    if not is_current:
+                        finished.append(match)
+
+    _insert(Tournament, tournament_rows)
+    _insert(TeamTournamentParticipation, participation_rows)
+    _insert(PlayerTeamHistory, roster_rows)
+
+    event_rows = []
+    types = [name for name, _ in EVENT_TYPES]
+    weights = [weight for _, weight in EVENT_TYPES]
+    if finished:
+        for event_id in range(1, events + 1):
+            match = rnd.choice(finished)
+            home = rnd.random() < 0.5
+            team_id = match['home_team_id'] if home else match['away_team_id']
+            event_type = rnd.choices(types, weights)[0]
+            event_rows.append({'id': event_id, 'event_type': event_type, 'event_time': rnd.randint(1, 90),
+                               'match_id': match['id'], 'team_id': team_id,
+                               'player_id': rnd.choice(rosters[team_id])})
+            # 进球计入本方比分，乌龙球计入对方比分
+            if event_type in ('进球', '乌龙球'):
+                home_scores = home if event_type == '进球' else not home
+                match['home_score' if home_scores else 'away_score'] += 1
+    _insert(Match, match_rows)
+    _insert(Event, event_rows)
+    db.session.commit()
+
+    StatsRebuildService.rebuild(apply=True)
+    return {
+        'competitions': competitions,
+        'seasons': seasons,
+        'tournaments': len(tournament_rows),
+        'team_bases': teams,
+        'participations': len(participation_rows),
+        'players': players,
+        'rosters': len(roster_rows),
+        'matches': len(match_rows),
+        'events': len(event_rows),
+    }
+
+
+def sqlite_config(path: str):
+    """基准库配置：SQLite 文件库、应用层聚合、关闭 SQL 回显与查询预算检测"""
+    config = get_config(os.environ.get('FLASK_ENV', 'development'))
+    return type('SyntheticConfig', (config,), {
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{os.path.abspath(path)}',
+        'STATS_AGGREGATION': 'app',
+        'SQLALCHEMY_ECHO': False,
+        'QUERY_BUDGET_MODE': 'off',
+        'LOG_LEVEL': 'WARNING',  # 避免逐条日志干扰计时
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description='生成合成基准数据集（SQLite）')
+    parser.add_argument('--sqlite', required=True, help='目标 SQLite 文件')
+    parser.add_argument('--scale', choices=sorted(SCALES), default='small', help='预设规模')
+    parser.add_argument('--seed', type=int, default=42, help='随机种子')
+    parser.add_argument('--force', action='store_true', help='目标文件已存在时删除后重建')
+    for name in SCALES['small']:
+        parser.add_argument(f"--{name.replace('_', '-')}", type=int, dest=name, default=None,
+                            help='覆盖预设规模')
+    args = parser.parse_args()
+
+    path = os.path.abspath(args.sqlite)
+    if os.path.exists(path):
+        if not args.force:
+            sys.exit(f'{path} 已存在，使用 --force 覆盖')
+        os.remove(path)
+    scale = {name: getattr(args, name) if getattr(args, name) is not None else value
+             for name, value in SCALES[args.scale].items()}
+
+    app = create_app(sqlite_config(path))
+    with app.app_context():
+        from benchmarks.sqlite_schema import create_sqlite_schema
+        create_sqlite_schema()
+        started = time.perf_counter()
+        counts = generate(args.seed, **scale)
+        elapsed = time.perf_counter() - started
+
+    print(f'已生成 {path}（seed={args.seed}, 用时 {elapsed:.1f}s）')
+    for name, count in counts.items():
+        print(f'  {name:<15} {count}')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,11 +1,25 @@
 """
 后端运行文件
 启动足球管理系统后端服务
+
+开发环境使用 Werkzeug 开发服务器；FLASK_ENV=production 时使用预派生多进程 WSGI 服务器（gunicorn，gthread 工作模式）:
+  - 工作进程数 WEB_WORKERS（0 表示按可用 CPU 核数 2N+1）；每进程 WEB_THREADS 个线程（SSE 长连接各占一个线程）
+  - 主进程预加载应用（导入与模型元数据写时复制共享），派生后各工作进程重建数据库连接池
+  - 处理 WEB_MAX_REQUESTS（加抖动）个请求后回收工作进程
+  - 平滑停止: SIGTERM 后停止接收新请求，在 WEB_GRACEFUL_TIMEOUT 内处理完在途请求
+  - 平滑重启: SIGHUP 逐个替换工作进程（预加载模式下不重新导入代码）；
+    发布新代码时发送 SIGUSR2 启动新主进程，确认就绪后向旧主进程发送 SIGQUIT
+  - 多工作进程要求结果缓存与实时推送使用共享后端（CACHE_BACKEND=redis、LIVE_BACKEND=redis），
+    否则写入只在本进程失效缓存、只推送给本进程的 SSE 订阅者；日志需外部轮转（LOG_ROTATION=external）。
+    未满足时拒绝启动，单进程运行需显式设置 WEB_WORKERS=1
+  - SSE 连接各占一个线程：每进程 SSE 订阅上限不超过 WEB_THREADS - WEB_RESERVED_THREADS，
+    其余线程留给普通请求（需要更多实时连接时调大 WEB_THREADS）
+设置 WEB_SERVER=werkzeug 可在生产配置下临时退回开发服务器。
 """
 
 import os
 from app import create_app
-from app.extensions import db
+from app.extensions import db, live_hub
 from app.config import get_config
 from app.utils.app_diagnostics import get_app_info, validate_app_configuration
 
@@ -50,6 +64,10 @@ def main():
         port = app.config.get('PORT', 5000)
         debug = app.config.get('DEBUG', False)
         
+        if env == 'production' and os.environ.get('WEB_SERVER', 'prefork') != 'werkzeug':
+            run_prefork_server(app, host, port)
+            return
+
         logger.info(f"启动服务器: http://{host}:{port}")
         # 在 Windows 上使用 stat 模式重载以避免对日志文件的过度敏感；
         # 仅在开发模式启用重载；生产禁用。
@@ -63,5 +81,93 @@ def main():
         raise
 
 
+def default_worker_count() -> int:
+    """按进程可用的 CPU 核数（容器内遵循 CPU 亲和性）计算 2N+1"""
+    try:
+        cores = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cores = os.cpu_count() or 1
+    return cores * 2 + 1
+
+
+def process_local_state(config) -> list:
+    """多工作进程下仍按进程独立、需要切换到共享后端的组件"""
+    issues = []
+    if config.get('CACHE_ENABLED', True) and config.get('CACHE_BACKEND', 'memory') != 'redis':
+        issues.append('CACHE_BACKEND=redis')
+    if config.get('LIVE_BACKEND', 'memory') != 'redis':
+        issues.append('LIVE_BACKEND=redis')
+    if config.get('LOG_ROTATION', 'size') != 'external':
+        issues.append('LOG_ROTATION=external')
+    return issues
+
+
+def limit_live_subscribers(app, threads: int) -> int:
+    """SSE 连接在整个生命周期内占用一个线程：每进程订阅上限低于线程数，保留线程处理普通请求"""
+    reserved = app.config.get('WEB_RESERVED_THREADS', 2)
+    limit = max(threads - reserved, 0)
+    if live_hub.max_subscribers > limit:
+        app.logger.warning(f"每个工作进程的 SSE 订阅上限由 {live_hub.max_subscribers} 调整为 {limit}"
+                           f"（WEB_THREADS={threads}，保留 {reserved} 个线程给普通请求）")
+        live_hub.max_subscribers = limit
+    return live_hub.max_subscribers
+
+
+def prefork_options(app, host, port):
+    """gunicorn 配置（来自应用配置 WEB_*）"""
+    config = app.config
+    workers = config.get('WEB_WORKERS') or default_worker_count()
+    issues = process_local_state(config)
+    if workers > 1 and issues:
+        raise RuntimeError(f"{workers} 个工作进程需要设置 {'、'.join(issues)}"
+                           f"（缓存失效、实时推送与日志轮转需跨进程），或设置 WEB_WORKERS=1 以单进程运行")
+    return {
+        'bind': f"{host}:{port}",
+        'workers': workers,
+        'worker_class': 'gthread',
+        'threads': config.get('WEB_THREADS', 4),
+        'preload_app': True,
+        'max_requests': config.get('WEB_MAX_REQUESTS', 1000),
+        'max_requests_jitter': config.get('WEB_MAX_REQUESTS_JITTER', 100),
+        'timeout': config.get('WEB_TIMEOUT', 60),
+        'graceful_timeout': config.get('WEB_GRACEFUL_TIMEOUT', 30),
+        'keepalive': config.get('WEB_KEEPALIVE', 5),
+    }
+
+
+def run_prefork_server(app, host, port):
+    """预派生多进程服务器：主进程预加载应用，工作进程派生后重建连接池"""
+    logger = app.logger
+    try:
+        from gunicorn.app.base import BaseApplication
+    except ImportError as e:
+        raise RuntimeError('生产模式需要安装 gunicorn（或设置 WEB_SERVER=werkzeug 使用开发服务器）') from e
+
+    def post_fork(server, worker):
+        # 主进程中建立的连接不能跨进程共享：丢弃继承的连接，由工作进程按需重新建立
+        with app.app_context():
+            for engine in db.engines.values():
+                engine.dispose(close=False)
+
+    options = prefork_options(app, host, port)
+    options['post_fork'] = post_fork
+    sse_limit = limit_live_subscribers(app, options['threads'])
+
+    class PreforkServer(BaseApplication):
+        def load_config(self):
+            for key, value in options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            return app
+
+    per_worker = app.config.get('DB_POOL_SIZE', 10) + app.config.get('DB_MAX_OVERFLOW', 20)
+    logger.info(
+        f"启动生产服务器: http://{options['bind']} | 工作进程 {options['workers']} x 线程 {options['threads']} | "
+        f"数据库连接上限约 {options['workers'] * per_worker} | 每进程 SSE 订阅上限 {sse_limit}"
+    )
+    PreforkServer().run()
+
+
 if __name__ == '__main__':
     main()
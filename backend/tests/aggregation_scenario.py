@@ -0,0 +1,237 @@
+"""
+统计聚合一致性场景：触发器与应用层聚合 (STATS_AGGREGATION=app) 共用的写入场景与期望值
+
+场景经由真实写路径（EventService / MatchService）执行：批量录入、修改事件类型与球员（跨队）、
+删除事件、删除比赛（批量删除事件）、完赛计分排名、已完赛后拒绝修改。
+expected 按最终事件独立重算，不依赖任何一种聚合实现。
+  - tests/test_stats_aggregation.py: SQLite + 应用层聚合
+  - benchmarks/aggregation_parity.py: MySQL + 触发器
+"""
+
+from collections import Counter
+from datetime import datetime, timedelta
+
+from app.extensions import db
+from app.models import (Competition, Season, Tournament, TeamBase, TeamTournamentParticipation, Player,
+                        PlayerTeamHistory, Match, Event)
+from app.services.event_service import EventService
+from app.services.match_service import MatchService
+
+PREFIX = 'PARITY'
+TEAMS = ('A', 'B', 'C')
+PLAYERS_PER_TEAM = 3
+
+
+def player_id(team: str, number: int) -> str:
+    return f'{PREFIX}{team}{number}'
+
+
+def create_fixture():
+    if db.session.get(Match, f'{PREFIX}-M1') is not None:
+        raise RuntimeError('目标库中已存在校验数据，请使用空库')
+
+    competition = Competition(name=f'{PREFIX} Cup')
+    season = Season(name=f'{PREFIX} Season', start_time=datetime(2020, 1, 1), end_time=datetime(2020, 12, 31))
+    db.session.add_all([competition, season])
+    db.session.flush()
+    tournament = Tournament(competition_id=competition.competition_id, season_id=season.season_id)
+    db.session.add(tournament)
+    db.session.flush()
+
+    teams = {}
+    for name in TEAMS:
+        base = TeamBase(name=f'{PREFIX} {name}')
+        db.session.add(base)
+        db.session.flush()
+        participation = TeamTournamentParticipation(team_base_id=base.id, tournament_id=tournament.id, status='active')
+        db.session.add(participation)
+        db.session.flush()
+        teams[name] = participation
+        for number in range(1, PLAYERS_PER_TEAM + 1):
+            player = Player(id=player_id(name, number), name=f'{PREFIX} {name}{number}')
+            db.session.add(player)
+            db.session.add(PlayerTeamHistory(player_id=player.id, player_number=number,
+                                             team_id=participation.id, tournament_id=tournament.id))
+
+    for index, (home, away) in enumerate((('A', 'B'), ('B', 'C'), ('A', 'C')), start=1):
+        db.session.add(Match(id=f'{PREFIX}-M{index}', match_name=f'{PREFIX} {home} vs {away}',
+                             match_time=datetime(2020, 3, 1) + timedelta(days=index), location='parity',
+                             home_team_id=teams[home].id, away_team_id=teams[away].id,
+                             tournament_id=tournament.id, status='P'))
+    db.session.commit()
+    return tournament.id
+
+
+def events(match_id: str):
+    return Event.query.filter_by(match_id=match_id).order_by(Event.id).all()
+
+
+def run_scenario() -> dict:
+    """执行写入场景，返回各项拒绝检查的结果"""
+    match_service = MatchService()
+    P = player_id
+    checks = {}
+
+    EventService.create_events_batch(f'{PREFIX}-M1', [
+        {'eventType': '进球', 'eventTime': 10, 'playerId': P('A', 1)},
+        {'eventType': '进球', 'eventTime': 20, 'playerId': P('A', 2)},
+        {'eventType': '进球', 'eventTime': 30, 'playerId': P('B', 1)},
+        {'eventType': '乌龙球', 'eventTime': 40, 'playerId': P('A', 3)},
+        {'eventType': '黄牌', 'eventTime': 50, 'playerId': P('B', 2)},
+        {'eventType': '红牌', 'eventTime': 60, 'playerId': P('A', 1)},
+        {'eventType': '黄牌', 'eventTime': 70, 'playerId': P('A', 2)},
+    ])
+    m1 = events(f'{PREFIX}-M1')
+    # 改类型：A2 的进球改为黄牌；跨队改球员：B1 的进球改记为 A3
+    EventService.update_event(m1[1].id, {'eventType': '黄牌'})
+    EventService.update_event(m1[2].id, {'playerName': f'{PREFIX} A3'})
+    # 仅改时间不影响统计
+    EventService.update_event(m1[4].id, {'eventTime': 55})
+    EventService.delete_event(m1[6].id)
+
+    # 删除比赛：Query.delete() 批量删除其事件
+    EventService.create_events_batch(f'{PREFIX}-M3', [
+        {'eventType': '进球', 'eventTime': 5, 'playerId': P('A', 1)},
+        {'eventType': '黄牌', 'eventTime': 6, 'playerId': P('C', 1)},
+    ])
+    match_service.delete_match(f'{PREFIX}-M3')
+
+    EventService.create_events_batch(f'{PREFIX}-M2', [
+        {'eventType': '进球', 'eventTime': 15, 'playerId': P('B', 3)},
+        {'eventType': '进球', 'eventTime': 25, 'playerId': P('C', 2)},
+        {'eventType': '进球', 'eventTime': 35, 'playerId': P('C', 2)},
+        {'eventType': '乌龙球', 'eventTime': 45, 'playerId': P('C', 1)},
+        {'eventType': '红牌', 'eventTime': 80, 'playerId': P('C', 3)},
+    ])
+
+    match_service.complete_match(f'{PREFIX}-M1')
+    match_service.complete_match(f'{PREFIX}-M2')
+
+    try:
+        EventService.update_event(events(f'{PREFIX}-M1')[0].id, {'eventType': '黄牌'})
+        checks['update_after_finish'] = 'accepted'
+    except Exception:
+        checks['update_after_finish'] = 'rejected'
+    return checks
+
+
+def snapshot(tournament_id: int) -> dict:
+    db.session.expire_all()
+    participations = (
+        TeamTournamentParticipation.query
+        .filter_by(tournament_id=tournament_id)
+        .order_by(TeamTournamentParticipation.id)
+        .all()
+    )
+    teams = {}
+    for p in participations:
+        teams[p.team_base.name] = {
+            'goals': p.tournament_goals, 'conceded': p.tournament_goals_conceded,
+            'difference': p.tournament_goal_difference, 'red': p.tournament_red_cards,
+            'yellow': p.tournament_yellow_cards, 'points': p.tournament_points, 'rank': p.tournament_rank,
+            'played': p.matches_played, 'wins': p.wins, 'draws': p.draws, 'losses': p.losses,
+        }
+    matches = {
+        m.id: {'home': m.home_score, 'away': m.away_score, 'status': m.status}
+        for m in Match.query.filter_by(tournament_id=tournament_id).order_by(Match.id).all()
+    }
+    players = {
+        p.id: {'goals': p.career_goals, 'red': p.career_red_cards, 'yellow': p.career_yellow_cards}
+        for p in Player.query.filter(Player.id.like(f'{PREFIX}%')).order_by(Player.id).all()
+    }
+    histories = {
+        f'{h.player_id}@{h.team_participation.team_base.name}': {
+            'goals': h.tournament_goals, 'red': h.tournament_red_cards, 'yellow': h.tournament_yellow_cards
+        }
+        for h in PlayerTeamHistory.query.filter_by(tournament_id=tournament_id).order_by(PlayerTeamHistory.player_id).all()
+    }
+    return {'matches': matches, 'teams': teams, 'players': players, 'histories': histories}
+
+
+def expected(tournament_id: int) -> dict:
+    """按最终事件独立重算（触发器语义：乌龙球不计入对方进球与球员数据）"""
+    participations = TeamTournamentParticipation.query.filter_by(tournament_id=tournament_id).all()
+    names = {p.id: p.team_base.name for p in participations}
+    matches = Match.query.filter_by(tournament_id=tournament_id).order_by(Match.id).all()
+    events = Event.query.join(Match).filter(Match.tournament_id == tournament_id).all()
+
+    by_match = {m.id: m for m in matches}
+    score = {m.id: [0, 0] for m in matches}
+    team = {pid: Counter() for pid in names}
+    player, history = Counter(), Counter()
+    for e in events:
+        m = by_match[e.match_id]
+        side = 0 if e.team_id == m.home_team_id else 1
+        opponent = m.away_team_id if side == 0 else m.home_team_id
+        if e.event_type == '进球':
+            score[m.id][side] += 1
+            team[e.team_id]['goals'] += 1
+            team[opponent]['conceded'] += 1
+            player[(e.player_id, 'goals')] += 1
+            history[(e.player_id, e.team_id, 'goals')] += 1
+        elif e.event_type == '乌龙球':
+            score[m.id][1 - side] += 1
+            team[e.team_id]['conceded'] += 1
+        else:
+            kind = 'red' if e.event_type == '红牌' else 'yellow'
+            team[e.team_id][kind] += 1
+            player[(e.player_id, kind)] += 1
+            history[(e.player_id, e.team_id, kind)] += 1
+
+    finished = False
+    for m in matches:
+        if m.status != 'F':
+            continue
+        finished = True
+        home, away = score[m.id]
+        for team_id, mine, theirs in ((m.home_team_id, home, away), (m.away_team_id, away, home)):
+            team[team_id]['played'] += 1
+            if mine > theirs:
+                team[team_id]['points'] += 3
+                team[team_id]['wins'] += 1
+            elif mine < theirs:
+                team[team_id]['losses'] += 1
+            else:
+                team[team_id]['points'] += 1
+                team[team_id]['draws'] += 1
+
+    order = sorted(names, key=lambda pid: (-team[pid]['points'], -(team[pid]['goals'] - team[pid]['conceded']),
+                                           -team[pid]['goals'], pid))
+    teams = {}
+    for pid in sorted(names):
+        c = team[pid]
+        teams[names[pid]] = {
+            'goals': c['goals'], 'conceded': c['conceded'], 'difference': c['goals'] - c['conceded'],
+            'red': c['red'], 'yellow': c['yellow'], 'points': c['points'],
+            'rank': order.index(pid) + 1 if finished else None,
+            'played': c['played'], 'wins': c['wins'], 'draws': c['draws'], 'losses': c['losses'],
+        }
+    return {
+        'matches': {m.id: {'home': score[m.id][0], 'away': score[m.id][1], 'status': m.status} for m in matches},
+        'teams': teams,
+        'players': {
+            p.id: {'goals': player[(p.id, 'goals')], 'red': player[(p.id, 'red')], 'yellow': player[(p.id, 'yellow')]}
+            for p in Player.query.filter(Player.id.like(f'{PREFIX}%')).order_by(Player.id).all()
+        },
+        'histories': {
+            f'{h.player_id}@{names[h.team_id]}': {
+                'goals': history[(h.player_id, h.team_id, 'goals')],
+                'red': history[(h.player_id, h.team_id, 'red')],
+                'yellow': history[(h.player_id, h.team_id, 'yellow')],
+            }
+            for h in PlayerTeamHistory.query.filter_by(tournament_id=tournament_id).order_by(PlayerTeamHistory.player_id).all()
+        },
+    }
+
+
+def diff(left: dict, right: dict, path: str = ''):
+    """返回两份快照的差异路径列表"""
+    differences = []
+    for key in sorted(set(left) | set(right)):
+        where = f'{path}.{key}' if path else key
+        a, b = left.get(key), right.get(key)
+        if isinstance(a, dict) and isinstance(b, dict):
+            differences.extend(diff(a, b, where))
+        elif a != b:
+            differences.append(f'{where}: {a!r} != {b!r}')
+    return differences
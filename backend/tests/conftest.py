@@ -0,0 +1,34 @@
+"""测试公共夹具：TestingConfig（SQLite 内存库、应用层聚合、查询预算 raise）"""
+
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('LOG_FILE', os.path.join(tempfile.gettempdir(), 'football-test.log'))
+
+import pytest  # noqa: E402
+
+from app import create_app  # noqa: E402
+from app.config import TestingConfig  # noqa: E402
+from app.extensions import cache, db, tournament_index  # noqa: E402
+
+
+def make_app(config=TestingConfig):
+    """建库后返回应用；SQLite 库在引擎内独立，每个应用互不影响"""
+    from benchmarks.sqlite_schema import create_sqlite_schema
+
+    app = create_app(config)
+    with app.app_context():
+        create_sqlite_schema()
+    cache.clear()
+    tournament_index.invalidate()
+    return app
+
+
+@pytest.fixture
+def app():
+    app = make_app()
+    with app.app_context():
+        yield app
+        db.session.remove()
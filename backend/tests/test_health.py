@@ -0,0 +1,51 @@
+"""健康检查公开最小信息；指标接口需要管理员或来源地址白名单"""
+
+import os
+
+import pytest
+from flask_jwt_extended import create_access_token
+
+from app.config import ProductionConfig
+from app.extensions import db
+from app.models.user import User
+
+METRICS_URLS = ('/health/metrics', '/health/metrics/prometheus')
+
+
+def _token(role):
+    user = User(用户名=f'{role}-user', 邮箱=f'{role}@example.com', 身份_角色=role)
+    user.set_password('secret')
+    db.session.add(user)
+    db.session.commit()
+    return {'Authorization': f'Bearer {create_access_token(identity=str(user.用户ID))}'}
+
+
+def test_public_health_has_no_internals(app):
+    client = app.test_client()
+
+    assert set(client.get('/health/health').get_json()) == {'app', 'version', 'db', 'status'}
+    assert set(client.get('/health/ready').get_json()) == {'ready', 'db'}
+
+
+@pytest.mark.parametrize('url', METRICS_URLS)
+def test_metrics_require_admin(app, url):
+    client = app.test_client()
+
+    assert client.get(url).status_code == 401
+    assert client.get(url, headers=_token('user')).status_code == 403
+    assert client.get(url, headers=_token('admin')).status_code == 200
+
+
+@pytest.mark.parametrize('url', METRICS_URLS)
+def test_metrics_allow_listed_address(app, url):
+    client = app.test_client()
+    app.config['METRICS_ALLOWED_IPS'] = '10.0.0.0/8, 127.0.0.1'
+    assert client.get(url).status_code == 200  # 测试客户端来源为 127.0.0.1
+
+    app.config['METRICS_ALLOWED_IPS'] = '10.0.0.0/8'
+    assert client.get(url).status_code == 401
+
+
+@pytest.mark.skipif('SERVER_TIMING_HEADER' in os.environ, reason='环境变量覆盖了默认值')
+def test_production_hides_server_timing():
+    assert ProductionConfig.SERVER_TIMING_HEADER is False
@@ -0,0 +1,68 @@
+"""比赛实时推送：订阅与快照的先后顺序、序号与回放缓冲的释放"""
+
+import json
+
+from app.extensions import live_hub
+from app.live import LiveHub
+from app.services.live_feed_service import LiveFeedService
+from tests import aggregation_scenario as scenario
+
+
+def _sse_messages(response, count):
+    messages, chunks = [], iter(response.response)
+    while len(messages) < count:
+        for block in next(chunks).decode('utf-8').split('\n\n'):
+            fields = dict(line.split(': ', 1) for line in block.splitlines() if ': ' in line)
+            if 'data' in fields:
+                messages.append((fields.get('id'), json.loads(fields['data'])))
+    response.close()
+    return messages
+
+
+def test_delta_published_while_taking_snapshot_is_delivered(app, monkeypatch):
+    scenario.create_fixture()
+    match_id = f'{scenario.PREFIX}-M1'
+    live_hub.publish(match_id, {'type': 'event.created', 'matchId': match_id})
+    before = live_hub.current_seq(match_id)
+    snapshot = LiveFeedService.snapshot
+
+    def snapshot_with_concurrent_write(target):
+        live_hub.publish(target, {'type': 'event.created', 'matchId': target})
+        return snapshot(target)
+
+    monkeypatch.setattr(LiveFeedService, 'snapshot', snapshot_with_concurrent_write)
+    response = app.test_client().get(f'/matches/{match_id}/stream', buffered=False)
+
+    (_, initial), (seq, delta) = _sse_messages(response, 2)
+    assert initial['type'] == 'snapshot' and initial['seq'] == before
+    assert int(seq) == before + 1 and delta['type'] == 'event.created'
+    assert live_hub.subscriber_count(match_id) == 0
+
+
+def test_unknown_match_does_not_leave_subscriber(app):
+    assert app.test_client().get('/matches/NOPE/stream').status_code == 404
+    assert live_hub.subscriber_count() == 0
+
+
+def test_finished_match_releases_replay_after_last_subscriber():
+    hub = LiveHub()
+    sub = hub.subscribe('m1')
+    hub.publish('m1', {'type': 'event.created'})
+    hub.publish('m1', {'type': 'match.finished'})
+    hub.publish('m2', {'type': 'match.finished'})
+    assert hub.stats()['tracked_matches'] == 1  # 有订阅者的 m1 保留序号
+
+    hub.unsubscribe(sub)
+    assert hub.stats()['tracked_matches'] == 0
+    assert hub.current_seq('m1') == 0
+
+
+def test_idle_match_releases_replay():
+    hub = LiveHub()
+    hub.publish('m1', {'type': 'event.created'})
+    hub._last_active['m1'] -= hub.idle_seconds + 1
+    hub._next_sweep = 0
+
+    hub.publish('m2', {'type': 'event.created'})
+    assert hub.current_seq('m1') == 0
+    assert hub.current_seq('m2') == 1
@@ -0,0 +1,77 @@
+"""比赛解析：同一队伍对在两个赛事中各有一场比赛时，按 tournamentId 缩小范围"""
+
+from datetime import datetime
+
+import pytest
+
+from app.extensions import db
+from app.models import Match, PlayerTeamHistory, Season, TeamBase, TeamTournamentParticipation, Tournament
+from app.schemas import EventCreate
+from app.services.event_service import EventService
+from app.services.match_resolver import MatchResolver
+from tests import aggregation_scenario as scenario
+
+PAIR = f'{scenario.PREFIX} A vs {scenario.PREFIX} B'
+
+
+@pytest.fixture
+def rematch(app):
+    """第二个赛事中 A 与 B 再次交手，返回 (第一赛事ID, 第二赛事ID, 第二场比赛ID)"""
+    first_id = scenario.create_fixture()
+    first = db.session.get(Tournament, first_id)
+    season = Season(name=f'{scenario.PREFIX} Season 2', start_time=datetime(2021, 1, 1),
+                    end_time=datetime(2021, 12, 31))
+    db.session.add(season)
+    db.session.flush()
+    second = Tournament(competition_id=first.competition_id, season_id=season.season_id)
+    db.session.add(second)
+    db.session.flush()
+
+    participations = {}
+    for team in ('A', 'B'):
+        base = TeamBase.query.filter_by(name=f'{scenario.PREFIX} {team}').one()
+        participation = TeamTournamentParticipation(team_base_id=base.id, tournament_id=second.id, status='active')
+        db.session.add(participation)
+        db.session.flush()
+        participations[team] = participation
+        db.session.add(PlayerTeamHistory(player_id=scenario.player_id(team, 1), player_number=1,
+                                         team_id=participation.id, tournament_id=second.id))
+    db.session.add(Match(id=f'{scenario.PREFIX}-R1', match_name=f'{scenario.PREFIX} A vs B (2021)',
+                         match_time=datetime(2021, 3, 1), location='parity',
+                         home_team_id=participations['A'].id, away_team_id=participations['B'].id,
+                         tournament_id=second.id, status='P'))
+    db.session.commit()
+    return first_id, second.id, f'{scenario.PREFIX}-R1'
+
+
+def _event_data(**extra):
+    payload = EventCreate(eventType='进球', matchName=PAIR, playerName=f'{scenario.PREFIX} A1', eventTime=12,
+                          **extra)
+    return payload.model_dump(by_alias=True)
+
+
+def test_ambiguous_team_pair_is_rejected(rematch):
+    with pytest.raises(ValueError, match='比赛不唯一'):
+        EventService.create_event(_event_data())
+
+
+@pytest.mark.parametrize('as_text', [False, True])
+def test_team_pair_is_narrowed_by_tournament(rematch, as_text):
+    first_id, second_id, rematch_id = rematch
+
+    data = _event_data(tournamentId=second_id)
+    assert data['tournamentId'] == second_id
+    if as_text:
+        data['tournamentId'] = str(second_id)  # 不经 schema 直接调用服务时可能是字符串
+    assert EventService.create_event(data).match_id == rematch_id
+
+    data = _event_data(tournamentId=first_id)
+    assert EventService.create_event(data).match_id == f'{scenario.PREFIX}-M1'
+
+
+def test_match_id_with_text_tournament_id(rematch):
+    _, second_id, rematch_id = rematch
+
+    assert MatchResolver.resolve(rematch_id, str(second_id)).id == rematch_id
+    with pytest.raises(ValueError, match='赛事ID无效'):
+        MatchResolver.resolve(rematch_id, 'abc')
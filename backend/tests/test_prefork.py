@@ -0,0 +1,57 @@
+"""生产多进程启动：进程内缓存、实时推送或日志轮转时拒绝多工作进程；SSE 订阅上限低于线程数"""
+
+import logging
+
+import pytest
+
+from app.config import TestingConfig
+from app.extensions import live_hub
+from run import limit_live_subscribers, prefork_options
+from tests.conftest import make_app
+
+SHARED = {'CACHE_BACKEND': 'redis', 'LIVE_BACKEND': 'redis', 'LOG_ROTATION': 'external'}
+
+
+@pytest.mark.parametrize('missing', sorted(SHARED))
+def test_workers_require_shared_backends(app, missing):
+    app.config.update(SHARED, WEB_WORKERS=5, CACHE_ENABLED=True)
+    app.config[missing] = 'memory' if missing != 'LOG_ROTATION' else 'size'
+
+    with pytest.raises(RuntimeError, match=f'{missing}='):
+        prefork_options(app, '127.0.0.1', 5000)
+
+
+def test_workers_with_shared_backends(app):
+    app.config.update(SHARED, WEB_WORKERS=5)
+    assert prefork_options(app, '127.0.0.1', 5000)['workers'] == 5
+
+    app.config.update(CACHE_ENABLED=False, CACHE_BACKEND='memory')
+    assert prefork_options(app, '127.0.0.1', 5000)['workers'] == 5
+
+
+def test_single_worker_allows_process_local_state(app):
+    app.config.update(WEB_WORKERS=1, CACHE_BACKEND='memory', LIVE_BACKEND='memory', LOG_ROTATION='size')
+
+    assert prefork_options(app, '127.0.0.1', 5000)['workers'] == 1
+
+
+def test_live_subscribers_stay_below_thread_count(app, monkeypatch):
+    monkeypatch.setattr(live_hub, 'max_subscribers', 2000)
+    app.config['WEB_RESERVED_THREADS'] = 2
+
+    assert limit_live_subscribers(app, 4) == 2
+    subs = [live_hub.subscribe('m1'), live_hub.subscribe('m2')]
+    try:
+        with pytest.raises(RuntimeError):
+            live_hub.subscribe('m3')
+    finally:
+        for sub in subs:
+            live_hub.unsubscribe(sub)
+
+
+def test_external_rotation_reopens_log_file():
+    make_app(type('ExternalRotationTestingConfig', (TestingConfig,), {'LOG_ROTATION': 'external'}))
+
+    handlers = logging.getLogger().handlers
+    assert any(isinstance(handler, logging.handlers.WatchedFileHandler) for handler in handlers)
+    assert not any(isinstance(handler, logging.handlers.RotatingFileHandler) for handler in handlers)
@@ -0,0 +1,94 @@
+"""端点查询预算：两种数据规模下逐个调用声明了 @query_budget 的 GET 端点（TestingConfig 下超出即抛出）"""
+
+from urllib.parse import quote
+
+import pytest
+from flask_jwt_extended import create_access_token
+from sqlalchemy import func
+
+from app.config import TestingConfig
+from app.extensions import cache, db, tournament_index
+from app.models import Competition, Event, Match, PlayerTeamHistory
+from app import query_budget
+from app.query_budget import QueryBudgetExceeded
+from benchmarks.synthetic_data import generate
+from tests.conftest import make_app
+
+SIZES = {
+    'small': dict(competitions=1, seasons=2, teams=4, players=40, events=60,
+                  teams_per_tournament=4, roster_size=6),
+    'larger': dict(competitions=2, seasons=4, teams=10, players=200, events=1500,
+                   teams_per_tournament=8, roster_size=12),
+}
+
+
+@pytest.fixture(params=sorted(SIZES))
+def seeded_app(request):
+    app = make_app()
+    with app.app_context():
+        generate(seed=7, **SIZES[request.param])
+        db.session.remove()
+        yield app
+        db.session.remove()
+
+
+def _arguments():
+    """取数据最多的比赛与球员，让按数据量增长的查询最容易暴露"""
+    match_id = db.session.query(Event.match_id).group_by(Event.match_id).order_by(
+        func.count(Event.id).desc(), Event.match_id).limit(1).scalar()
+    player_id = db.session.query(PlayerTeamHistory.player_id).group_by(PlayerTeamHistory.player_id).order_by(
+        func.count(PlayerTeamHistory.id).desc(), PlayerTeamHistory.player_id).limit(1).scalar()
+    tournament_name = db.session.query(Competition.name).order_by(Competition.competition_id).limit(1).scalar()
+    assert match_id and player_id and db.session.query(Match).count()
+    db.session.remove()
+    return {'match_id': match_id, 'player_id': player_id, 'tournament_name': tournament_name}
+
+
+def _budgeted_urls(app, arguments):
+    urls = []
+    for rule in app.url_map.iter_rules():
+        view = app.view_functions[rule.endpoint]
+        if 'GET' not in rule.methods or not hasattr(view, 'query_budget'):
+            continue
+        missing = rule.arguments - arguments.keys()
+        assert not missing, f'{rule.rule} 缺少测试参数 {missing}'
+        url = rule.rule
+        for name in rule.arguments:
+            url = url.replace(f'<string:{name}>', '<' + name + '>').replace(f'<{name}>', quote(arguments[name]))
+        urls.append((rule.endpoint, url))
+    return urls
+
+
+def test_budgeted_endpoints_stay_within_budget(seeded_app):
+    headers = {'Authorization': f"Bearer {create_access_token(identity='1')}"}
+    urls = _budgeted_urls(seeded_app, _arguments())
+    assert len(urls) >= 10
+
+    client = seeded_app.test_client()
+    for endpoint, url in urls:
+        # 冷（缓存与索引为空）与热各调用一次
+        cache.clear()
+        tournament_index.invalidate()
+        for _ in range(2):
+            response = client.get(url, headers=headers)
+            assert response.status_code == 200, f'{endpoint} {url}: {response.status_code}'
+
+
+def test_exceeding_budget_raises(app):
+    view = app.view_functions['competitions.get_competitions']
+    budget = view.query_budget
+    view.query_budget = 0
+    try:
+        with pytest.raises(QueryBudgetExceeded):
+            app.test_client().get('/competitions')
+    finally:
+        view.query_budget = budget
+
+
+def test_budget_without_request_metrics_warns(monkeypatch):
+    # setup_logging 会重置根日志器的处理器，直接记录模块日志器的告警
+    warnings = []
+    monkeypatch.setattr(query_budget.logger, 'warning', warnings.append)
+    make_app(type('NoMetricsTestingConfig', (TestingConfig,), {'REQUEST_METRICS_ENABLED': False}))
+
+    assert any('REQUEST_METRICS_ENABLED' in message for message in warnings)
@@ -0,0 +1,119 @@
+"""读写分离：主库与副本为两个 SQLite 文件，副本复制于写入之前以模拟复制滞后"""
+
+import shutil
+import time
+
+import pytest
+
+from app.config import TestingConfig
+from app.db_routing import STICKY_COOKIE, primary_scope
+from app.extensions import cache, db
+from app.models import Competition, Season
+from app.models.leaderboard_snapshot import LeaderboardSnapshot
+from app.services.leaderboard_service import LeaderboardService
+from app.services.stats_service import StatsService
+from tests import aggregation_scenario as scenario
+from tests.conftest import make_app
+
+LAGGING_COMPETITION = f'{scenario.PREFIX} Replica Lag Cup'
+
+
+@pytest.fixture
+def replica_app(tmp_path):
+    primary, replica = tmp_path / 'primary.db', tmp_path / 'replica.db'
+    config = type('ReplicaTestingConfig', (TestingConfig,), {
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{primary}',
+        'SQLALCHEMY_BINDS': {'replica': f'sqlite:///{replica}'},
+        'READ_REPLICA_STICKY_SECONDS': 0,
+    })
+    app = make_app(config)
+    app.sync_replica = lambda: _copy_database(primary, replica)
+    with app.app_context():
+        tournament_id = scenario.create_fixture()
+        app.sync_replica()
+
+        # 以下写入只在主库：事件、完赛与一个新竞赛
+        scenario.run_scenario()
+        db.session.add(Competition(name=LAGGING_COMPETITION))
+        db.session.commit()
+        db.session.remove()
+        app.tournament_id = tournament_id
+        yield app
+        db.session.remove()
+
+
+def _copy_database(primary, replica):
+    """模拟副本追上主库"""
+    db.session.remove()
+    for engine in db.engines.values():
+        engine.dispose()
+    shutil.copyfile(primary, replica)
+
+
+def _commit_elsewhere(name):
+    """模拟另一工作进程提交写入：本测试客户端不持有读己之写 cookie"""
+    db.session.add(Competition(name=name))
+    db.session.commit()
+    db.session.remove()
+
+
+def _competition_names(response):
+    return {item['name'] for item in response.get_json()['data']['competitions']}
+
+
+def test_read_only_route_reads_replica(replica_app):
+    names = _competition_names(replica_app.test_client().get('/competitions'))
+
+    assert f'{scenario.PREFIX} Cup' in names
+    assert LAGGING_COMPETITION not in names
+
+
+def test_sticky_cookie_pins_client_to_primary(replica_app):
+    client = replica_app.test_client()
+    client.set_cookie(STICKY_COOKIE, str(time.time() + 5))
+
+    assert LAGGING_COMPETITION in _competition_names(client.get('/competitions'))
+
+
+def test_write_does_not_pin_other_clients_to_primary(replica_app):
+    replica_app.config['READ_REPLICA_STICKY_SECONDS'] = 5
+    _commit_elsewhere(f'{scenario.PREFIX} Fresh Cup')
+
+    names = _competition_names(replica_app.test_client().get('/competitions'))
+    assert LAGGING_COMPETITION not in names
+    assert f'{scenario.PREFIX} Fresh Cup' not in names
+
+
+def test_replica_read_after_write_is_not_cached(replica_app):
+    replica_app.config['READ_REPLICA_STICKY_SECONDS'] = 5
+    _commit_elsewhere(f'{scenario.PREFIX} Fresh Cup')
+    client = replica_app.test_client()
+
+    # 副本尚未同步事件，返回的旧统计不得写入（多进程共享的）结果缓存
+    stale = client.get('/stats').get_json()
+    assert cache.stats()['skipped'] >= 1
+    replica_app.sync_replica()
+    fresh = client.get('/stats').get_json()
+    assert fresh != stale
+
+    # 写入窗口过后，副本读取结果照常缓存
+    replica_app.config['READ_REPLICA_STICKY_SECONDS'] = 0
+    assert client.get('/stats').get_json() == fresh
+    assert cache.stats()['sets'] >= 1
+
+
+def test_leaderboard_snapshot_refresh_stays_on_primary(replica_app):
+    tournament_ids = [replica_app.tournament_id]
+    # 标注为只读的 StatsService 在副本上看不到滞后的事件
+    assert StatsService.compute_board(LeaderboardSnapshot.BOARD_PLAYER_GOALS, tournament_ids) == []
+    with primary_scope():
+        expected = StatsService.compute_board(LeaderboardSnapshot.BOARD_PLAYER_GOALS, tournament_ids)
+    assert expected
+
+    season_id = db.session.query(Season.season_id).filter_by(name=f'{scenario.PREFIX} Season').scalar()
+    LeaderboardService.get_rankings(season_id)
+    db.session.remove()
+
+    snap = LeaderboardSnapshot.query.filter_by(board_type=LeaderboardSnapshot.BOARD_PLAYER_GOALS).one()
+    assert not snap.is_stale
+    assert snap.payload == expected
@@ -0,0 +1,13 @@
+"""应用层聚合与触发器口径一致：共用场景在 SQLite 上执行，统计快照需等于按最终事件独立重算的期望值"""
+
+from tests import aggregation_scenario as scenario
+
+
+def test_app_aggregation_matches_independent_recount(app):
+    assert app.config['STATS_AGGREGATION'] == 'app'
+    tournament_id = scenario.create_fixture()
+
+    checks = scenario.run_scenario()
+
+    assert checks['update_after_finish'] == 'rejected'
+    assert scenario.diff(scenario.snapshot(tournament_id), scenario.expected(tournament_id)) == []
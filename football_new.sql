@@ -204,6 +204,7 @@ CREATE TABLE `match` (
   KEY `idx_match_away_team` (`客队ID`),
   KEY `idx_match_tournament` (`赛事ID`),
   KEY `idx_match_time` (`比赛时间`),
+  KEY `idx_match_name` (`比赛名称`),
   KEY `idx_match_status` (`比赛状态`),
   CONSTRAINT `fk_match_away_team` FOREIGN KEY (`客队ID`) REFERENCES `team_tournament_participation` (`参与ID`) ON DELETE CASCADE ON UPDATE CASCADE,
   CONSTRAINT `fk_match_home_team` FOREIGN KEY (`主队ID`) REFERENCES `team_tournament_participation` (`参与ID`) ON DELETE CASCADE ON UPDATE CASCADE,
@@ -251,6 +252,27 @@ CREATE TABLE `user` (
   CONSTRAINT `user_chk_1` CHECK ((`状态` in ('A','D')))
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb3;
 
+-- =============================
+-- 排行榜快照表 (leaderboard_snapshot)
+-- 按 (竞赛, 赛季, 榜单类型) 物化排行榜；变更版本 != 刷新版本 时由应用增量刷新
+-- =============================
+DROP TABLE IF EXISTS `leaderboard_snapshot`;
+CREATE TABLE `leaderboard_snapshot` (
+  `快照ID` INT NOT NULL AUTO_INCREMENT,
+  `competition_id` INT NOT NULL,
+  `season_id` INT NOT NULL,
+  `榜单类型` VARCHAR(20) NOT NULL,
+  `榜单数据` JSON NOT NULL,
+  `变更版本` INT NOT NULL DEFAULT 0,
+  `刷新版本` INT NOT NULL DEFAULT 0,
+  `刷新时间` DATETIME DEFAULT CURRENT_TIMESTAMP,
+  PRIMARY KEY (`快照ID`),
+  UNIQUE KEY `uk_leaderboard_scope` (`competition_id`, `season_id`, `榜单类型`),
+  KEY `idx_leaderboard_season` (`season_id`),
+  CONSTRAINT `fk_leaderboard_competition` FOREIGN KEY (`competition_id`) REFERENCES `competition` (`competition_id`) ON DELETE CASCADE,
+  CONSTRAINT `fk_leaderboard_season` FOREIGN KEY (`season_id`) REFERENCES `season` (`season_id`) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb3;
+
 -- =============================
 -- team_tournament_participation 表的触发器
 -- 由于 MySQL 不支持视图上的 INSTEAD OF 触发器，
@@ -293,6 +315,13 @@ END$$
 DELIMITER ;
 
 
+-- 以下四个统计触发器可由应用层聚合替代（后端配置 STATS_AGGREGATION=app，
+-- 见 backend/app/services/stats_aggregator.py）。启用前需删除，否则统计会被重复累加:
+--   DROP TRIGGER IF EXISTS after_event_insert;
+--   DROP TRIGGER IF EXISTS after_event_update;
+--   DROP TRIGGER IF EXISTS after_event_delete;
+--   DROP TRIGGER IF EXISTS trg_update_points_and_ranking_after_match_finish;
+
 DELIMITER $$
 
 CREATE TRIGGER after_event_insert